@@ -1,159 +1,178 @@
-import csv
-import datetime
-import matplotlib.pyplot as plt
-import os
-
-# Step 1: Load and process the data
-print("Step 1: Loading the global temperature data...")
-data = []
-dates = []
-temperatures = []
-
-# Read the CSV file
-with open('GlobalTemperatures.csv', 'r') as file:
-    csv_reader = csv.reader(file)
-    header = next(csv_reader)  # Skip header
-    
-    for row in csv_reader:
-        if len(row) > 1 and row[1]:  # Check if temperature data exists
-            date_str = row[0]
-            temp_str = row[1]
-            
-            try:
-                # Parse date and temperature
-                date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
-                temp = float(temp_str)
-                
-                # Store the data
-                dates.append(date)
-                temperatures.append(temp)
-                data.append((date, temp))
-            except (ValueError, IndexError):
-                continue
-
-print(f"Loaded {len(data)} temperature records.")
-
-# Step 2: Create annual averages for trend analysis
-print("Step 2: Creating annual averages...")
-annual_data = {}
-
-for date, temp in data:
-    year = date.year
-    if year not in annual_data:
-        annual_data[year] = []
-    annual_data[year].append(temp)
-
-# Calculate annual averages
-annual_averages = {}
-for year, temps in annual_data.items():
-    annual_averages[year] = sum(temps) / len(temps)
-
-# Sort by year
-years = sorted(annual_averages.keys())
-avg_temps = [annual_averages[year] for year in years]
-
-# Step 3: Create basic temperature trend visualization
-print("Step 3: Creating temperature trend visualization...")
-plt.figure(figsize=(12, 6))
-plt.plot(years, avg_temps, 'r-', linewidth=2)
-plt.title('Global Land Temperature Trend (1750-Present)', fontsize=16)
-plt.xlabel('Year', fontsize=12)
-plt.ylabel('Temperature (°C)', fontsize=12)
-plt.grid(True, alpha=0.3)
-
-# Add reference lines for important climate events
-plt.axvline(x=1850, color='gray', linestyle='--', alpha=0.7, label='Industrial Revolution')
-plt.axvline(x=1950, color='darkgray', linestyle='--', alpha=0.7, label='Post-WWII Industrial Boom')
-plt.axvline(x=1980, color='black', linestyle='--', alpha=0.7, label='Accelerated Warming')
-plt.legend()
-
-# Save the figure
-plt.tight_layout()
-plt.savefig('temperature_trend.png')
-plt.close()
-
-# Step 4: Create decadal temperature change visualization
-print("Step 4: Creating decadal temperature change visualization...")
-# Group data by decades
-decades = {}
-for year, temp in annual_averages.items():
-    decade = (year // 10) * 10
-    if decade not in decades:
-        decades[decade] = []
-    decades[decade].append(temp)
-
-# Calculate average temperature for each decade
-decade_averages = {}
-for decade, temps in decades.items():
-    decade_averages[decade] = sum(temps) / len(temps)
-
-# Sort decades
-sorted_decades = sorted(decade_averages.keys())
-decade_temps = [decade_averages[decade] for decade in sorted_decades]
-
-# Create the visualization
-plt.figure(figsize=(12, 6))
-bars = plt.bar([str(decade) for decade in sorted_decades], decade_temps, color='blue')
-
-# Add a horizontal line for the overall average
-overall_avg = sum(avg_temps) / len(avg_temps)
-plt.axhline(y=overall_avg, color='red', linestyle='-', label=f'Overall Average: {overall_avg:.2f}°C')
-
-# Customize the plot
-plt.title('Average Temperature by Decade', fontsize=16)
-plt.xlabel('Decade', fontsize=12)
-plt.ylabel('Temperature (°C)', fontsize=12)
-plt.grid(True, axis='y', alpha=0.3)
-plt.legend()
-
-# Add value labels on top of bars
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height + 0.05,
-             f'{height:.2f}°C',
-             ha='center', va='bottom', fontsize=9)
-
-# Save the figure
-plt.tight_layout()
-plt.savefig('temperature_by_decade.png')
-plt.close()
-
-# Step 5: Create a simple dashboard combining both visualizations
-print("Step 5: Creating a simple dashboard...")
-plt.figure(figsize=(15, 10))
-
-# Plot 1: Annual temperature trend
-plt.subplot(2, 1, 1)
-plt.plot(years, avg_temps, 'r-', linewidth=2)
-plt.title('Global Land Temperature Trend (1750-Present)', fontsize=14)
-plt.xlabel('Year', fontsize=10)
-plt.ylabel('Temperature (°C)', fontsize=10)
-plt.grid(True, alpha=0.3)
-plt.axvline(x=1850, color='gray', linestyle='--', alpha=0.7, label='Industrial Revolution')
-plt.axvline(x=1950, color='darkgray', linestyle='--', alpha=0.7, label='Post-WWII Industrial Boom')
-plt.axvline(x=1980, color='black', linestyle='--', alpha=0.7, label='Accelerated Warming')
-plt.legend(fontsize=8)
-
-# Plot 2: Temperature by decade
-plt.subplot(2, 1, 2)
-bars = plt.bar([str(decade) for decade in sorted_decades], decade_temps, color='blue')
-plt.axhline(y=overall_avg, color='red', linestyle='-', label=f'Overall Average: {overall_avg:.2f}°C')
-plt.title('Average Temperature by Decade', fontsize=14)
-plt.xlabel('Decade', fontsize=10)
-plt.ylabel('Temperature (°C)', fontsize=10)
-plt.grid(True, axis='y', alpha=0.3)
-plt.legend(fontsize=8)
-
-# Add a title for the entire dashboard
-plt.suptitle('Global Temperature Analysis Dashboard', fontsize=18, y=0.98)
-
-# Save the dashboard
-plt.tight_layout(rect=[0, 0, 1, 0.96])
-plt.savefig('climate_dashboard.png')
-plt.close()
-
-print("\nVisualization complete! The following files have been created:")
-print("1. temperature_trend.png - Shows the long-term temperature trend")
-print("2. temperature_by_decade.png - Shows average temperatures by decade")
-print("3. climate_dashboard.png - A dashboard combining both visualizations")
-print("\nThese visualizations help understand how global temperatures have changed over time.")
\ No newline at end of file
+"""
+Global temperature trend and decade charts
+- Loads the dates and one temperature column into NumPy arrays (datetime64 months, float32 temperatures)
+- Annual and decade means are vectorized bincount reductions over year codes
+- Each panel is drawn once; the dashboard stacks the same rendered panels
+- Long line series are downsampled (LTTB or min/max) so drawing time and PNG size stay flat
+- The functions are importable; running the file writes the three PNGs as before
+Usage:
+  python climate_visualization.py
+  python climate_visualization.py --csv GlobalLandTemperaturesByCity.csv --column AverageTemperature --outdir charts
+  from climate_visualization import load_temperatures, annual_means, decade_means
+"""
+import argparse
+import os
+import matplotlib.image as mpimg
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from downsample import DEFAULT_MAX_POINTS, METHODS, downsample
+
+CSV_FILE = 'GlobalTemperatures.csv'
+TEMP_COLUMN = 'LandAverageTemperature'
+CHUNK_ROWS = 5_000_000  # station files are read in blocks so only one block of text is in memory
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y')  # the export switches to day-first dates from 1900 on
+
+def parse_dates(text):
+    # Try each format on the rows the previous ones could not parse; NaT where none fits
+    dates = pd.to_datetime(text, format=DATE_FORMATS[0], errors='coerce')
+    for fmt in DATE_FORMATS[1:]:
+        missing = dates.isna()
+        if missing.any():
+            dates[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    return dates.to_numpy()
+
+def load_temperatures(csv_path=CSV_FILE, column=TEMP_COLUMN, chunk_rows=CHUNK_ROWS):
+    """(months, temps): datetime64[M] and float32 arrays; rows with a bad date or no temperature are skipped."""
+    month_parts, temp_parts = [], []
+    reader = pd.read_csv(csv_path, usecols=['dt', column], dtype={'dt': str, column: np.float32},
+                         chunksize=chunk_rows)
+    for chunk in reader:
+        dates = parse_dates(chunk['dt'])
+        temps = chunk[column].to_numpy()
+        valid = ~np.isnat(dates) & ~np.isnan(temps)
+        month_parts.append(dates[valid].astype('datetime64[M]'))
+        temp_parts.append(temps[valid])
+    if not month_parts:
+        return np.array([], dtype='datetime64[M]'), np.array([], dtype=np.float32)
+    return np.concatenate(month_parts), np.concatenate(temp_parts)
+
+def _group_means(codes, values):
+    # Mean of values per integer code; returns (codes present, means) in code order
+    if len(codes) == 0:
+        return codes, np.array([], dtype=np.float64)
+    lo = codes.min()
+    counts = np.bincount(codes - lo)
+    sums = np.bincount(codes - lo, weights=values)  # float64 accumulation of the float32 values
+    present = np.flatnonzero(counts)
+    return present + lo, sums[present] / counts[present]
+
+def annual_means(months, temps):
+    """(years, mean temperature per year), years ascending."""
+    years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    return _group_means(years, temps)
+
+def decade_means(years, annual):
+    """(decades, mean of the annual means per decade), decades ascending."""
+    return _group_means(years // 10 * 10, annual)
+
+def _trend_panel(years, avg_temps, monthly=None, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    if monthly is not None:
+        # Monthly values behind the annual line, downsampled so long series draw in constant time
+        mx, my = downsample(*monthly, max_points=max_points, method=method)
+        ax.plot(mx, my, color='lightcoral', linewidth=0.5, alpha=0.6, label='Monthly')
+    years, avg_temps = downsample(years, avg_temps, max_points=max_points, method=method)
+    ax.plot(years, avg_temps, 'r-', linewidth=2)
+    ax.set_title('Global Land Temperature Trend (1750-Present)', fontsize=16)
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Temperature (°C)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    # Add reference lines for important climate events
+    ax.axvline(x=1850, color='gray', linestyle='--', alpha=0.7, label='Industrial Revolution')
+    ax.axvline(x=1950, color='darkgray', linestyle='--', alpha=0.7, label='Post-WWII Industrial Boom')
+    ax.axvline(x=1980, color='black', linestyle='--', alpha=0.7, label='Accelerated Warming')
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+def _decade_panel(decades, decade_temps, overall_avg):
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    bars = ax.bar([str(decade) for decade in decades], decade_temps, color='blue')
+    # Add a horizontal line for the overall average
+    ax.axhline(y=overall_avg, color='red', linestyle='-', label=f'Overall Average: {overall_avg:.2f}°C')
+    ax.set_title('Average Temperature by Decade', fontsize=16)
+    ax.set_xlabel('Decade', fontsize=12)
+    ax.set_ylabel('Temperature (°C)', fontsize=12)
+    ax.grid(True, axis='y', alpha=0.3)
+    ax.legend()
+
+    # Add value labels on top of bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05,
+                f'{height:.2f}°C',
+                ha='center', va='bottom', fontsize=9)
+    fig.tight_layout()
+    return fig
+
+def _title_strip(text, width):
+    fig = Figure(figsize=(width, 0.8))
+    fig.text(0.5, 0.5, text, fontsize=18, ha='center', va='center')
+    return fig
+
+def _rasterize(fig, dpi):
+    canvas = FigureCanvasAgg(fig)
+    fig.set_dpi(dpi)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())
+
+def render_charts(years, avg_temps, decades, decade_temps, overall_avg, outdir='.', monthly=None,
+                  dpi=100, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """Draw each panel once, save it, and stack the same pixels into climate_dashboard.png."""
+    trend = _rasterize(_trend_panel(years, avg_temps, monthly, max_points, method), dpi)
+    decade = _rasterize(_decade_panel(decades, decade_temps, overall_avg), dpi)
+    title = _rasterize(_title_strip('Global Temperature Analysis Dashboard', 12), dpi)
+    paths = [os.path.join(outdir, name) for name in
+             ('temperature_trend.png', 'temperature_by_decade.png', 'climate_dashboard.png')]
+    mpimg.imsave(paths[0], trend)
+    mpimg.imsave(paths[1], decade)
+    mpimg.imsave(paths[2], np.vstack([title, trend, decade]))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Global temperature trend and decade charts")
+    parser.add_argument("--csv", default=CSV_FILE, help="Temperature CSV with a dt (YYYY-MM-DD or DD-MM-YYYY) column")
+    parser.add_argument("--column", default=TEMP_COLUMN, help="Temperature column to analyze")
+    parser.add_argument("--outdir", default=".", help="Directory to save the charts")
+    parser.add_argument("--monthly", action="store_true", help="Also draw the monthly series behind the annual trend")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                        help="Line plots longer than this are downsampled")
+    parser.add_argument("--downsample", choices=METHODS, default="lttb", help="Downsampling method")
+    parser.add_argument("--dpi", type=float, default=100, help="Chart resolution")
+    args = parser.parse_args()
+    os.makedirs(args.outdir, exist_ok=True)
+
+    # Step 1: Load and process the data
+    print("Step 1: Loading the global temperature data...")
+    months, temps = load_temperatures(args.csv, args.column)
+    print(f"Loaded {len(temps)} temperature records.")
+
+    # Step 2: Create annual averages for trend analysis
+    print("Step 2: Creating annual averages...")
+    years, avg_temps = annual_means(months, temps)
+    decades, decade_temps = decade_means(years, avg_temps)
+    overall_avg = avg_temps.mean()
+
+    # Steps 3-5: Draw the trend and decade panels once; the dashboard reuses them
+    print("Step 3: Creating temperature trend visualization...")
+    print("Step 4: Creating decadal temperature change visualization...")
+    print("Step 5: Creating a simple dashboard...")
+    monthly = None
+    if args.monthly:
+        monthly = (months.astype(np.int64) / 12 + 1970, temps)  # decimal years, same axis as the annual line
+    render_charts(years, avg_temps, decades, decade_temps, overall_avg, args.outdir, monthly=monthly,
+                  dpi=args.dpi, max_points=args.max_points, method=args.downsample)
+
+    print("\nVisualization complete! The following files have been created:")
+    print("1. temperature_trend.png - Shows the long-term temperature trend")
+    print("2. temperature_by_decade.png - Shows average temperatures by decade")
+    print("3. climate_dashboard.png - A dashboard combining both visualizations")
+    print("\nThese visualizations help understand how global temperatures have changed over time.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Shape-preserving downsampling for line plots of long series
+- lttb: Largest-Triangle-Three-Buckets, keeps the points that carry the visual shape
+- minmax: keeps each bucket's minimum and maximum, so spikes and extremes are never lost
+Both keep the first and last point and return at most ~max_points points, in x order.
+Usage:
+  x, y = downsample(x, y, max_points=2000, method="lttb")
+"""
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+DEFAULT_MAX_POINTS = 2000
+
+def _bucket_edges(n, buckets):
+    # Interior points 1..n-2 split into `buckets` nearly equal runs
+    return np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+
+def lttb_indices(x, y, max_points):
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    edges = _bucket_edges(n, max_points - 2)
+    # Each bucket's average point is the third triangle corner for the bucket before it
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs((x[a] - avg_x[b + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[b + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+def minmax_indices(x, y, max_points):
+    n = len(x)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+    edges = _bucket_edges(n, (max_points - 2) // 2)
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(len(starts)), np.diff(edges))
+    inner = y[1:n - 1]
+    # Position of each bucket's min and max: reduce, then find the first matching index per bucket
+    lows = np.minimum.reduceat(inner, starts - 1)
+    highs = np.maximum.reduceat(inner, starts - 1)
+    low_idx = np.flatnonzero(inner == lows[bucket])
+    high_idx = np.flatnonzero(inner == highs[bucket])
+    low_idx = low_idx[np.unique(bucket[low_idx], return_index=True)[1]]
+    high_idx = high_idx[np.unique(bucket[high_idx], return_index=True)[1]]
+    return np.unique(np.concatenate([[0], low_idx + 1, high_idx + 1, [n - 1]]))
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """(x, y) reduced to about max_points points; NaN points are dropped first."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    x, y = np.asarray(x), np.asarray(y)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    xf = x.astype(np.float64)  # datetime64 x works too
+    yf = y.astype(np.float64)
+    idx = lttb_indices(xf, yf, max_points) if method == "lttb" else minmax_indices(xf, yf, max_points)
+    return x[idx], y[idx]
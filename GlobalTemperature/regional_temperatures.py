@@ -0,0 +1,166 @@
+"""
+Annual and decade temperature means per region for Berkeley Earth style files
+(GlobalLandTemperaturesByCountry.csv, ...ByState.csv, ...ByCity.csv: dt, AverageTemperature, ..., region columns)
+- Map: the file is cut into newline-aligned byte ranges; each process parses one range,
+  sums temperatures per (region, year) and spills the partials into hash partitions by region
+- Reduce: each process merges one partition and writes its regions' annual and decade means
+- No process ever holds more than one byte range or one partition, so memory stays flat
+  however many regions there are; raise --partitions for more regions
+Results are compressed .npz files (region codes, int16 years, float32 means), read back with load_regional().
+Usage:
+  python regional_temperatures.py --csv GlobalLandTemperaturesByCity.csv --outdir regional_city --workers 4
+  annual, decades = load_regional("regional_city")
+"""
+import argparse
+import glob
+import io
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from climate_visualization import parse_dates
+
+TEMP_COLUMN = 'AverageTemperature'
+REGION_KEYS = (('City', 'Country'), ('State', 'Country'), ('Country',))  # first match wins
+RANGE_BYTES = 64 * 2**20
+DEFAULT_PARTITIONS = 16
+SPILL_DIR = '_spill'
+
+def _header(csv_path):
+    with open(csv_path, 'rb') as f:
+        line = f.readline()
+    return line.decode('utf-8-sig').strip().split(','), len(line)
+
+def region_keys(columns):
+    for keys in REGION_KEYS:
+        if all(k in columns for k in keys):
+            return list(keys)
+    raise ValueError(f"no region columns found; expected one of {[list(k) for k in REGION_KEYS]}")
+
+def byte_ranges(csv_path, first, range_bytes=RANGE_BYTES):
+    # Newline-aligned [start, end) ranges covering everything after the header
+    size = os.path.getsize(csv_path)
+    ranges, start = [], first
+    with open(csv_path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            f.readline()  # finish the row the cut landed in
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _map_range(job):
+    csv_path, start, end, columns, keys, column, spill_dir, partitions, task = job
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=columns, usecols=['dt', column, *keys],
+                     dtype={**{k: str for k in keys}, 'dt': str, column: np.float32})
+    dates = parse_dates(df['dt'])
+    temps = df[column].to_numpy()
+    valid = ~np.isnat(dates) & ~np.isnan(temps)
+    df = df.loc[valid, keys].assign(
+        year=dates[valid].astype('datetime64[Y]').astype(np.int64) + 1970,
+        total=temps[valid].astype(np.float64),
+        months=1,
+    )
+    partial = df.groupby([*keys, 'year'], sort=False).sum().reset_index()
+    # Same region -> same partition, whichever process saw its rows
+    part = pd.util.hash_pandas_object(partial[keys], index=False).to_numpy() % partitions
+    for p, rows in partial.groupby(part, sort=False):
+        rows.to_pickle(Path(spill_dir) / f'part{p:04d}.map{task:06d}.pkl')
+    return int(valid.sum())
+
+def _reduce_partition(job):
+    spill_dir, keys, outdir, p = job
+    files = sorted(glob.glob(os.path.join(spill_dir, f'part{p:04d}.map*.pkl')))
+    if not files:
+        return 0
+    sums = pd.concat([pd.read_pickle(f) for f in files]).groupby([*keys, 'year']).sum().reset_index()
+    sums['mean'] = sums['total'] / sums['months']
+    sums['decade'] = sums['year'] // 10 * 10
+    # Decade means average the annual means, like climate_visualization.decade_means
+    decades = sums.groupby([*keys, 'decade'])['mean'].mean().reset_index()
+
+    # Regions are stored once; rows refer to them by code (same sorted order for both tables)
+    regions = sums[keys].drop_duplicates().sort_values(keys).to_numpy(dtype=str)
+    np.savez_compressed(
+        Path(outdir) / f'part{p:04d}.npz',
+        keys=np.array(keys),
+        regions=regions,
+        region=sums.groupby(keys, sort=True).ngroup().to_numpy(np.int32),
+        year=sums['year'].to_numpy(np.int16),
+        mean=sums['mean'].to_numpy(np.float32),
+        months=sums['months'].to_numpy(np.int16),
+        decade_region=decades.groupby(keys, sort=True).ngroup().to_numpy(np.int32),
+        decade=decades['decade'].to_numpy(np.int16),
+        decade_mean=decades['mean'].to_numpy(np.float32),
+    )
+    return len(regions)
+
+def aggregate_regions(csv_path, outdir, column=TEMP_COLUMN, keys=None, workers=None,
+                      partitions=DEFAULT_PARTITIONS, range_bytes=RANGE_BYTES):
+    """Write per-region annual/decade means to outdir; returns (rows used, regions)."""
+    columns, first = _header(csv_path)
+    keys = keys or region_keys(columns)
+    outdir = Path(outdir)
+    spill_dir = outdir / SPILL_DIR
+    shutil.rmtree(spill_dir, ignore_errors=True)
+    spill_dir.mkdir(parents=True)
+    for old in outdir.glob('part*.npz'):
+        old.unlink()
+
+    ranges = byte_ranges(csv_path, first, range_bytes)
+    map_jobs = [(str(csv_path), s, e, columns, keys, column, str(spill_dir), partitions, i)
+                for i, (s, e) in enumerate(ranges)]
+    reduce_jobs = [(str(spill_dir), keys, str(outdir), p) for p in range(partitions)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = sum(pool.map(_map_range, map_jobs))
+            regions = sum(pool.map(_reduce_partition, reduce_jobs))
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return rows, regions
+
+def load_regional(outdir):
+    """(annual, decades) DataFrames with region key columns, rebuilt from the .npz parts."""
+    annual, decades = [], []
+    for path in sorted(Path(outdir).glob('part*.npz')):
+        with np.load(path) as part:
+            keys = list(part['keys'])
+            regions = pd.DataFrame(part['regions'], columns=keys)
+            annual.append(regions.iloc[part['region']].reset_index(drop=True).assign(
+                year=part['year'], mean=part['mean'], months=part['months']))
+            decades.append(regions.iloc[part['decade_region']].reset_index(drop=True).assign(
+                decade=part['decade'], mean=part['decade_mean']))
+    if not annual:
+        raise FileNotFoundError(f"no regional results in {outdir}")
+    annual = pd.concat(annual, ignore_index=True).sort_values([*keys, 'year'], ignore_index=True)
+    decades = pd.concat(decades, ignore_index=True).sort_values([*keys, 'decade'], ignore_index=True)
+    return annual, decades
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-region annual and decade temperature means")
+    parser.add_argument("--csv", required=True, help="Berkeley Earth style by-country/state/city CSV")
+    parser.add_argument("--outdir", default="regional", help="Directory for the .npz results")
+    parser.add_argument("--column", default=TEMP_COLUMN, help="Temperature column to average")
+    parser.add_argument("--keys", default=None, help="Comma-separated region columns (default: detected)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS,
+                        help="Region hash partitions; more partitions = less memory per reduce task")
+    parser.add_argument("--range-mb", type=float, default=RANGE_BYTES / 2**20, help="Bytes of CSV per map task")
+    args = parser.parse_args()
+
+    keys = args.keys.split(',') if args.keys else None
+    started = time.perf_counter()
+    rows, regions = aggregate_regions(args.csv, args.outdir, column=args.column, keys=keys, workers=args.workers,
+                                      partitions=args.partitions, range_bytes=int(args.range_mb * 2**20))
+    print(f"Aggregated {rows:,} rows into {regions:,} regions in {time.perf_counter() - started:.1f}s; "
+          f"results in {args.outdir}")
+
+if __name__ == "__main__":
+    main()
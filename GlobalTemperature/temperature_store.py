@@ -0,0 +1,136 @@
+"""
+Memory-mapped store for every series in GlobalTemperatures.csv
+- One shared, gap-free monthly index; each series is a float32 .npy plus a bool missing mask
+- Files are opened with np.load(mmap_mode='r'), so only the pages a query touches are read
+- query() turns a year range into index arithmetic and returns views, never copies
+Usage:
+  python temperature_store.py build --csv GlobalTemperatures.csv --store temperature_store
+  python temperature_store.py query --store temperature_store --series LandMaxTemperature --start 1900 --end 1909
+  store = TemperatureStore("temperature_store")
+  months, values, missing = store.query("LandAndOceanAverageTemperature", 1950, 1980)
+"""
+import argparse
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from climate_visualization import CSV_FILE, parse_dates
+
+STORE_DIR = 'temperature_store'
+STORE_FORMAT = 1
+META_FILE = 'meta.json'
+
+def build_store(csv_path=CSV_FILE, store_dir=STORE_DIR):
+    """Convert every numeric column of the CSV into the store; returns the store metadata."""
+    csv_path, store_dir = Path(csv_path), Path(store_dir)
+    df = pd.read_csv(csv_path, dtype={'dt': str})
+    months = parse_dates(df['dt']).astype('datetime64[M]')
+    valid = ~np.isnat(months)
+    df, months = df[valid], months[valid]
+    if len(months) == 0:
+        raise ValueError(f"{csv_path} has no parseable dates")
+    if len(np.unique(months)) != len(months):
+        raise ValueError(f"{csv_path} has more than one row for some months")
+
+    # Place every row on a dense monthly index, so a year range is plain offset arithmetic
+    start = months.min()
+    slots = (months - start).astype(np.int64)
+    n = int(slots.max()) + 1
+    series = [c for c in df.columns if c != 'dt']
+
+    # Write into a scratch directory and swap it in, so readers never see a half-built store
+    tmp = store_dir.with_name(store_dir.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / 'index.npy', np.arange(start, start + n))
+    for name in series:
+        values = np.full(n, np.nan, dtype=np.float32)
+        values[slots] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+        np.save(tmp / f'{name}.npy', values)
+        np.save(tmp / f'{name}.missing.npy', np.isnan(values))
+    st = csv_path.stat()
+    meta = {
+        'format': STORE_FORMAT,
+        'start': str(start),
+        'months': n,
+        'series': series,
+        'source': {'path': str(csv_path.resolve()), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns},
+    }
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp, store_dir)
+    return meta
+
+class TemperatureStore:
+    """Read side of the store; series files are mapped lazily on first use."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = Path(store_dir)
+        meta = json.loads((self.store_dir / META_FILE).read_text(encoding='utf-8'))
+        if meta.get('format') != STORE_FORMAT:
+            raise ValueError(f"{self.store_dir} is store format {meta.get('format')}, expected {STORE_FORMAT}; rebuild it")
+        self.meta = meta
+        self.series = meta['series']
+        self.start = np.datetime64(meta['start'], 'M')
+        self.index = np.load(self.store_dir / 'index.npy', mmap_mode='r')
+        self._arrays = {}
+
+    def is_stale(self):
+        # True when the source CSV changed after the store was built
+        source = Path(self.meta['source']['path'])
+        if not source.exists():
+            return False
+        st = source.stat()
+        return (st.st_size, st.st_mtime_ns) != (self.meta['source']['size'], self.meta['source']['mtime_ns'])
+
+    def _open(self, name):
+        if name not in self._arrays:
+            if name not in self.series:
+                raise KeyError(f"unknown series {name!r}; available: {', '.join(self.series)}")
+            self._arrays[name] = (np.load(self.store_dir / f'{name}.npy', mmap_mode='r'),
+                                  np.load(self.store_dir / f'{name}.missing.npy', mmap_mode='r'))
+        return self._arrays[name]
+
+    def _slice(self, start_year=None, end_year=None):
+        first_year = self.start.astype('datetime64[Y]').astype(int) + 1970
+        offset = self.start.astype(int) % 12  # months of first_year before the index starts
+        lo = 0 if start_year is None else (start_year - first_year) * 12 - offset
+        hi = len(self.index) if end_year is None else (end_year + 1 - first_year) * 12 - offset
+        n = len(self.index)
+        return slice(min(max(lo, 0), n), min(max(hi, 0), n))
+
+    def query(self, series, start_year=None, end_year=None):
+        """(months, values, missing) views for start_year..end_year inclusive; values are NaN where missing."""
+        values, missing = self._open(series)
+        rows = self._slice(start_year, end_year)
+        return self.index[rows], values[rows], missing[rows]
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped temperature series store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="Convert the CSV into a store")
+    build.add_argument("--csv", default=CSV_FILE)
+    build.add_argument("--store", default=STORE_DIR)
+    query = sub.add_parser('query', help="Print one series for a year range")
+    query.add_argument("--store", default=STORE_DIR)
+    query.add_argument("--series", required=True)
+    query.add_argument("--start", type=int, default=None, help="First year (inclusive)")
+    query.add_argument("--end", type=int, default=None, help="Last year (inclusive)")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        meta = build_store(args.csv, args.store)
+        print(f"Stored {len(meta['series'])} series x {meta['months']} months from {meta['start']} in {args.store}")
+        return
+    store = TemperatureStore(args.store)
+    if store.is_stale():
+        print("Warning: the source CSV changed since this store was built; rerun build")
+    months, values, missing = store.query(args.series, args.start, args.end)
+    for month, value, gap in zip(months, values, missing):
+        print(f"{month}  {'missing' if gap else f'{value:.3f}'}")
+    print(f"{len(months)} months, {int(missing.sum())} missing")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from downsample import downsample, lttb_indices, minmax_indices
+
+def noisy_series(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 2_000) + rng.normal(0, 0.1, n)
+    # Isolated spikes that a stride sample would almost surely miss
+    y[[n // 40, n * 5 // 8]] = [9.0, -9.0]
+    return x, y
+
+@pytest.mark.parametrize("indices", [lttb_indices, minmax_indices])
+@pytest.mark.parametrize("max_points", [4, 101, 2_000])
+def test_keeps_endpoints_in_x_order(indices, max_points):
+    x, y = noisy_series()
+    idx = indices(x, y, max_points)
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert len(idx) <= max_points
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_keeps_global_extremes(method):
+    x, y = noisy_series()
+    _, ys = downsample(x, y, max_points=500, method=method)
+    assert ys.max() == y.max() and ys.min() == y.min()
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = noisy_series(n=10_001)
+    idx = minmax_indices(x, y, 202)
+    edges = np.linspace(1, len(x) - 1, 101).astype(np.int64)
+    kept = set(idx.tolist())
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        assert lo + int(np.argmin(y[lo:hi])) in kept
+        assert lo + int(np.argmax(y[lo:hi])) in kept
+
+def test_short_series_and_nans_pass_through():
+    x = np.arange(10.0)
+    y = x.copy()
+    y[3] = np.nan
+    xs, ys = downsample(x, y, max_points=50)
+    np.testing.assert_array_equal(xs, np.delete(x, 3))
+    np.testing.assert_array_equal(ys, np.delete(y, 3))
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from regional_temperatures import aggregate_regions, load_regional
+
+def write_by_city(path, rows=6000, seed=0):
+    # Berkeley Earth ByCity layout, with both date formats, missing temperatures and quoted names
+    rng = np.random.default_rng(seed)
+    months = pd.Timestamp("1890-01-01") + pd.to_timedelta(rng.integers(0, 40 * 365, rows), unit="D")
+    dt = np.where(months.year < 1900, months.strftime("%Y-%m-01"), months.strftime("01-%m-%Y"))
+    places = [("Århus", "Denmark"), ("Paris", "France"), ("Lyon", "France"), ("Washington, D.C.", "United States")]
+    city, country = zip(*[places[i] for i in rng.integers(0, len(places), rows)])
+    temp = rng.normal(12, 8, rows).round(3)
+    temp[rng.random(rows) < 0.05] = np.nan
+    pd.DataFrame({"dt": dt, "AverageTemperature": temp, "AverageTemperatureUncertainty": 0.5,
+                  "City": city, "Country": country, "Latitude": "57.05N", "Longitude": "10.33E"}).to_csv(path, index=False)
+    return path
+
+@pytest.fixture(scope="module")
+def regional(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("regional")
+    csv_path = write_by_city(tmp / "by_city.csv")
+    aggregate_regions(csv_path, tmp / "out", workers=2, partitions=3, range_bytes=4096)
+    df = pd.read_csv(csv_path).dropna(subset=["AverageTemperature"])
+    # The year is the four-digit end of either date format
+    df["year"] = df["dt"].str.extract(r"(\d{4})", expand=False).astype(int)
+    return df, load_regional(tmp / "out")
+
+def test_annual_means_match_groupby(regional):
+    df, (annual, _) = regional
+    want = df.groupby(["City", "Country", "year"])["AverageTemperature"].agg(["mean", "size"]).reset_index()
+    assert annual[["City", "Country", "year"]].astype({"year": int}).equals(want[["City", "Country", "year"]])
+    np.testing.assert_allclose(annual["mean"], want["mean"], rtol=1e-6)
+    np.testing.assert_array_equal(annual["months"], want["size"])
+
+def test_decade_means_average_the_annual_means(regional):
+    df, (_, decades) = regional
+    annual = df.groupby(["City", "Country", "year"])["AverageTemperature"].mean().reset_index()
+    annual["decade"] = annual["year"] // 10 * 10
+    want = annual.groupby(["City", "Country", "decade"])["AverageTemperature"].mean().reset_index()
+    assert decades[["City", "Country", "decade"]].astype({"decade": int}).equals(want[["City", "Country", "decade"]])
+    np.testing.assert_allclose(decades["mean"], want["AverageTemperature"], rtol=1e-6)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from trends import RollingKernel, rolling_slope
+
+def _pandas_slope(y, x, window, segment=2_000):
+    # Rolling cov / var from pandas, run on overlapping segments with x and y measured from each
+    # segment's start: pandas' own add/remove updates drift over long runs of one window
+    out = np.full(len(y), np.nan)
+    for start in range(0, len(y), segment):
+        lo = max(start - window + 1, 0)
+        ys, xs = pd.Series(y[lo:start + segment]), pd.Series(x[lo:start + segment])
+        ys, xs = ys - ys.dropna().iloc[0], xs - xs.iloc[0]
+        xs[ys.isna()] = np.nan
+        slope = ys.rolling(window, min_periods=window // 2 + 1).cov(xs) / xs.rolling(window, min_periods=window // 2 + 1).var()
+        out[start:start + segment] = slope.to_numpy()[start - lo:]
+    return out
+
+def test_rolling_slope_matches_pandas_on_a_long_series():
+    n, window = 1_200_000, 12
+    rng = np.random.default_rng(0)
+    y = 14.0 + 2e-3 * np.arange(n) + rng.normal(0, 1, n)
+    y[rng.random(n) < 0.05] = np.nan
+    x = np.arange(n, dtype=np.float64)
+    got, want = rolling_slope(y, window), _pandas_slope(y, x, window)
+    assert np.array_equal(np.isnan(got), np.isnan(want))
+    np.testing.assert_allclose(got, want, rtol=0, atol=1e-9)
+
+def test_slope_with_decimal_years_matches_two_point_differences():
+    x = 1750 + np.arange(3000) / 12
+    y = np.sin(np.arange(3000) / 50.0)
+    got = RollingKernel(y, x=x).slope(2, min_periods=2)
+    np.testing.assert_allclose(got[1:], np.diff(y) / np.diff(x), rtol=1e-9, atol=1e-12)
+
+def test_stack_rows_match_single_series():
+    rng = np.random.default_rng(1)
+    stack = rng.normal(size=(3, 500))
+    stack[1, ::7] = np.nan
+    for center in (False, True):
+        together = RollingKernel(stack).slope(24, center)
+        for row, values in zip(together, stack):
+            np.testing.assert_allclose(row, RollingKernel(values).slope(24, center), rtol=1e-12, atol=1e-15)
+
+def test_mean_matches_pandas():
+    rng = np.random.default_rng(2)
+    y = rng.normal(10, 3, 5000)
+    y[rng.random(5000) < 0.1] = np.nan
+    want = pd.Series(y).rolling(120, min_periods=61).mean().to_numpy()
+    np.testing.assert_allclose(RollingKernel(y).mean(120), want, rtol=1e-12)
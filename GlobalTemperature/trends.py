@@ -0,0 +1,202 @@
+"""
+Rolling trend and anomaly engine for temperature series
+- Moving averages, rolling least-squares warming rates and uncertainty-weighted moving averages
+- Every window statistic is a difference of prefix (cumulative) sums: O(n) per window length.
+  Means share one set of prefix sums; slopes use prefix sums restarted every `window` samples with x
+  measured from each block's start, so x, x^2 and x*y stay small and long series keep their precision
+- NaN gaps are skipped; a window needs min_periods valid values or the result is NaN
+- Anomalies against a baseline period (per calendar month for monthly data)
+- Works on 1-D series or 2-D (series x time) stacks, e.g. every regional series at once
+Usage:
+  python trends.py --windows 12,120,360 --baseline 1951-1980 --out trends.csv
+  k = RollingKernel(values, x=decimal_years, uncertainty=unc)
+  k.mean(120); k.slope(360); k.weighted_mean(120)
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from climate_visualization import CSV_FILE, TEMP_COLUMN, parse_dates
+
+BASELINE = (1951, 1980)
+UNCERTAINTY_SUFFIX = 'Uncertainty'
+
+def _prefix(a):
+    # Prefix sums along the last axis with a leading zero: window sum = c[end] - c[start]
+    c = np.cumsum(a, axis=-1, dtype=np.float64)
+    return np.concatenate([np.zeros(c.shape[:-1] + (1,)), c], axis=-1)
+
+class RollingKernel:
+    """Prefix sums of one series (or a stack of series) reused by every window query."""
+
+    def __init__(self, values, x=None, uncertainty=None):
+        values = np.asarray(values, dtype=np.float64)
+        self.n = values.shape[-1]
+        valid = ~np.isnan(values)
+        # Centre y before summing, so long cumulative sums do not lose precision
+        self.y0 = np.where(valid, values, 0.0).sum(-1, keepdims=True) / np.maximum(valid.sum(-1, keepdims=True), 1)
+        y = np.where(valid, values - self.y0, 0.0)
+        self.x = np.arange(self.n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+        self.valid, self.y = valid, y
+        self.count = _prefix(valid)
+        self.sy = _prefix(y)
+        self._blocks = {}  # window -> (block prefix sums, block x origins) for slope()
+        if uncertainty is not None:
+            # Inverse-variance weights; values without an uncertainty get no weight
+            w = 1.0 / np.asarray(uncertainty, dtype=np.float64) ** 2
+            w = np.where(valid & np.isfinite(w), w, 0.0)
+            self.sw, self.swy = _prefix(w), _prefix(w * y)
+        else:
+            self.sw = self.swy = None
+
+    def _bounds(self, window, center):
+        # Window for output i is [i - offset, i - offset + window), clipped to the series
+        offset = window // 2 if center else window - 1
+        start = np.arange(self.n) - offset
+        return np.clip(start, 0, self.n), np.clip(start + window, 0, self.n)
+
+    def _sum(self, prefix, window, center):
+        start, end = self._bounds(window, center)
+        return prefix[..., end] - prefix[..., start]
+
+    def _enough(self, window, center, min_periods):
+        if window < 1:
+            raise ValueError(f"window must be positive, got {window}")
+        min_periods = window // 2 + 1 if min_periods is None else min_periods
+        n = self._sum(self.count, window, center)
+        return n, n >= max(min_periods, 1)
+
+    def mean(self, window, center=False, min_periods=None):
+        """Moving average over `window` samples."""
+        n, ok = self._enough(window, center, min_periods)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(ok, self._sum(self.sy, window, center) / n + self.y0, np.nan)
+
+    def _block_prefix(self, block):
+        # Prefix sums of (1, x, x^2, y, x*y) restarted every `block` samples, x measured from the block's
+        # first sample. Two spare blocks at the end let every window read "its block and the next one".
+        if block not in self._blocks:
+            blocks = self.n // block + 2
+            size = blocks * block
+            idx = np.minimum(np.arange(size), self.n - 1)
+            origin = self.x[idx[::block]]
+            pad = [(0, 0)] * (self.valid.ndim - 1) + [(0, size - self.n)]
+            valid = np.pad(self.valid, pad)
+            x = np.where(valid, self.x[idx] - np.repeat(origin, block), 0.0)
+            y = np.pad(self.y, pad)
+            moments = np.stack(np.broadcast_arrays(valid.astype(np.float64), x, x * x, y, x * y))
+            moments = moments.reshape(moments.shape[:-1] + (blocks, block))
+            self._blocks[block] = (_prefix(moments), origin)
+        return self._blocks[block]
+
+    def _moments(self, window, center):
+        # (n, sx, sxx, sy, sxy) of each window with x measured from the start of the window's first block;
+        # a window of at most `window` samples covers part of block b and part of block b + 1
+        prefix, origin = self._block_prefix(window)
+        start, end = self._bounds(window, center)
+        b = start // window
+        first = prefix[..., b, np.minimum(end - b * window, window)] - prefix[..., b, start - b * window]
+        second = prefix[..., b + 1, np.clip(end - (b + 1) * window, 0, window)]
+        n1, sx1, sxx1, sy1, sxy1 = first
+        n2, sx2, sxx2, sy2, sxy2 = second
+        d = origin[b + 1] - origin[b]  # move the second block's x origin onto the first's
+        return (n1 + n2, sx1 + sx2 + n2 * d, sxx1 + sxx2 + 2 * d * sx2 + n2 * d * d,
+                sy1 + sy2, sxy1 + sxy2 + d * sy2)
+
+    def slope(self, window, center=False, min_periods=None):
+        """Least-squares slope of y on x inside each window (units of y per unit of x)."""
+        n, ok = self._enough(window, center, min_periods)
+        _, sx, sxx, sy, sxy = self._moments(window, center)
+        denom = n * sxx - sx * sx  # n^2 * variance of x; zero when fewer than two points
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = (n * sxy - sx * sy) / denom
+        return np.where(ok & (n >= 2) & (denom > 0), slope, np.nan)
+
+    def weighted_mean(self, window, center=False, min_periods=None):
+        """(inverse-variance weighted moving average, its 1-sigma uncertainty)."""
+        if self.sw is None:
+            raise ValueError("weighted_mean needs the series' uncertainty")
+        n, ok = self._enough(window, center, min_periods)
+        sw = self._sum(self.sw, window, center)
+        ok &= sw > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self._sum(self.swy, window, center) / sw + self.y0
+            return np.where(ok, mean, np.nan), np.where(ok, 1.0 / np.sqrt(sw), np.nan)
+
+def moving_average(values, window, center=False, min_periods=None):
+    return RollingKernel(values).mean(window, center, min_periods)
+
+def rolling_slope(values, window, x=None, center=False, min_periods=None):
+    return RollingKernel(values, x=x).slope(window, center, min_periods)
+
+def weighted_moving_average(values, uncertainty, window, center=False, min_periods=None):
+    return RollingKernel(values, uncertainty=uncertainty).weighted_mean(window, center, min_periods)
+
+def anomalies(times, values, baseline=BASELINE):
+    """values minus the baseline-period mean; per calendar month when times are datetime64 months."""
+    values = np.asarray(values, dtype=np.float64)
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        months = times.astype('datetime64[M]').astype(np.int64)
+        years, slot = months // 12 + 1970, months % 12
+    else:
+        years, slot = times.astype(np.int64), np.zeros(len(times), dtype=np.int64)
+    in_base = (years >= baseline[0]) & (years <= baseline[1])
+    # Climatology per slot over the baseline; every series in a stack gets its own
+    used = in_base & ~np.isnan(values)
+    climatology = np.full(values.shape[:-1] + (12,), np.nan)
+    for s in np.unique(slot):
+        cols = used & (slot == s)
+        n = cols.sum(-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            climatology[..., s] = np.where(n > 0, np.where(cols, values, 0.0).sum(-1) / n, np.nan)
+    return values - climatology[..., slot]
+
+def load_monthly(csv_path=CSV_FILE, column=TEMP_COLUMN):
+    """(months, values, uncertainty) on a gap-free monthly index; missing months are NaN."""
+    unc_column = column + UNCERTAINTY_SUFFIX
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = ['dt', column] + ([unc_column] if unc_column in header else [])
+    df = pd.read_csv(csv_path, usecols=usecols, dtype={'dt': str})
+    months = parse_dates(df['dt']).astype('datetime64[M]')
+    valid = ~np.isnat(months)
+    months, df = months[valid], df[valid]
+    start = months.min()
+    slots = (months - start).astype(np.int64)
+    index = np.arange(start, start + slots.max() + 1)
+    values = np.full(len(index), np.nan)
+    values[slots] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    uncertainty = None
+    if unc_column in df:
+        uncertainty = np.full(len(index), np.nan)
+        uncertainty[slots] = df[unc_column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return index, values, uncertainty
+
+def _parse_baseline(text):
+    first, last = (int(part) for part in text.split('-'))
+    return first, last
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling trends and anomalies for a monthly temperature series")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--column", default=TEMP_COLUMN, help="Series column; <column>Uncertainty is used for weights")
+    parser.add_argument("--windows", default="12,120,360", help="Comma-separated window lengths in months")
+    parser.add_argument("--baseline", type=_parse_baseline, default=BASELINE, help="Baseline years, e.g. 1951-1980")
+    parser.add_argument("--center", action="store_true", help="Centred instead of trailing windows")
+    parser.add_argument("--out", default="trends.csv", help="Output CSV")
+    args = parser.parse_args()
+
+    months, values, uncertainty = load_monthly(args.csv, args.column)
+    decimal_years = months.astype(np.int64) / 12 + 1970
+    kernel = RollingKernel(values, x=decimal_years, uncertainty=uncertainty)
+    out = {'month': months.astype(str), args.column: values,
+           'anomaly': anomalies(months, values, args.baseline)}
+    for window in (int(w) for w in args.windows.split(',')):
+        out[f'mean_{window}'] = kernel.mean(window, args.center)
+        out[f'slope_{window}_per_decade'] = kernel.slope(window, args.center) * 10
+        if uncertainty is not None:
+            out[f'weighted_mean_{window}'], out[f'weighted_mean_{window}_unc'] = kernel.weighted_mean(window, args.center)
+    pd.DataFrame(out).to_csv(args.out, index=False, float_format='%.5f')
+    print(f"Wrote {len(months)} months x {len(out) - 1} columns to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,65 @@
+import argparse
 import pandas as pd
 import numpy as np
+from catalog import CACHE_DIR, CSV_FILE, load_catalog
+from genre_matrix import build_genre_matrix, genre_counts, genre_means
 
-df = pd.read_csv('netflix_large_clean.csv')
+def genre_report(df):
+    #2. Genre incidence matrix: one sparse row per title, one column per genre (built once)
+    genre_matrix, genre_vocab = build_genre_matrix(df['listed_in'])
 
-#Seperate
-movies = df[df["type"] == "Movie"].copy()
-TvShows = df[df["type"] == "TV Show"].copy()
+    #3. Count
+    counts = genre_counts(genre_matrix, genre_vocab)
 
+    # 4. Average duration of movies by genre
+    # Sparse mat-vec over the movie rows: sum of durations per genre / movies per genre
+    avg_duration_by_genre = genre_means(genre_matrix, genre_vocab, df["type"] == "Movie",
+                                        df['duration_min']).rename('duration_min')
 
+    #5. Average number of seasons by genre (TV shows)
+    avg_seasons_by_genre = genre_means(genre_matrix, genre_vocab, df["type"] == "TV Show",
+                                       df['seasons']).rename('seasons')
+    return counts, avg_duration_by_genre, avg_seasons_by_genre
 
+def main():
+    parser = argparse.ArgumentParser(description="Netflix catalog genre analysis")
+    parser.add_argument("--csv", default=CSV_FILE, help="Catalog CSV")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Parsed-catalog cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the CSV without reading or writing the cache")
+    parser.add_argument("--no-plots", action="store_true", help="Skip the matplotlib windows")
+    args = parser.parse_args()
 
-#1. Covert Duration to numeric
-movies['duration_min']=movies['duration'].str.replace('min','').astype(int)
-TvShows['seasons']=TvShows['duration'].str.replace('Season','').str.replace('s', '').astype(int)
-print(movies)
-print(TvShows)
+    # The loader parses duration (duration_min / seasons) and date_added once and caches the result
+    df = load_catalog(args.csv, cache_dir=None if args.no_cache else args.cache_dir)
 
-#2. Step by step split genre into column
-df['genre_list'] = df['listed_in'].str.split(', ')
-genres = df.explode('genre_list')
-genres = genres.rename(columns={'genre_list':'genre'})
-#print(genres)
+    #Seperate (filters once and reuses the result)
+    movies = df[df["type"] == "Movie"]
+    TvShows = df[df["type"] == "TV Show"]
+    print(movies)
+    print(TvShows)
 
-#3. Count
-genres['genre'].value_counts()
-print(genres)
+    genre_counts_all, avg_duration_by_genre, avg_seasons_by_genre = genre_report(df)
+    print(genre_counts_all)
 
+    print("\nAverage Duration of Movies by Genre:")
+    print(avg_duration_by_genre)
 
+    print("\nAverage Number of Seasons by Genre (TV Shows):")
+    print(avg_seasons_by_genre)
 
+    if args.no_plots:
+        return
 
-# 4. Average duration of movies by genre
+    #6. Simple visualization
+    import matplotlib.pyplot as plt
 
-# First, we need to create a dataframe with movies and their genres
-movies_with_genre = movies.copy()
-movies_with_genre['genre_list'] = movies_with_genre['listed_in'].str.split(', ')
-
-# Explode the genre list to have one row per movie-genre combination
-movies_by_genre = movies_with_genre.explode('genre_list')
-movies_by_genre = movies_by_genre.rename(columns={'genre_list': 'genre'})
-
-# Calculate the average duration by genre
-avg_duration_by_genre = movies_by_genre.groupby('genre')['duration_min'].mean().sort_values(ascending=False)
-
-print("\nAverage Duration of Movies by Genre:")
-print(avg_duration_by_genre)
-
-
-#5. Average number of seasons by genre (TV shows)
-
-# First, we need to create a dataframe with TV shows and their genres
-tvshows_with_genre = TvShows.copy()
-tvshows_with_genre['genre_list'] = tvshows_with_genre['listed_in'].str.split(', ')
-
-# Explode the genre list to have one row per show-genre combination
-tvshows_by_genre = tvshows_with_genre.explode('genre_list')
-tvshows_by_genre = tvshows_by_genre.rename(columns={'genre_list': 'genre'})
-
-# Calculate the average seasons by genre
-avg_seasons_by_genre = tvshows_by_genre.groupby('genre')['seasons'].mean().sort_values(ascending=False)
-
-print("\nAverage Number of Seasons by Genre (TV Shows):")
-print(avg_seasons_by_genre)
-
-
-#6. Simple visualization
-
-import matplotlib.pyplot as plt
-
-# Top genres
-genres['genre'].value_counts().head(10).plot(kind='bar')
-plt.show()
-
-# Movie duration distribution
-movies['duration_min'].plot(kind='hist', bins=20, title="Movie Duration")
-plt.show()
+    # Top genres
+    genre_counts_all.head(10).plot(kind='bar')
+    plt.show()
 
+    # Movie duration distribution
+    movies['duration_min'].plot(kind='hist', bins=20, title="Movie Duration")
+    plt.show()
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Netflix catalog loader: parse once, cache the result, start every analysis from a compact frame
+- duration -> duration_min (movies) / seasons (shows) with one regex pass; odd values become NaN
+- date_added -> datetime64, vectorized ("22 July, 2017" and "July 22, 2017" forms)
+- type, rating and country are categoricals; release_year is int16
+- The parsed frame is stored column by column (frame_cache) and rebuilt when the CSV changes
+Usage:
+  from catalog import load_catalog
+  df = load_catalog("netflix_large_clean.csv")
+  movies = df[df["type"] == "Movie"]
+"""
+import re
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Shared helpers (frame cache) live in ../common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "common"))
+from frame_cache import DEFAULT_MAX_BYTES, cached_load
+
+CSV_FILE = 'netflix_large_clean.csv'
+CACHE_DIR = '.netflix_cache'
+DURATION_PATTERN = re.compile(r'^\s*(\d+)\s*(min|seasons?)\s*$', re.IGNORECASE)
+DATE_FORMATS = ('%d %B, %Y', '%B %d, %Y')
+CATEGORICAL = ('type', 'rating', 'country')
+
+def _parse_date_added(text: pd.Series) -> pd.Series:
+    # Try each format on the rows the previous ones could not parse; NaT where none fits
+    text = text.str.strip()
+    dates = pd.to_datetime(text, format=DATE_FORMATS[0], errors='coerce')
+    for fmt in DATE_FORMATS[1:]:
+        missing = dates.isna() & text.notna()
+        if missing.any():
+            dates[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    return dates
+
+def parse_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw catalog columns -> typed columns (adds duration_min, seasons; parses date_added)."""
+    df = df.copy()
+    parts = df['duration'].str.extract(DURATION_PATTERN)
+    number = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    is_min = parts[1].str.lower().eq('min').fillna(False).to_numpy(dtype=bool)
+    is_season = parts[1].str.lower().str.startswith('season').fillna(False).to_numpy(dtype=bool)
+    df['duration_min'] = np.where(is_min, number, np.nan).astype(np.float32)
+    df['seasons'] = np.where(is_season, number, np.nan).astype(np.float32)
+    df['date_added'] = _parse_date_added(df['date_added'])
+    df['release_year'] = pd.to_numeric(df['release_year'], errors='coerce').astype(np.float32) \
+        if df['release_year'].isna().any() else df['release_year'].astype(np.int16)
+    for name in CATEGORICAL:
+        df[name] = df[name].astype('category')
+    return df
+
+def read_catalog(csv_path) -> pd.DataFrame:
+    return parse_catalog(pd.read_csv(csv_path))
+
+def load_catalog(csv_path=CSV_FILE, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES) -> pd.DataFrame:
+    """Parsed catalog; from the cache when the CSV is unchanged. cache_dir=None disables caching."""
+    if cache_dir is None:
+        return read_catalog(csv_path)
+    return cached_load(Path(csv_path), read_catalog, Path(cache_dir), max_bytes=max_bytes)
@@ -0,0 +1,50 @@
+"""
+Title x genre incidence matrix (scipy CSR) built once from `listed_in`
+- Row i is title i, column j is genre vocab[j]; no exploded copy of the frame is made
+- build_incidence_matrix() does the same for any delimited token column (cast, director, words)
+- Per-genre counts and means are sparse matrix-vector products:
+    counts = M.T @ 1,  mean(v) = (M.T @ v) / (M.T @ has_v)
+Usage:
+  matrix, vocab = build_genre_matrix(df["listed_in"])
+  cast_matrix, names = build_incidence_matrix(df["cast"], name="cast")
+  genre_counts(matrix, vocab)
+  genre_means(matrix, vocab, movies_mask, df["duration_min"])
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SEPARATOR = ', '
+
+def build_incidence_matrix(series: pd.Series, sep: str = SEPARATOR,
+                           name: str | None = None) -> tuple[sparse.csr_matrix, pd.Index]:
+    """(CSR matrix rows x tokens, token vocabulary sorted and named `name`).
+    Each value is split on `sep`; a token repeated within one value counts once per occurrence."""
+    lists = series.str.split(sep)
+    lengths = lists.str.len().fillna(0).to_numpy(dtype=np.int64)  # missing value = no tokens
+    flat = [token for tokens in lists.dropna() for token in tokens]
+    codes, vocab = pd.factorize(pd.Series(flat, dtype=object), sort=True)
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    data = np.ones(len(codes), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, codes, indptr), shape=(len(series), len(vocab)))
+    return matrix, pd.Index(vocab, name=name)
+
+def build_genre_matrix(listed_in: pd.Series, sep: str = SEPARATOR) -> tuple[sparse.csr_matrix, pd.Index]:
+    """(CSR matrix titles x genres, genre vocabulary sorted by name)."""
+    return build_incidence_matrix(listed_in, sep, name='genre')
+
+def genre_counts(matrix: sparse.csr_matrix, vocab: pd.Index, rows=None) -> pd.Series:
+    """Titles per genre (optionally only where `rows` is True), largest first."""
+    weights = np.ones(matrix.shape[0]) if rows is None else np.asarray(rows, dtype=np.float64)
+    counts = pd.Series(matrix.T @ weights, index=vocab, name='count').astype(np.int64)
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+def genre_means(matrix: sparse.csr_matrix, vocab: pd.Index, rows, values) -> pd.Series:
+    """Mean of `values` per genre over the titles where `rows` is True; NaN values are skipped."""
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    use = np.asarray(rows, dtype=bool) & ~np.isnan(values)
+    totals = matrix.T @ np.where(use, values, 0.0)
+    counts = matrix.T @ use.astype(np.float64)
+    present = counts > 0
+    means = pd.Series(totals[present] / counts[present], index=vocab[present])
+    return means.sort_values(ascending=False, kind='stable')
@@ -0,0 +1,193 @@
+"""
+Persistent inverted indexes over the catalog's cast, director and country columns
+- For each field: a sorted vocabulary and, per name, a sorted int32 array of title rows (postings)
+- The forward direction (title -> names) is kept too, for "which directors work with this actor"
+- Actor x actor co-occurrence counts are a sparse matrix (M.T @ M of the title x actor matrix)
+- Arrays are .npy files opened memory-mapped; a lookup is a binary search plus a slice
+- The index records the CSV's size/mtime and is rebuilt when the catalog changes
+Usage:
+  python people_index.py build
+  python people_index.py query --cast "Actor 1" --director "Director 3"
+  python people_index.py query --cast "Actor 1" --cast "Actor 7" --any
+  python people_index.py costars --cast "Actor 1"
+  idx = open_index(); idx.all_of(idx.titles("cast", "Actor 1"), idx.titles("country", "India"))
+"""
+import argparse
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from catalog import CSV_FILE, load_catalog
+from genre_matrix import build_incidence_matrix
+
+INDEX_DIR = '.netflix_index'
+INDEX_FORMAT = 1
+FIELDS = ('cast', 'director', 'country')
+META_FILE = 'meta.json'
+EMPTY = np.array([], dtype=np.int32)
+
+def _signature(csv_path):
+    st = Path(csv_path).stat()
+    return {'path': str(Path(csv_path).resolve()), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def build_index(csv_path=CSV_FILE, index_dir=INDEX_DIR, df=None):
+    """Write the indexes for every field; returns the index metadata."""
+    df = load_catalog(csv_path) if df is None else df
+    index_dir = Path(index_dir)
+    tmp = index_dir.with_name(index_dir.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / 'show_id.npy', df['show_id'].to_numpy(dtype=str))
+    sizes = {}
+    for field in FIELDS:
+        matrix, vocab = build_incidence_matrix(df[field].astype(object), name=field)
+        matrix.sum_duplicates()
+        matrix.data[:] = 1  # a name listed twice on one title still counts once
+        postings = matrix.tocsc()
+        postings.sort_indices()
+        np.save(tmp / f'{field}.vocab.npy', vocab.to_numpy(dtype=str))
+        np.save(tmp / f'{field}.postings_ptr.npy', postings.indptr.astype(np.int64))
+        np.save(tmp / f'{field}.postings.npy', postings.indices.astype(np.int32))
+        np.save(tmp / f'{field}.forward_ptr.npy', matrix.indptr.astype(np.int64))
+        np.save(tmp / f'{field}.forward.npy', matrix.indices.astype(np.int32))
+        if field == 'cast':
+            sparse.save_npz(tmp / 'cast_cooccurrence.npz', (matrix.T @ matrix).tocsr().astype(np.int32))
+        sizes[field] = len(vocab)
+    meta = {'format': INDEX_FORMAT, 'titles': int(len(df)), 'names': sizes, 'source': _signature(csv_path)}
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp, index_dir)
+    return meta
+
+class PeopleIndex:
+    """Read side; every array is memory-mapped, so opening the index reads almost nothing."""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / META_FILE).read_text(encoding='utf-8'))
+        if self.meta.get('format') != INDEX_FORMAT:
+            raise ValueError(f"{self.index_dir} is index format {self.meta.get('format')}; rebuild it")
+        self.show_id = self._load('show_id')
+        self._fields = {}
+        self._cooccurrence = None
+
+    def _load(self, name):
+        return np.load(self.index_dir / f'{name}.npy', mmap_mode='r')
+
+    def _field(self, field):
+        if field not in FIELDS:
+            raise KeyError(f"unknown field {field!r}; expected one of {FIELDS}")
+        if field not in self._fields:
+            self._fields[field] = {part: self._load(f'{field}.{part}')
+                                   for part in ('vocab', 'postings_ptr', 'postings', 'forward_ptr', 'forward')}
+        return self._fields[field]
+
+    def _term(self, field, name):
+        vocab = self._field(field)['vocab']
+        i = int(np.searchsorted(vocab, name))
+        return i if i < len(vocab) and vocab[i] == name else None
+
+    def titles(self, field, name):
+        """Sorted title rows listing `name` in `field` (a view; empty if unknown)."""
+        f, i = self._field(field), self._term(field, name)
+        if i is None:
+            return EMPTY
+        return f['postings'][f['postings_ptr'][i]:f['postings_ptr'][i + 1]]
+
+    @staticmethod
+    def all_of(*postings):
+        # Intersect smallest first; each step keeps the candidates found by binary search in the next list
+        postings = sorted(postings, key=len)
+        if not postings:
+            return EMPTY
+        result = np.asarray(postings[0])
+        for other in postings[1:]:
+            if len(result) == 0:
+                break
+            pos = np.searchsorted(other, result)
+            pos[pos == len(other)] = 0
+            result = result[np.asarray(other)[pos] == result] if len(other) else EMPTY
+        return result
+
+    @staticmethod
+    def any_of(*postings):
+        if not postings:
+            return EMPTY
+        return np.unique(np.concatenate([np.asarray(p) for p in postings]))
+
+    def names_for(self, field, rows):
+        """Counts of each `field` name over the given title rows, largest first."""
+        f = self._field(field)
+        rows = np.asarray(rows, dtype=np.int64)
+        starts, ends = f['forward_ptr'][rows], f['forward_ptr'][rows + 1]
+        if len(rows) == 0 or (ends - starts).sum() == 0:
+            return pd.Series(dtype=np.int64)
+        # Gather the forward slices of all rows at once
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        codes, counts = np.unique(f['forward'][offsets], return_counts=True)
+        return pd.Series(counts, index=f['vocab'][codes]).sort_values(ascending=False, kind='stable')
+
+    def related(self, field, name, other_field):
+        """e.g. related('cast', 'Actor 1', 'director'): directors of that actor's titles with counts."""
+        return self.names_for(other_field, self.titles(field, name))
+
+    def costars(self, actor):
+        """Actors sharing titles with `actor` and how many, largest first."""
+        i = self._term('cast', actor)
+        if i is None:
+            return pd.Series(dtype=np.int64)
+        if self._cooccurrence is None:
+            self._cooccurrence = sparse.load_npz(self.index_dir / 'cast_cooccurrence.npz')
+        row = self._cooccurrence.getrow(i)
+        vocab = self._field('cast')['vocab']
+        counts = pd.Series(row.data, index=vocab[row.indices])
+        return counts.drop(actor, errors='ignore').sort_values(ascending=False, kind='stable')
+
+    def is_stale(self):
+        source = self.meta['source']
+        if not Path(source['path']).exists():
+            return False
+        return _signature(source['path']) != source
+
+def open_index(csv_path=CSV_FILE, index_dir=INDEX_DIR):
+    """Open the index, (re)building it first if it is missing or older than the CSV."""
+    try:
+        index = PeopleIndex(index_dir)
+        if not index.is_stale() and index.meta['source']['path'] == str(Path(csv_path).resolve()):
+            return index
+    except (OSError, ValueError):
+        pass
+    build_index(csv_path, index_dir)
+    return PeopleIndex(index_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Inverted indexes over cast, director and country")
+    parser.add_argument("command", choices=("build", "query", "costars"))
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    for field in FIELDS:
+        parser.add_argument(f"--{field}", action="append", default=[], help=f"{field} name (repeatable)")
+    parser.add_argument("--any", action="store_true", help="query: titles matching any name instead of all")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        meta = build_index(args.csv, args.index_dir)
+        print(f"Indexed {meta['titles']} titles: " + ", ".join(f"{n} {f} names" for f, n in meta['names'].items()))
+        return
+    index = open_index(args.csv, args.index_dir)
+    if args.command == 'costars':
+        for actor in args.cast:
+            print(f"Co-stars of {actor}:")
+            print(index.costars(actor).head(20).to_string())
+        return
+    postings = [index.titles(field, name) for field in FIELDS for name in getattr(args, field)]
+    rows = index.any_of(*postings) if args.any else index.all_of(*postings)
+    print(f"{len(rows)} titles")
+    print(" ".join(index.show_id[rows][:50]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+BM25 full-text search over Netflix title, description and listed_in
+- Tokenizer: lowercase word runs, a short stopword list dropped
+- On-disk inverted index: per term, doc ids delta + varint (LEB128) encoded in one byte blob,
+  term frequencies alongside; every array is memory-mapped at query time
+- Postings are cut into blocks of 128 with a per-block score bound, so top-k ranking decodes only
+  the blocks that can still reach the k-th score (exact results, common terms mostly skipped)
+- Top-k BM25 ranking with optional genre / type filters
+- Incremental: add() writes a new segment for show_ids not indexed yet; queries read all
+  segments with collection-wide statistics, so scores match a single rebuilt index
+Usage:
+  python search_index.py build
+  python search_index.py add --csv new_titles.csv
+  python search_index.py query "space station crew" --genre Sci-Fi --type Movie -k 10
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from catalog import CSV_FILE, load_catalog
+from genre_matrix import build_incidence_matrix
+
+INDEX_DIR = '.netflix_search'
+INDEX_FORMAT = 1
+META_FILE = 'meta.json'
+TEXT_FIELDS = ('title', 'description', 'listed_in')
+TOKEN_PATTERN = re.compile(r'\w+')
+STOPWORDS = frozenset('a an and are as at be by for from in is it of on or that the this to with'.split())
+K1, B = 1.2, 0.75
+BLOCK = 128          # postings per block
+FIRST_BATCH = 16     # blocks scored before the first pruning threshold is taken
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+# ---------- varint (LEB128) coding, vectorized ----------
+def varint_lengths(values: np.ndarray) -> np.ndarray:
+    # Bytes per value: 7 payload bits each
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21, 28, 35):
+        nbytes += values >= (1 << shift)
+    return nbytes
+
+def varint_encode(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = varint_lengths(values)
+    ends = np.cumsum(nbytes)
+    out = np.empty(int(ends[-1]) if len(values) else 0, dtype=np.uint8)
+    starts = ends - nbytes
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        has = nbytes > k
+        byte = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (nbytes[has] - 1 > k).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = (byte | more).astype(np.uint8)
+    return out
+
+def varint_decode(data: np.ndarray) -> np.ndarray:
+    data = np.asarray(data, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)  # last byte of every value, holding its highest bits
+    nbytes = np.diff(ends, prepend=-1)
+    values = data[ends].astype(np.int64)
+    # Fold in the lower 7-bit groups, one pass per extra byte (gaps are mostly a single byte)
+    for k in range(1, int(nbytes.max()) if len(ends) else 0):
+        more = np.flatnonzero(nbytes > k)
+        values[more] = (values[more] << 7) | (data[ends[more] - k] & 0x7F)
+    return values
+
+# ---------- building ----------
+def _documents(df: pd.DataFrame) -> pd.Series:
+    return df[list(TEXT_FIELDS)].astype(object).fillna('').astype(str).agg(' '.join, axis=1)
+
+def _write_segment(seg: Path, df: pd.DataFrame):
+    seg.mkdir(parents=True)
+    tokens = _documents(df).map(tokenize)
+    lengths = tokens.str.len().to_numpy(dtype=np.int64)
+    doc_ids = np.repeat(np.arange(len(df), dtype=np.int64), lengths)
+    codes, vocab = pd.factorize(pd.Series([t for doc in tokens for t in doc], dtype=object), sort=True)
+    # One (term, doc) pair per posting, ordered by term then doc; tf = its multiplicity
+    pairs, tf = np.unique(codes.astype(np.int64) * len(df) + doc_ids, return_counts=True)
+    terms, docs = pairs // max(len(df), 1), pairs % max(len(df), 1)
+    doc_freq = np.bincount(terms, minlength=len(vocab))
+    doc_ptr = np.concatenate([[0], np.cumsum(doc_freq)])
+    # Gaps restart at every term: first doc id as-is, then differences
+    gaps = np.diff(docs, prepend=0)
+    gaps[doc_ptr[:-1][doc_freq > 0]] = docs[doc_ptr[:-1][doc_freq > 0]]
+    offsets = np.concatenate([[0], np.cumsum(varint_lengths(gaps))])
+    # Each term's postings are cut into blocks of BLOCK docs; per block keep where its bytes start,
+    # its last doc id (to find the block holding a doc) and its largest tf / shortest doc (score bound)
+    block_ptr = np.concatenate([[0], np.cumsum(-(-doc_freq // BLOCK))])
+    starts = np.flatnonzero((np.arange(len(docs)) - doc_ptr[terms]) % BLOCK == 0)
+    ends = np.append(starts[1:], len(docs)) - 1
+    if len(starts):
+        block_max_tf = np.maximum.reduceat(tf, starts)
+        block_min_len = np.minimum.reduceat(lengths[docs], starts)
+    else:
+        block_max_tf = block_min_len = np.zeros(0, dtype=np.int64)
+
+    matrix, genres = build_incidence_matrix(df['listed_in'].astype(object), name='genre')
+    genre_postings = matrix.tocsc()
+    genre_postings.sort_indices()
+    types = df['type'].astype(object).fillna('').astype(str)
+    type_codes, type_labels = pd.factorize(types, sort=True)
+
+    arrays = {
+        'vocab': np.asarray(vocab, dtype=str), 'doc_freq': doc_freq.astype(np.int32),
+        'doc_ptr': doc_ptr.astype(np.int64), 'block_ptr': block_ptr.astype(np.int64),
+        'block_byte': np.append(offsets[starts], offsets[-1]).astype(np.int64),
+        'block_last': docs[ends].astype(np.int32),
+        'block_max_tf': np.minimum(block_max_tf, np.iinfo(np.uint16).max).astype(np.uint16),
+        'block_min_len': block_min_len.astype(np.int32),
+        'postings': varint_encode(gaps), 'tf': np.minimum(tf, np.iinfo(np.uint16).max).astype(np.uint16),
+        'doc_len': lengths.astype(np.int32), 'show_id': df['show_id'].to_numpy(dtype=str),
+        'type': type_codes.astype(np.int16),
+        'genre_ptr': genre_postings.indptr.astype(np.int64), 'genre_docs': genre_postings.indices.astype(np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(seg / f'{name}.npy', array)
+    labels = {'genres': [str(g) for g in genres], 'types': [str(t) for t in type_labels]}
+    (seg / 'labels.json').write_text(json.dumps(labels), encoding='utf-8')
+    return {'name': seg.name, 'docs': int(len(df)), 'tokens': int(lengths.sum())}
+
+def _save_meta(index_dir: Path, meta: dict):
+    tmp = index_dir / (META_FILE + '.tmp')
+    tmp.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    os.replace(tmp, index_dir / META_FILE)  # segments become visible only once meta lists them
+
+def build_index(csv_path=CSV_FILE, index_dir=INDEX_DIR, df=None) -> dict:
+    df = load_catalog(csv_path) if df is None else df
+    index_dir = Path(index_dir)
+    shutil.rmtree(index_dir, ignore_errors=True)
+    index_dir.mkdir(parents=True)
+    meta = {'format': INDEX_FORMAT, 'segments': [_write_segment(index_dir / 'seg-00000', df)]}
+    _save_meta(index_dir, meta)
+    return meta
+
+def add_titles(df: pd.DataFrame, index_dir=INDEX_DIR) -> int:
+    """Index the rows whose show_id is not in the index yet, as a new segment; returns how many."""
+    index = SearchIndex(index_dir)
+    known = set()
+    for seg in index.segments:
+        known.update(seg.show_id.tolist())
+    new = df[~df['show_id'].astype(str).isin(known)].drop_duplicates('show_id')
+    if new.empty:
+        return 0
+    meta = index.meta
+    name = f"seg-{len(meta['segments']):05d}"
+    meta['segments'].append(_write_segment(index.index_dir / name, new.reset_index(drop=True)))
+    _save_meta(index.index_dir, meta)
+    return len(new)
+
+# ---------- querying ----------
+class _Segment:
+    def __init__(self, path: Path):
+        for name in ('vocab', 'doc_freq', 'doc_ptr', 'block_ptr', 'block_byte', 'block_last', 'block_max_tf',
+                     'block_min_len', 'postings', 'tf', 'doc_len', 'show_id', 'type', 'genre_ptr', 'genre_docs'):
+            setattr(self, name, np.load(path / f'{name}.npy', mmap_mode='r'))
+        labels = json.loads((path / 'labels.json').read_text(encoding='utf-8'))
+        self.genres, self.types = labels['genres'], labels['types']
+
+    def term(self, token):
+        i = int(np.searchsorted(self.vocab, token))
+        return i if i < len(self.vocab) and self.vocab[i] == token else None
+
+    def blocks_of(self, i):
+        return slice(int(self.block_ptr[i]), int(self.block_ptr[i + 1]))
+
+    def bounds(self, i, idf, avgdl):
+        # Best BM25 contribution any doc in each block can get: largest tf over the shortest doc
+        blocks = self.blocks_of(i)
+        tf = self.block_max_tf[blocks].astype(np.float64)
+        return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * self.block_min_len[blocks] / avgdl))
+
+    def decode(self, i, blocks):
+        """Doc ids and tfs in the given blocks (positions within term i's blocks, ascending)."""
+        g = self.block_ptr[i] + blocks
+        start, nbytes = self.block_byte[g], self.block_byte[g + 1] - self.block_byte[g]
+        gaps = varint_decode(self.postings[np.repeat(start - np.cumsum(nbytes) + nbytes, nbytes) + np.arange(nbytes.sum())])
+        counts = np.minimum(BLOCK, self.doc_freq[i] - blocks * BLOCK)
+        first = np.cumsum(counts) - counts
+        # Prefix sum of the gaps, restarted at every block from the previous block's last doc id
+        base = np.where(blocks > 0, self.block_last[g - 1], 0)
+        total = np.cumsum(gaps)
+        docs = total - np.repeat(total[first] - gaps[first] - base, counts)
+        tf = self.tf[np.repeat(self.doc_ptr[i] + blocks * BLOCK - first, counts) + np.arange(len(docs))]
+        return docs, tf.astype(np.float64)
+
+    def allowed(self, genre=None, type_=None):
+        """Boolean mask over the segment's docs, or None when there is no filter."""
+        if genre is None and type_ is None:
+            return None
+        keep = np.ones(len(self.doc_len), dtype=bool)
+        if type_ is not None:
+            keep &= np.asarray(self.type) == (self.types.index(type_) if type_ in self.types else -1)
+        if genre is not None:
+            in_genre = np.zeros(len(keep), dtype=bool)
+            if genre in self.genres:
+                g = self.genres.index(genre)
+                in_genre[self.genre_docs[self.genre_ptr[g]:self.genre_ptr[g + 1]]] = True
+            keep &= in_genre
+        return keep
+
+    def top(self, terms, k, avgdl, allowed=None):
+        """Doc ids and exact scores of the k best docs (plus ties) for (term, idf) pairs.
+
+        MaxScore with block bounds: terms go rarest first; a block is decoded only if its bound plus the
+        bounds of the terms still to come can reach the current k-th best score, so blocks of very common
+        terms are mostly skipped. Candidates are then completed with the blocks that hold them.
+        """
+        terms = sorted(terms, key=lambda t: int(self.doc_freq[t[0]]))
+        bounds = [self.bounds(i, idf, avgdl) for i, idf in terms]
+        upper = [b.max() for b in bounds]
+        decoded = [np.zeros(len(b), dtype=bool) for b in bounds]
+        score = np.zeros(len(self.doc_len))
+        found = []
+
+        def add(j, blocks, keep):
+            i, idf = terms[j]
+            docs, tf = self.decode(i, blocks)
+            decoded[j][blocks] = True
+            if keep is not None:
+                docs, tf = docs[keep[docs]], tf[keep[docs]]
+            norm = K1 * (1 - B + B * self.doc_len[docs] / avgdl)
+            new = docs[score[docs] == 0]  # every contribution is > 0, so 0 means unseen
+            score[docs] += idf * tf * (K1 + 1) / (tf + norm)
+            return new
+
+        for j in range(len(terms)):
+            rest = sum(upper[j + 1:])
+            order = np.argsort(-bounds[j], kind='stable')
+            ranked = -bounds[j][order]
+            pos, batch = 0, FIRST_BATCH
+            while pos < len(order):
+                candidates = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+                kth = np.partition(score[candidates], len(candidates) - k)[len(candidates) - k] \
+                    if len(candidates) >= k else 0.0
+                # Blocks whose best doc, plus the most the later terms add, can still reach the k-th score
+                live = np.searchsorted(ranked, -(kth - rest - 1e-9), side='right')
+                if live <= pos:
+                    break
+                found.append(add(j, np.sort(order[pos:min(pos + batch, live)]), allowed))
+                pos, batch = min(pos + batch, live), batch * 2
+        candidates = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        # Fill in the contributions from blocks that were skipped but hold a candidate
+        member = np.zeros(len(score), dtype=bool)
+        member[candidates] = True
+        for j, (i, _) in enumerate(terms):
+            last = self.block_last[self.blocks_of(i)]
+            holds = np.zeros(len(last) + 1, dtype=bool)
+            holds[np.searchsorted(last, candidates)] = True
+            blocks = np.flatnonzero(holds[:-1] & ~decoded[j])
+            if len(blocks):
+                add(j, blocks, member)
+        scores = score[candidates]
+        if len(scores) > k:
+            # Keep everything tied with the k-th score, so the final show_id tie-break is deterministic
+            top = scores >= np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates, scores = candidates[top], scores[top]
+        return candidates, scores
+
+class SearchIndex:
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / META_FILE).read_text(encoding='utf-8'))
+        if self.meta.get('format') != INDEX_FORMAT:
+            raise ValueError(f"{self.index_dir} is index format {self.meta.get('format')}; rebuild it")
+        self.segments = [_Segment(self.index_dir / s['name']) for s in self.meta['segments']]
+        self.docs = sum(s['docs'] for s in self.meta['segments'])
+        self.avgdl = sum(s['tokens'] for s in self.meta['segments']) / max(self.docs, 1)
+
+    def search(self, query: str, k: int = 10, genre: str | None = None, type_: str | None = None) -> pd.DataFrame:
+        """Top k titles by BM25 as a frame of show_id and score."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        found = [[seg.term(t) for seg in self.segments] for t in tokens]
+        per_segment = [[] for _ in self.segments]
+        for token_terms in found:
+            # Collection-wide document frequency, so every segment scores with the same idf
+            df_t = sum(int(seg.doc_freq[i]) for seg, i in zip(self.segments, token_terms) if i is not None)
+            if df_t == 0:
+                continue
+            idf = np.log(1 + (self.docs - df_t + 0.5) / (df_t + 0.5))
+            for s, i in enumerate(token_terms):
+                if i is not None:
+                    per_segment[s].append((i, idf))
+        results_id, results_score = [], []
+        for seg, terms in zip(self.segments, per_segment):
+            if not terms:
+                continue
+            docs, scores = seg.top(terms, k, self.avgdl, seg.allowed(genre, type_))
+            results_id.append(np.asarray(seg.show_id[docs]))
+            results_score.append(scores)
+        if not results_id:
+            return pd.DataFrame({'show_id': pd.Series(dtype=str), 'score': pd.Series(dtype=np.float64)})
+        hits = pd.DataFrame({'show_id': np.concatenate(results_id), 'score': np.concatenate(results_score)})
+        return hits.sort_values(['score', 'show_id'], ascending=[False, True], kind='stable').head(k).reset_index(drop=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 search over Netflix titles")
+    parser.add_argument("command", choices=("build", "add", "query"))
+    parser.add_argument("text", nargs="?", default="", help="query text")
+    parser.add_argument("--csv", default=CSV_FILE, help="Catalog (build) or new titles (add)")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--genre", default=None, help="Only titles listed in this genre")
+    parser.add_argument("--type", dest="type_", default=None, help="Movie or TV Show")
+    parser.add_argument("-k", type=int, default=10, help="Results to return")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        meta = build_index(args.csv, args.index_dir)
+        print(f"Indexed {meta['segments'][0]['docs']} titles into {args.index_dir}")
+    elif args.command == 'add':
+        print(f"Added {add_titles(load_catalog(args.csv), args.index_dir)} new titles")
+    else:
+        index = SearchIndex(args.index_dir)
+        print(index.search(args.text, k=args.k, genre=args.genre, type_=args.type_).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+"More like this" for every Netflix title: feature vectors plus an approximate nearest-neighbour index
+- Features: TF-IDF over listed_in, cast, director and description (each block L2-normalised and
+  weighted) plus standardised release_year and duration; rows are unit length, so cosine = dot product
+- Index (IVF): rows are projected to 128 dense dims with a random Gaussian matrix and clustered with
+  k-means into ~sqrt(n) lists; a query scans the nprobe lists nearest to it and re-ranks the best
+  candidates by exact cosine on the sparse features
+- Everything is saved as .npy files and memory-mapped on load; batch queries fan out over a process pool
+- `recall` measures the index against exact (brute-force) search on a sample of titles
+Usage:
+  python similar_titles.py build
+  python similar_titles.py query s1 s42 -k 10
+  python similar_titles.py recall --sample 500 --nprobe 4 8 16 32 --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from catalog import CSV_FILE, load_catalog
+from genre_matrix import build_incidence_matrix
+from search_index import tokenize
+
+INDEX_DIR = '.netflix_similar'
+INDEX_FORMAT = 1
+META_FILE = 'meta.json'
+FIELD_WEIGHTS = {'listed_in': 1.0, 'cast': 1.0, 'director': 0.5, 'description': 1.0}
+NUMERIC_WEIGHT = 0.3  # release_year and duration, each
+DIMS = 128
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 256   # training rows per list
+NPROBE = 16
+RERANK = 400          # candidates re-scored exactly per query
+CHUNK_ROWS = 4096
+
+# ---------- features ----------
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+def _tfidf(counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    # Smoothed idf: log((1 + n) / (1 + df)) + 1, then unit-length rows
+    counts = counts.tocsr()
+    counts.sum_duplicates()
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + counts.shape[0]) / (1 + doc_freq)) + 1
+    return _normalize_rows(counts @ sparse.diags(idf))
+
+def _standardize(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    known = ~np.isnan(values)
+    if not known.any():
+        return np.zeros(len(values))
+    std = values[known].std() or 1.0
+    return np.where(known, (values - values[known].mean()) / std, 0.0)
+
+def build_features(df: pd.DataFrame) -> sparse.csr_matrix:
+    """Unit-length float32 feature rows, one per title (catalog frame from load_catalog)."""
+    words = df['description'].astype(object).fillna('').map(lambda text: ' '.join(tokenize(text)))
+    text = {'listed_in': df['listed_in'].astype(object), 'cast': df['cast'].astype(object),
+            'director': df['director'].astype(object), 'description': words.replace('', np.nan)}
+    blocks = []
+    for field, weight in FIELD_WEIGHTS.items():
+        counts, _ = build_incidence_matrix(text[field], sep=' ' if field == 'description' else ', ', name=field)
+        blocks.append(weight * _tfidf(counts))
+    # Movies are measured in minutes and shows in seasons; each is standardised within its own kind
+    duration = np.where(df['type'].astype(object) == 'Movie', _standardize(df['duration_min']),
+                        _standardize(df['seasons']))
+    numeric = np.column_stack([_standardize(df['release_year']), duration]) * NUMERIC_WEIGHT
+    blocks.append(sparse.csr_matrix(numeric))
+    return _normalize_rows(sparse.hstack(blocks, format='csr')).astype(np.float32)
+
+# ---------- building ----------
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _nearest(vectors, centroids) -> np.ndarray:
+    # Most similar centroid per row, in chunks so the n x lists similarity matrix stays small
+    return np.concatenate([np.argmax(vectors[s:s + CHUNK_ROWS] @ centroids.T, axis=1)
+                           for s in range(0, len(vectors), CHUNK_ROWS)]) if len(vectors) else np.zeros(0, np.int64)
+
+def _kmeans(vectors, lists, rng, iterations=KMEANS_ITERATIONS):
+    """Spherical k-means trained on a sample; returns (unit centroids, list of every row)."""
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), lists * KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        members = sparse.csr_matrix((np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+                                    shape=(lists, len(sample)))
+        sums = members @ sample
+        filled = np.bincount(assign, minlength=lists) > 0  # an empty list keeps its old centroid
+        centroids[filled] = _unit(sums[filled])
+    return centroids.astype(np.float32), _nearest(vectors, centroids)
+
+def _signature(csv_path):
+    st = Path(csv_path).stat()
+    return {'path': str(Path(csv_path).resolve()), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def build_index(csv_path=CSV_FILE, index_dir=INDEX_DIR, df=None, dims=DIMS, lists=None, seed=0) -> dict:
+    """Features, projected vectors and IVF lists for every title; returns the index metadata."""
+    df = load_catalog(csv_path) if df is None else df
+    features = build_features(df)
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((features.shape[1], dims)).astype(np.float32)
+    vectors = _unit(np.asarray(features @ projection, dtype=np.float32))
+    lists = min(lists or max(1, int(np.sqrt(len(df)))), max(len(df), 1))
+    centroids, assign = _kmeans(vectors, lists, rng)
+    # Vectors are stored grouped by list, so probing a list reads one contiguous slice
+    order = np.argsort(assign, kind='stable')
+    position = np.empty(len(order), dtype=np.int32)
+    position[order] = np.arange(len(order), dtype=np.int32)
+
+    index_dir = Path(index_dir)
+    tmp = index_dir.with_name(index_dir.name + '.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    arrays = {
+        'show_id': df['show_id'].to_numpy(dtype=str), 'centroids': centroids,
+        'list_ptr': np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=lists))]).astype(np.int64),
+        'rows': order.astype(np.int32), 'position': position, 'vectors': vectors[order],
+        'features_data': features.data, 'features_indices': features.indices.astype(np.int32),
+        'features_indptr': features.indptr.astype(np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(tmp / f'{name}.npy', array)
+    meta = {'format': INDEX_FORMAT, 'titles': int(len(df)), 'features': int(features.shape[1]),
+            'dims': dims, 'lists': int(lists), 'source': _signature(csv_path)}
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp, index_dir)
+    return meta
+
+# ---------- querying ----------
+class SimilarIndex:
+    """Read side; arrays are memory-mapped, so opening the index is cheap in every worker."""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / META_FILE).read_text(encoding='utf-8'))
+        if self.meta.get('format') != INDEX_FORMAT:
+            raise ValueError(f"{self.index_dir} is index format {self.meta.get('format')}; rebuild it")
+        for name in ('show_id', 'centroids', 'list_ptr', 'rows', 'position', 'vectors'):
+            setattr(self, name, np.load(self.index_dir / f'{name}.npy', mmap_mode='r'))
+        parts = [np.load(self.index_dir / f'features_{p}.npy', mmap_mode='r') for p in ('data', 'indices', 'indptr')]
+        self.features = sparse.csr_matrix(tuple(parts), shape=(self.meta['titles'], self.meta['features']))
+        self._rows_of = None
+
+    def rows_of(self, show_ids) -> np.ndarray:
+        if self._rows_of is None:
+            self._rows_of = pd.Index(np.asarray(self.show_id))
+        rows = self._rows_of.get_indexer(list(show_ids))
+        if (rows < 0).any():
+            raise KeyError(f"unknown show_id(s): {[s for s, r in zip(show_ids, rows) if r < 0]}")
+        return rows
+
+    @staticmethod
+    def _best(row, candidates, scores, k):
+        # The title itself left out; ties broken by row so results are deterministic
+        keep = candidates != row
+        candidates, scores = candidates[keep], scores[keep]
+        if len(scores) > k:
+            cut = np.partition(-scores, k - 1)[k - 1]
+            keep = -scores <= cut
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:k]
+        return candidates[order], scores[order]
+
+    def neighbours(self, rows, k=10, nprobe=NPROBE, rerank=RERANK):
+        """(neighbour rows, cosine scores), each len(rows) x k; -1 / NaN pad titles with fewer candidates."""
+        rows = np.asarray(rows, dtype=np.int64)
+        found = np.full((len(rows), k), -1, dtype=np.int64)
+        scores = np.full((len(rows), k), np.nan, dtype=np.float32)
+        centroids = np.asarray(self.centroids)
+        nprobe = min(nprobe, len(centroids))
+        queries = np.asarray(self.vectors[np.asarray(self.position)[rows]])
+        probes = np.argpartition(-(queries @ centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        for n, (row, query) in enumerate(zip(rows, queries)):
+            starts, ends = self.list_ptr[probes[n]], self.list_ptr[probes[n] + 1]
+            lengths = ends - starts
+            slots = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            approx = self.vectors[slots] @ query
+            if len(slots) > rerank:
+                slots = slots[np.argpartition(-approx, rerank - 1)[:rerank]]
+            candidates = np.asarray(self.rows[slots], dtype=np.int64)
+            exact = (self.features[candidates] @ self.features[row].T).toarray().ravel()
+            top, top_scores = self._best(row, candidates, exact, k)
+            found[n, :len(top)], scores[n, :len(top)] = top, top_scores
+        return found, scores
+
+    def exact(self, rows, k=10):
+        """Brute-force top k by cosine over every title (the reference for recall)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        everything = np.arange(self.features.shape[0])
+        found = np.full((len(rows), k), -1, dtype=np.int64)
+        scores = np.full((len(rows), k), np.nan, dtype=np.float32)
+        for s in range(0, len(rows), 64):
+            block = (self.features[rows[s:s + 64]] @ self.features.T).toarray()
+            for n, row in enumerate(rows[s:s + 64], start=s):
+                top, top_scores = self._best(row, everything, block[n - s], k)
+                found[n, :len(top)], scores[n, :len(top)] = top, top_scores
+        return found, scores
+
+    def similar(self, show_ids, k=10, **options) -> pd.DataFrame:
+        """Long frame: show_id, rank, similar_id, score."""
+        found, scores = self.neighbours(self.rows_of(show_ids), k=k, **options)
+        return _as_frame(self.show_id, list(show_ids), found, scores)
+
+    def is_stale(self):
+        source = self.meta['source']
+        if not Path(source['path']).exists():
+            return False
+        return _signature(source['path']) != source
+
+def _as_frame(show_id, queries, found, scores) -> pd.DataFrame:
+    k = found.shape[1]
+    keep = found.ravel() >= 0
+    return pd.DataFrame({'show_id': np.repeat(queries, k)[keep], 'rank': np.tile(np.arange(1, k + 1), len(queries))[keep],
+                         'similar_id': np.asarray(show_id)[found.ravel()[keep]], 'score': scores.ravel()[keep]})
+
+def open_index(csv_path=CSV_FILE, index_dir=INDEX_DIR):
+    """Open the index, (re)building it first if it is missing or older than the CSV."""
+    try:
+        index = SimilarIndex(index_dir)
+        if not index.is_stale() and index.meta['source']['path'] == str(Path(csv_path).resolve()):
+            return index
+    except (OSError, ValueError):
+        pass
+    build_index(csv_path, index_dir)
+    return SimilarIndex(index_dir)
+
+# ---------- batch queries over a process pool ----------
+_worker_index = None
+
+def _open_worker(index_dir):
+    global _worker_index
+    _worker_index = SimilarIndex(index_dir)
+
+def _query_chunk(job):
+    rows, k, nprobe, rerank, exact = job
+    return _worker_index.exact(rows, k) if exact else _worker_index.neighbours(rows, k, nprobe, rerank)
+
+def batch_neighbours(index_dir, rows, k=10, nprobe=NPROBE, rerank=RERANK, workers=None, exact=False,
+                     chunk_rows=256):
+    """neighbours() (or exact()) for many rows, split into chunks across worker processes."""
+    rows = np.asarray(rows, dtype=np.int64)
+    jobs = [(rows[s:s + chunk_rows], k, nprobe, rerank, exact) for s in range(0, len(rows), chunk_rows)]
+    if workers == 1 or len(jobs) <= 1:
+        _open_worker(str(index_dir))
+        parts = [_query_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker, initargs=(str(index_dir),)) as pool:
+            parts = list(pool.map(_query_chunk, jobs))
+    if not parts:
+        return np.zeros((0, k), dtype=np.int64), np.zeros((0, k), dtype=np.float32)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+def recall(index_dir=INDEX_DIR, sample=500, k=10, nprobes=(NPROBE,), rerank=RERANK, workers=None,
+           seed=0) -> pd.DataFrame:
+    """Recall@k against exact search on a random sample of titles, one row per nprobe setting.
+
+    A returned title counts as a hit if its exact score is at least the k-th exact score,
+    so ties at the boundary are not counted as misses.
+    """
+    index = SimilarIndex(index_dir)
+    rows = np.random.default_rng(seed).choice(index.meta['titles'], min(sample, index.meta['titles']), replace=False)
+    start = time.perf_counter()
+    _, exact_scores = batch_neighbours(index_dir, rows, k, workers=workers, exact=True)
+    exact_ms = 1000 * (time.perf_counter() - start) / max(len(rows), 1)
+    kth = np.nanmin(exact_scores, axis=1, keepdims=True)
+    wanted = np.maximum(np.sum(~np.isnan(exact_scores), axis=1), 1)
+    report = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found, scores = batch_neighbours(index_dir, rows, k, nprobe, rerank, workers)
+        approx_ms = 1000 * (time.perf_counter() - start) / max(len(rows), 1)
+        hits = np.minimum(np.sum((found >= 0) & (scores >= kth - 1e-6), axis=1), wanted)
+        report.append({'nprobe': nprobe, 'recall': float(np.mean(hits / wanted)),
+                       'ms_per_query': approx_ms, 'exact_ms_per_query': exact_ms})
+    return pd.DataFrame(report)
+
+def main():
+    parser = argparse.ArgumentParser(description="Similar-title search over the Netflix catalog")
+    parser.add_argument("command", choices=("build", "query", "recall"))
+    parser.add_argument("show_ids", nargs="*", help="query: titles to find neighbours for")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("-k", type=int, default=10, help="Neighbours per title")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[NPROBE],
+                        help="Lists scanned per query (recall: several values give a sweep)")
+    parser.add_argument("--rerank", type=int, default=RERANK, help="Candidates re-scored exactly")
+    parser.add_argument("--lists", type=int, default=None, help="build: IVF lists (default sqrt(titles))")
+    parser.add_argument("--sample", type=int, default=500, help="recall: titles to test")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        meta = build_index(args.csv, args.index_dir, lists=args.lists)
+        print(f"Indexed {meta['titles']} titles ({meta['features']} features) into {meta['lists']} lists")
+    elif args.command == 'query':
+        if not args.show_ids:
+            parser.error("query needs at least one show_id")
+        index = open_index(args.csv, args.index_dir)
+        try:
+            rows = index.rows_of(args.show_ids)
+        except KeyError as exc:
+            parser.error(exc.args[0])
+        found, scores = batch_neighbours(args.index_dir, rows, args.k, args.nprobe[0], args.rerank, args.workers)
+        print(_as_frame(index.show_id, args.show_ids, found, scores).to_string(index=False))
+    else:
+        index = open_index(args.csv, args.index_dir)
+        report = recall(args.index_dir, args.sample, args.k, args.nprobe, args.rerank, args.workers)
+        print(f"recall@{args.k} against exact search on {min(args.sample, index.meta['titles'])} titles")
+        print(report.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+# The project's scripts are plain modules in the folder above
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from catalog import load_catalog
+
+GENRES = ['Dramas', 'Comedies', 'Thrillers', 'Horror', 'Action', 'Anime', 'Documentaries', 'Sci-Fi', 'Kids']
+COUNTRIES = ['India', 'United States', 'South Korea', 'France', 'Japan']
+WORDS = [f'word{i}' for i in range(400)]
+
+def pick(rng, names, most, missing=0.1):
+    # Comma-joined names (repeats allowed, as in the real catalog) or missing
+    if rng.random() < missing:
+        return None
+    return ', '.join(rng.choice(names, rng.integers(1, most + 1)))
+
+def write_catalog(path, rows=3000, seed=0):
+    """Raw catalog CSV in the netflix_large_clean.csv layout, with Zipf-like description words."""
+    rng = np.random.default_rng(seed)
+    actors = [f'Actor {i}' for i in range(300)]
+    directors = [f'Director {i}' for i in range(80)]
+    weights = 1 / np.arange(1, len(WORDS) + 1)
+    movie = rng.random(rows) < 0.7
+    pd.DataFrame({
+        'show_id': [f's{i + 1}' for i in range(rows)],
+        'type': np.where(movie, 'Movie', 'TV Show'),
+        'title': [f'Title {i + 1}' for i in range(rows)],
+        'director': [pick(rng, directors, 2, 0.3) for _ in range(rows)],
+        'cast': [pick(rng, actors, 6) for _ in range(rows)],
+        'country': rng.choice(COUNTRIES, rows),
+        'date_added': '22 July, 2017',
+        'release_year': rng.integers(1960, 2022, rows),
+        'rating': rng.choice(['TV-14', 'R', 'PG'], rows),
+        'duration': np.where(movie, [f'{m} min' for m in rng.integers(60, 180, rows)],
+                             [f'{s} Seasons' for s in rng.integers(1, 9, rows)]),
+        'listed_in': [pick(rng, GENRES, 3, 0.02) for _ in range(rows)],
+        'description': [' '.join(rng.choice(WORDS, rng.integers(5, 30), p=weights / weights.sum()))
+                        for _ in range(rows)],
+    }).to_csv(path, index=False)
+    return path
+
+@pytest.fixture(scope='session')
+def catalog_csv(tmp_path_factory):
+    return write_catalog(tmp_path_factory.mktemp('catalog') / 'catalog.csv')
+
+@pytest.fixture(scope='session')
+def catalog(catalog_csv):
+    return load_catalog(catalog_csv, cache_dir=None)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from genre_matrix import build_genre_matrix, build_incidence_matrix, genre_counts, genre_means
+
+def exploded(series, sep=', '):
+    # Reference: one row per (title, token) via str.split + explode
+    return series.str.split(sep).explode().dropna().rename('token').reset_index()
+
+def test_matrix_equals_split_explode(catalog):
+    for column in ('listed_in', 'cast', 'director'):
+        matrix, vocab = build_incidence_matrix(catalog[column].astype(object), name=column)
+        pairs = exploded(catalog[column].astype(object))
+        want = pd.crosstab(pairs['index'], pairs['token']).reindex(index=range(len(catalog)), fill_value=0)
+        assert list(vocab) == list(want.columns)
+        np.testing.assert_array_equal(matrix.toarray(), want.to_numpy())
+
+def test_counts_and_means_equal_explode_groupby(catalog):
+    matrix, vocab = build_genre_matrix(catalog['listed_in'].astype(object))
+    frame = catalog.assign(genre=catalog['listed_in'].astype(object).str.split(', ')).explode('genre')
+    frame = frame.dropna(subset=['genre'])
+    # Counts are per listing, as the incidence matrix counts a repeated genre twice
+    want_counts = frame['genre'].value_counts()
+    got_counts = genre_counts(matrix, vocab)
+    pd.testing.assert_series_equal(got_counts.sort_index(), want_counts.sort_index(),
+                                   check_names=False, check_index_type=False)
+    movies = (catalog['type'] == 'Movie').to_numpy()
+    rows = frame[frame['type'] == 'Movie']
+    want_means = rows['duration_min'].astype(np.float64).groupby(rows['genre']).mean()
+    got_means = genre_means(matrix, vocab, movies, catalog['duration_min'])
+    pd.testing.assert_series_equal(got_means.sort_index(), want_means.sort_index(),
+                                   check_names=False, check_index_type=False)
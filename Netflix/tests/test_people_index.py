@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from people_index import FIELDS, PeopleIndex, build_index
+
+@pytest.fixture(scope='module')
+def index(catalog, catalog_csv, tmp_path_factory):
+    index_dir = tmp_path_factory.mktemp('people') / 'index'
+    build_index(catalog_csv, index_dir, catalog)
+    return PeopleIndex(index_dir)
+
+def pairs(catalog, field):
+    # Reference (row, name) pairs via str.split + explode, a name repeated on one title kept once
+    names = catalog[field].astype(object).str.split(', ').explode().dropna()
+    return pd.DataFrame({'row': names.index, 'name': names.to_numpy()}).drop_duplicates()
+
+@pytest.mark.parametrize('field', FIELDS)
+def test_postings_equal_explode(index, catalog, field):
+    want = pairs(catalog, field).groupby('name')['row'].agg(list)
+    assert list(index._field(field)['vocab']) == list(want.index)
+    for name, rows in want.items():
+        np.testing.assert_array_equal(index.titles(field, name), sorted(rows))
+    assert len(index.titles(field, 'Nobody')) == 0
+
+def test_related_and_costars_equal_explode(index, catalog):
+    cast, director = pairs(catalog, 'cast'), pairs(catalog, 'director')
+    actor = cast['name'].value_counts().index[0]
+    rows = cast.loc[cast['name'] == actor, 'row']
+    want = director[director['row'].isin(rows)]['name'].value_counts()
+    got = index.related('cast', actor, 'director')
+    pd.testing.assert_series_equal(got.sort_index(), want.sort_index(), check_names=False, check_dtype=False)
+    costars = cast[cast['row'].isin(rows) & (cast['name'] != actor)]['name'].value_counts()
+    pd.testing.assert_series_equal(index.costars(actor).sort_index(), costars.sort_index(),
+                                   check_names=False, check_dtype=False)
+
+def test_all_of_and_any_of_equal_set_operations(index, catalog):
+    cast = pairs(catalog, 'cast')
+    actors = cast['name'].value_counts().index[:3]
+    postings = [index.titles('cast', a) for a in actors]
+    sets = [set(cast.loc[cast['name'] == a, 'row']) for a in actors]
+    assert index.all_of(postings[0], index.titles('country', 'India')).tolist() == \
+        sorted(sets[0] & set(np.flatnonzero(catalog['country'].astype(object) == 'India')))
+    assert index.all_of(*postings).tolist() == sorted(set.intersection(*sets))
+    assert index.any_of(*postings).tolist() == sorted(set.union(*sets))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from search_index import B, K1, SearchIndex, add_titles, build_index, tokenize, varint_decode, varint_encode
+
+QUERIES = ['word0 word1', 'word3 word17 word250', 'word0 word1 word2 word5 word8', 'word399', 'nothing here']
+
+def brute_force(catalog, query, genre=None, type_=None):
+    # Every document scored term by term with the BM25 formula, no index
+    docs = catalog[['title', 'description', 'listed_in']].astype(object).fillna('').astype(str).agg(' '.join, axis=1)
+    tokens = docs.map(tokenize)
+    lengths = tokens.str.len().to_numpy()
+    avgdl = lengths.mean()
+    score = np.zeros(len(catalog))
+    for term in dict.fromkeys(tokenize(query)):
+        tf = tokens.map(lambda doc: doc.count(term)).to_numpy(dtype=np.float64)
+        df_t = np.count_nonzero(tf)
+        if df_t:
+            idf = np.log(1 + (len(catalog) - df_t + 0.5) / (df_t + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * lengths / avgdl))
+    keep = score > 0
+    if genre is not None:
+        keep &= catalog['listed_in'].astype(object).fillna('').str.split(', ').map(lambda g: genre in g).to_numpy()
+    if type_ is not None:
+        keep &= (catalog['type'].astype(object) == type_).to_numpy()
+    return pd.Series(score[keep], index=catalog['show_id'].to_numpy()[keep])
+
+def assert_top_k(hits, expected, k):
+    # Same k best scores; every returned title carries its brute-force score (ties may swap titles)
+    want = np.sort(expected.to_numpy())[::-1][:k]
+    np.testing.assert_allclose(hits['score'], want, rtol=1e-9)
+    np.testing.assert_allclose(expected[hits['show_id']].to_numpy(), hits['score'], rtol=1e-9)
+
+@pytest.fixture(scope='module')
+def index(catalog, catalog_csv, tmp_path_factory):
+    index_dir = tmp_path_factory.mktemp('search') / 'index'
+    build_index(catalog_csv, index_dir, catalog)
+    return SearchIndex(index_dir)
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('k', [1, 10, 200])
+def test_top_k_equals_brute_force(index, catalog, query, k):
+    assert_top_k(index.search(query, k=k), brute_force(catalog, query), k)
+
+@pytest.mark.parametrize('genre, type_', [('Horror', None), (None, 'TV Show'), ('Kids', 'Movie'), ('Nope', None)])
+def test_filters_equal_brute_force(index, catalog, genre, type_):
+    query = QUERIES[2]
+    assert_top_k(index.search(query, k=10, genre=genre, type_=type_),
+                 brute_force(catalog, query, genre, type_), 10)
+
+def test_segments_score_like_one_index(catalog, tmp_path):
+    index_dir = tmp_path / 'index'
+    build_index(index_dir=index_dir, df=catalog.iloc[:1000].reset_index(drop=True))
+    assert add_titles(catalog.iloc[500:2000], index_dir) == 1000
+    assert add_titles(catalog, index_dir) == 1000
+    index = SearchIndex(index_dir)
+    for query in QUERIES:
+        assert_top_k(index.search(query, k=10), brute_force(catalog, query), 10)
+
+def test_varint_round_trip():
+    values = np.array([0, 1, 127, 128, 16_383, 16_384, 2**31 - 1, 2**35], dtype=np.int64)
+    np.testing.assert_array_equal(varint_decode(varint_encode(values)), values)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from similar_titles import SimilarIndex, batch_neighbours, build_features, build_index, recall
+
+@pytest.fixture(scope='module')
+def index_dir(catalog, catalog_csv, tmp_path_factory):
+    index_dir = tmp_path_factory.mktemp('similar') / 'index'
+    build_index(catalog_csv, index_dir, catalog, lists=20)
+    return index_dir
+
+def brute_force(catalog, rows, k):
+    # Cosine over dense feature rows; ties broken by row like the index
+    features = build_features(catalog).toarray().astype(np.float64)
+    scores = features[rows] @ features.T
+    scores[np.arange(len(rows)), rows] = -np.inf
+    order = np.lexsort((np.broadcast_to(np.arange(len(catalog)), scores.shape), -scores), axis=1)[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+def test_features_are_unit_rows(catalog):
+    features = build_features(catalog)
+    norms = np.sqrt(features.multiply(features).sum(axis=1))
+    np.testing.assert_allclose(norms, 1, rtol=1e-5)
+
+def test_probing_every_list_is_exact(index_dir, catalog):
+    index = SimilarIndex(index_dir)
+    rows = np.random.default_rng(1).choice(len(catalog), 200, replace=False)
+    lists = index.meta['lists']
+    found, scores = index.neighbours(rows, k=10, nprobe=lists, rerank=len(catalog))
+    want_rows, want_scores = brute_force(catalog, rows, 11)
+    np.testing.assert_allclose(scores, want_scores[:, :10], atol=1e-5)
+    # float32 vs float64 rounding can swap near-ties; elsewhere the same titles come back
+    gap = np.abs(np.diff(want_scores, axis=1)) > 1e-5
+    distinct = np.concatenate([gap[:, :1], gap[:, 1:] & gap[:, :-1]], axis=1)
+    want_rows = want_rows[:, :10]
+    np.testing.assert_array_equal(found[distinct], want_rows[distinct])
+    assert (found != rows[:, None]).all()
+
+def test_exact_and_pooled_batches_agree(index_dir, catalog):
+    rows = np.arange(0, len(catalog), 7)
+    index = SimilarIndex(index_dir)
+    lists = index.meta['lists']
+    found, scores = index.exact(rows, k=5)
+    pooled, pooled_scores = batch_neighbours(index_dir, rows, k=5, workers=2, exact=True, chunk_rows=100)
+    np.testing.assert_array_equal(pooled, found)
+    approx, approx_scores = batch_neighbours(index_dir, rows, k=5, nprobe=lists, rerank=len(catalog),
+                                             workers=2, chunk_rows=100)
+    np.testing.assert_allclose(approx_scores, scores, atol=1e-6)
+
+def test_recall_is_one_when_every_list_is_probed(index_dir):
+    lists = SimilarIndex(index_dir).meta['lists']
+    report = recall(index_dir, sample=100, k=10, nprobes=(1, lists), rerank=10_000, workers=1)
+    assert report['recall'].iloc[-1] == 1.0
+    assert report['recall'].iloc[0] <= 1.0
@@ -1,48 +1,75 @@
+import argparse
+import io
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import sys
+import time
+from pathlib import Path
+from expense_agg import aggregate_expenses, top_n
+from heavy_hitters import DEFAULT_CAPACITY, SpaceSaving
+from expense_charts import draw_bar
+
+# Shared helpers (frame cache, stage profiler, chart renderer) live in ../common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "common"))
+from chart_render import FORMATS as CHART_FORMATS, render_charts
+from frame_cache import DEFAULT_MAX_BYTES, cached_load, invalidate
+from stage_profiler import DETAIL_MODES, StageProfiler
 
 # Default paths
 CSV_FILE = "data/myExpenses1.csv"
 OUTPUT_DIR = "outputs"
+TOP_ITEMS = 10
+TOPK_CHUNKSIZE = 100_000
+PROFILE_STAGES = ("load", "summarize", "charts", "summary_text")
 
 def load_data(csv_file):
     return pd.read_csv(csv_file)
 
-def analyze_expenses(df):
+def analyze_expenses(df, aggs=None):
+    # by_item keeps only the TOP_ITEMS largest items, which is all the reports use
+    aggs = aggs if aggs is not None else aggregate_expenses(df)
     summary = {}
-    summary['total_expense'] = df['Amount'].sum()
-    summary['by_category'] = df.groupby('Category')['Amount'].sum().to_dict()
-    summary['by_day'] = df.groupby('day')['Amount'].sum().to_dict()
-    summary['by_item'] = df.groupby('Item')['Amount'].sum().sort_values(ascending=False).to_dict()
+    summary['total_expense'] = aggs['total']
+    summary['by_category'] = aggs['Category'].to_dict()
+    summary['by_day'] = aggs['day'].to_dict()
+    summary['by_item'] = top_n(aggs['Item'], TOP_ITEMS).to_dict()
     return summary
 
-def save_plots(df, output_dir):
-    os.makedirs(output_dir, exist_ok=True)
+def stream_aggregates(csv_file, capacity=DEFAULT_CAPACITY, chunksize=TOPK_CHUNKSIZE):
+    """Same shape as aggregate_expenses(), but items go through a bounded Space-Saving summary.
+
+    Category and day stay exact (they have a handful of values); Item holds at most
+    `capacity` estimated totals, so memory does not grow with item cardinality.
+    """
+    aggs, rows, integral = {"total": 0}, 0, True
+    items = SpaceSaving(capacity)
+    for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+        integral &= pd.api.types.is_integer_dtype(chunk["Amount"].dtype)
+        part = aggregate_expenses(chunk, keys=("Category", "day"))
+        aggs["total"] += part["total"]
+        for key in ("Category", "day"):
+            aggs[key] = part[key] if key not in aggs else pd.concat([aggs[key], part[key]]).groupby(level=0).sum()
+        items.update(chunk["Item"], chunk["Amount"])
+        rows += len(chunk)
+    counts = items.counts.astype("int64") if integral else items.counts  # whole amounts stay whole
+    aggs["Item"] = counts.sort_index().rename("Amount").rename_axis("Item")
+    return aggs, items, rows
 
-    plt.figure(figsize=(6, 4))
-    df.groupby("Category")["Amount"].sum().plot(kind="bar")
-    plt.title("Expenses by Category")
-    plt.ylabel("Amount")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "expenses_by_category.png"))
-    plt.close()
-
-    plt.figure(figsize=(6, 4))
-    df.groupby("day")["Amount"].sum().plot(kind="bar")
-    plt.title("Expenses by Day")
-    plt.ylabel("Amount")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "expenses_by_day.png"))
-    plt.close()
-
-    plt.figure(figsize=(6, 4))
-    df.groupby("Item")["Amount"].sum().nlargest(10).plot(kind="bar")
-    plt.title("Top 10 Expense Items")
-    plt.ylabel("Amount")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "top10_items.png"))
-    plt.close()
+def save_topk_bounds(items, output_dir):
+    # Error bounds for the approximate top items, next to the summary they qualify
+    top = items.top(TOP_ITEMS)
+    top.to_csv(os.path.join(output_dir, "top_items_bounds.csv"))
+    return top
+
+def save_plots(df, output_dir, fmt="png", dpi=100, workers=1, force=False, aggs=None):
+    aggs = aggs if aggs is not None else aggregate_expenses(df)
+    charts = [
+        ("expenses_by_category", draw_bar, aggs["Category"].rename("Expenses by Category"), (6, 4)),
+        ("expenses_by_day", draw_bar, aggs["day"].rename("Expenses by Day"), (6, 4)),
+        ("top10_items", draw_bar, top_n(aggs["Item"], TOP_ITEMS).rename("Top 10 Expense Items"), (6, 4)),
+    ]
+    # Charts whose numbers did not change since the last run are skipped
+    return render_charts(charts, Path(output_dir), fmt=fmt, dpi=dpi, workers=workers, force=force)
 
 def save_summary(summary, output_dir):
     os.makedirs(output_dir, exist_ok=True)
@@ -57,21 +84,210 @@ def save_summary(summary, output_dir):
         for k, v in summary['by_day'].items():
             f.write(f"  {k}: {v}\n")
         f.write("\nTop Items:\n")
-        for k, v in list(summary['by_item'].items())[:10]:
+        for k, v in list(summary['by_item'].items())[:TOP_ITEMS]:
             f.write(f"  {k}: {v}\n")
 
+# ---------- Watch mode: follow rows appended to the CSV ----------
+WATCH_INTERVAL = 1.0   # seconds between size checks
+WATCH_DEBOUNCE = 2.0   # wait for this long without new writes before refreshing
+WATCH_MAX_DELAY = 20.0 # ...but never hold a refresh back longer than this
+
+def _complete_size(csv_file):
+    # Offset just past the last newline; a trailing partial row is still being written
+    with open(csv_file, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            start = max(pos - 65536, 0)
+            f.seek(start)
+            nl = f.read(pos - start).rfind(b"\n")
+            if nl != -1:
+                return start + nl + 1
+            pos = start
+    return 0
+
+def _read_appended(csv_file, columns, start, end):
+    with open(csv_file, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(data), header=None, names=columns)
+
+class RunningTotals:
+    """Category/day/Item sums kept as dicts so appended rows cost O(new rows), not O(file)."""
+
+    def __init__(self, df):
+        aggs = aggregate_expenses(df)
+        self.total = aggs['total']
+        self.sums = {key: aggs[key].to_dict() for key in ('Category', 'day', 'Item')}
+        self.top_items = top_n(aggs['Item'], TOP_ITEMS).to_dict()
+
+    def add(self, df):
+        aggs = aggregate_expenses(df)
+        self.total += aggs['total']
+        for key in self.sums:
+            sums = self.sums[key]
+            for k, v in aggs[key].items():
+                sums[k] = sums.get(k, 0) + v
+        items = self.sums['Item']
+        if (df['Amount'] >= 0).all():
+            # Totals only grew, so the new top items are among the old top items and the touched ones
+            candidates = set(self.top_items) | set(aggs['Item'].index)
+            pool = pd.Series({k: items[k] for k in candidates}).sort_index()
+        else:
+            pool = pd.Series(items).sort_index()  # a refund can push an item out of the top
+        self.top_items = top_n(pool, TOP_ITEMS).to_dict()
+
+    def aggregates(self):
+        aggs = {key: pd.Series(dict(sorted(sums.items())), name='Amount').rename_axis(key)
+                for key, sums in self.sums.items() if key != 'Item'}
+        aggs['Item'] = pd.Series(self.top_items, name='Amount').rename_axis('Item')
+        aggs['total'] = self.total
+        return aggs
+
+def watch(csv_file, output_dir, chart_options, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    def reload():
+        # Read only complete lines, so a row caught mid-write is not counted twice
+        inode, end = os.stat(csv_file).st_ino, _complete_size(csv_file)
+        with open(csv_file, "rb") as f:
+            df = load_data(io.BytesIO(f.read(end)))
+        return RunningTotals(df), list(df.columns), end, inode
+
+    def refresh(totals, last_summary):
+        aggs = totals.aggregates()
+        summary = analyze_expenses(None, aggs)
+        redrawn = save_plots(None, output_dir, aggs=aggs, **chart_options)
+        if summary != last_summary:
+            save_summary(summary, output_dir)
+        print(f"?? Refreshed: {len(redrawn)} chart(s) redrawn, summary {'updated' if summary != last_summary else 'unchanged'}")
+        return summary
+
+    totals, columns, offset, inode = reload()
+    summary = refresh(totals, None)
+    print(f"?? Watching '{csv_file}' for new rows (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            st = os.stat(csv_file)
+            if st.st_ino != inode or st.st_size < offset:
+                print("?? File was replaced or truncated, reloading...")
+                totals, columns, offset, inode = reload()
+                summary = refresh(totals, summary)
+                continue
+            if st.st_size == offset:
+                continue
+            # Debounce: let a burst of appends settle into one refresh
+            first_seen, size = time.monotonic(), st.st_size
+            while time.monotonic() - first_seen < WATCH_MAX_DELAY:
+                time.sleep(debounce)
+                new_size = os.stat(csv_file).st_size
+                if new_size == size:
+                    break
+                size = new_size
+            end = _complete_size(csv_file)
+            if end <= offset:
+                continue
+            new_rows = _read_appended(csv_file, columns, offset, end)
+            totals.add(new_rows)
+            offset = end
+            print(f"?? {len(new_rows)} new row(s)")
+            summary = refresh(totals, summary)
+    except KeyboardInterrupt:
+        print("?? Stopped watching.")
+
+def run_approx(args, prof, chart_options):
+    print("?? Streaming data (approximate top items)...")
+    with prof.stage("summarize") as st:
+        aggs, items, st["rows"] = stream_aggregates(args.csv, args.topk_capacity, args.chunksize)
+        summary = analyze_expenses(None, aggs)
+
+    print("?? Saving plots and summary...")
+    with prof.stage("charts"):
+        save_plots(None, args.outdir, aggs=aggs, **chart_options)
+    with prof.stage("summary_text"):
+        save_summary(summary, args.outdir)
+        top = save_topk_bounds(items, args.outdir)
+
+    print(f"   Top items within +/-{top['error'].max():g} (unlisted items <= {items.floor:g}); "
+          f"{int(top['guaranteed'].sum())}/{len(top)} guaranteed in the true top {TOP_ITEMS}")
+    print(f"? Done! Reports saved in '{args.outdir}' folder.")
+    if args.profile:
+        prof.write_json(Path(args.outdir) / "profile.json")
+        prof.print_table()
+
 def main():
+    parser = argparse.ArgumentParser(description="Personal Expense Analyzer")
+    parser.add_argument("--csv", default=CSV_FILE, help="Path to expenses CSV")
+    parser.add_argument("--outdir", default=OUTPUT_DIR, help="Directory to save reports")
+    parser.add_argument("--cache-dir", default=None, help="Cache parsed data here and reuse it on repeat runs")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help="Evict least recently used cache entries above this size")
+    parser.add_argument("--clear-cache", action="store_true", help="Drop cached entries for --csv before running")
+    parser.add_argument("--chart-format", choices=CHART_FORMATS, default="png", help="Chart file format")
+    parser.add_argument("--chart-dpi", type=float, default=100, help="Chart resolution (lower is faster for bulk runs)")
+    parser.add_argument("--chart-workers", type=int, default=1, help="Draw charts in this many processes")
+    parser.add_argument("--force-charts", action="store_true", help="Redraw charts even if their data is unchanged")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and update the reports as rows are appended to the CSV")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="Watch mode: seconds without new writes before refreshing")
+    parser.add_argument("--topk-mode", choices=("exact", "approx"), default="exact",
+                        help="approx: stream the CSV and keep a bounded Space-Saving summary of items")
+    parser.add_argument("--topk-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="approx mode: item counters kept (more = tighter error bounds)")
+    parser.add_argument("--chunksize", type=int, default=TOPK_CHUNKSIZE, help="approx mode: rows read per chunk")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each stage and save a JSON trace to <outdir>/profile.json")
+    parser.add_argument("--profile-stage", choices=PROFILE_STAGES, default=None,
+                        help="With --profile, also dump cProfile/tracemalloc detail for this stage")
+    parser.add_argument("--profile-mode", choices=DETAIL_MODES, default="cprofile", help="Detail dump type")
+    args = parser.parse_args()
+    if args.profile_stage and not args.profile:
+        parser.error("--profile-stage requires --profile")
+    if args.clear_cache and not args.cache_dir:
+        parser.error("--clear-cache requires --cache-dir")
+    if args.watch:
+        # Watch mode keeps its own running totals; these options would be silently ignored there
+        ignored = [flag for flag, used in (("--cache-dir", args.cache_dir),
+                                           ("--topk-mode approx", args.topk_mode == "approx"),
+                                           ("--profile", args.profile)) if used]
+        if ignored:
+            parser.error(f"--watch cannot be combined with {', '.join(ignored)}")
+    chart_options = {"fmt": args.chart_format, "dpi": args.chart_dpi,
+                     "workers": args.chart_workers, "force": args.force_charts}
+    if args.watch:
+        watch(args.csv, args.outdir, chart_options, debounce=args.debounce)
+        return
+    prof = StageProfiler(detail_stage=args.profile_stage if args.profile else None,
+                         detail_mode=args.profile_mode, dump_dir=args.outdir)
+    if args.topk_mode == "approx":
+        run_approx(args, prof, chart_options)
+        return
+
     print("?? Loading data...")
-    df = load_data(CSV_FILE)
+    with prof.stage("load") as st:
+        if args.cache_dir:
+            if args.clear_cache:
+                invalidate(Path(args.cache_dir), Path(args.csv))
+            df = cached_load(Path(args.csv), load_data, Path(args.cache_dir), max_bytes=int(args.cache_max_mb * 2**20))
+        else:
+            df = load_data(args.csv)
+        st["rows"] = len(df)
 
     print("?? Analyzing...")
-    summary = analyze_expenses(df)
+    with prof.stage("summarize") as st:
+        aggs = aggregate_expenses(df)
+        summary = analyze_expenses(df, aggs)
+        st["rows"] = len(df)
 
     print("?? Saving plots and summary...")
-    save_plots(df, OUTPUT_DIR)
-    save_summary(summary, OUTPUT_DIR)
+    with prof.stage("charts"):
+        save_plots(df, args.outdir, aggs=aggs, **chart_options)
+    with prof.stage("summary_text"):
+        save_summary(summary, args.outdir)
 
-    print(f"? Done! Reports saved in '{OUTPUT_DIR}' folder.")
+    print(f"? Done! Reports saved in '{args.outdir}' folder.")
+    if args.profile:
+        prof.write_json(Path(args.outdir) / "profile.json")
+        prof.print_table()
 
 if __name__ == "__main__":
-    main()
+    main()
@@ -0,0 +1,48 @@
+"""
+Single-pass aggregation for the Personal-Expense reports
+- Each key column is factorized once into integer codes
+- Group sums come from np.bincount over those codes (no per-group Python work)
+- Top-N items use partial selection (np.partition) instead of sorting every item
+The summary and the plots both read from one aggregate_expenses() result.
+"""
+import numpy as np
+import pandas as pd
+
+KEYS = ("Category", "day", "Item")
+
+def group_sums(keys: pd.Series, amounts: np.ndarray, integral: bool = False) -> pd.Series:
+    """Sum of amounts per key, like df.groupby(key)["Amount"].sum(): sorted keys, NaN keys dropped.
+    integral=True rounds the sums back to int64."""
+    try:
+        codes, uniques = pd.factorize(keys, sort=True)
+    except TypeError:  # mixed, unorderable key types
+        codes, uniques = pd.factorize(keys, sort=False)
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=amounts[valid], minlength=len(uniques))
+    if integral:
+        sums = np.rint(sums).astype(np.int64)  # bincount weights are float64; exact below 2**53
+    return pd.Series(sums, index=pd.Index(uniques, name=keys.name), name="Amount")
+
+def aggregate_expenses(df: pd.DataFrame, keys=KEYS) -> dict:
+    """{"total": ..., "<key>": Series of sums per key} for every key column present."""
+    amount = df["Amount"]
+    integral = pd.api.types.is_integer_dtype(amount.dtype)
+    amounts = amount.to_numpy(dtype=np.float64, na_value=0.0)
+    aggs = {"total": amount.sum()}
+    for key in keys:
+        if key in df.columns:
+            aggs[key] = group_sums(df[key], amounts, integral)
+    return aggs
+
+def top_n(sums: pd.Series, n: int = 10) -> pd.Series:
+    """Largest n sums in descending order, ties kept in key order (like Series.nlargest)."""
+    values = sums.to_numpy()
+    if len(values) > n:
+        kth = np.partition(values, len(values) - n)[len(values) - n]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[: n - len(above)]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(len(values))
+    order = idx[np.lexsort((idx, -values[idx]))]
+    return sums.iloc[order]
@@ -0,0 +1,16 @@
+"""
+Chart drawing functions for the personal expense reports
+- Kept out of expense-analyzer.py (run as __main__) so chart worker processes can import them by name
+Usage:
+  render_charts([("expenses_by_day", draw_bar, totals.rename("Expenses by Day"), (6, 4))], outdir)
+"""
+
+def draw_bar(fig, totals):
+    # The series name doubles as the chart title
+    ax = fig.add_subplot()
+    ax.bar(range(len(totals)), totals.values)
+    ax.set_xticks(range(len(totals)), totals.index.astype(str), rotation=90)
+    ax.set_title(totals.name)
+    ax.set_xlabel(totals.index.name)
+    ax.set_ylabel("Amount")
+    fig.tight_layout()
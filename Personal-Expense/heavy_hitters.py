@@ -0,0 +1,85 @@
+"""
+Bounded-memory top-K items (weighted Space-Saving)
+- Keeps at most `capacity` item counters however many distinct items stream past
+- Every kept item has an estimate with  estimate - error <= true total <= estimate
+- Any item that is not kept has a true total <= floor
+- Summaries merge (chunks, workers) with the same guarantees (Cafaro et al., parallel Space-Saving)
+Bounds assume non-negative amounts; refunds (negative rows) make them approximate.
+Usage:
+  hh = SpaceSaving(capacity=1000)
+  for chunk in pd.read_csv(path, chunksize=100_000):
+      hh.update(chunk["Item"], chunk["Amount"])
+  hh.top(10)  # Item, estimate, lower, error, guaranteed
+"""
+import numpy as np
+import pandas as pd
+from expense_agg import group_sums
+
+DEFAULT_CAPACITY = 1000
+
+class SpaceSaving:
+    """Weighted Space-Saving summary over item -> total amount."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.float64)
+        self.errors = pd.Series(dtype=np.float64)
+        self.floor = 0.0  # upper bound on the total of any item that is not kept
+        self.total = 0.0
+
+    @classmethod
+    def from_sums(cls, sums: pd.Series, capacity: int = DEFAULT_CAPACITY) -> "SpaceSaving":
+        # Exact per-item sums (e.g. one chunk) -> summary; truncation keeps the largest
+        hh = cls(capacity)
+        hh.total = float(sums.sum())
+        hh.counts, hh.errors, hh.floor = hh._truncate(sums.astype(np.float64), pd.Series(0.0, index=sums.index), 0.0)
+        return hh
+
+    def _truncate(self, counts: pd.Series, errors: pd.Series, floor: float):
+        if len(counts) <= self.capacity:
+            return counts, errors, floor
+        keep = np.argpartition(-counts.to_numpy(), self.capacity - 1)[: self.capacity]
+        counts, errors = counts.iloc[keep], errors.iloc[keep]
+        # Kept counters are all >= every dropped one, so the smallest kept bounds the dropped items
+        return counts, errors, max(floor, float(counts.min()))
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """New summary covering both inputs; an item missing from one side counts that side's floor."""
+        capacity = min(self.capacity, other.capacity)
+        index = self.counts.index.union(other.counts.index)
+        counts = (self.counts.reindex(index, fill_value=self.floor)
+                  + other.counts.reindex(index, fill_value=other.floor))
+        errors = (self.errors.reindex(index, fill_value=self.floor)
+                  + other.errors.reindex(index, fill_value=other.floor))
+        merged = SpaceSaving(capacity)
+        merged.total = self.total + other.total
+        merged.counts, merged.errors, merged.floor = merged._truncate(counts, errors, self.floor + other.floor)
+        return merged
+
+    def update(self, items: pd.Series, amounts: pd.Series) -> "SpaceSaving":
+        """Fold one chunk of rows in place; the chunk is pre-aggregated so each item costs O(1)."""
+        weights = amounts.to_numpy(dtype=np.float64, na_value=0.0)
+        sums = group_sums(items, weights)
+        merged = self.merge(SpaceSaving.from_sums(sums, self.capacity))
+        self.counts, self.errors, self.floor, self.total = merged.counts, merged.errors, merged.floor, merged.total
+        return self
+
+    def top(self, k: int = 10) -> pd.DataFrame:
+        """Top k by estimate; `guaranteed` marks items certain to be in the true top k."""
+        order = np.lexsort((self.counts.index.astype(str), -self.counts.to_numpy()))
+        counts, errors = self.counts.iloc[order], self.errors.iloc[order]
+        # Largest total any item outside the reported k could have
+        rival = max(self.floor, float(counts.iloc[k]) if len(counts) > k else 0.0)
+        top = pd.DataFrame({
+            "estimate": counts.iloc[:k],
+            "lower": counts.iloc[:k] - errors.iloc[:k],
+            "error": errors.iloc[:k],
+        })
+        top["guaranteed"] = top["lower"] >= rival
+        top.index.name = "Item"
+        return top
+
+    def max_error(self) -> float:
+        return float(self.errors.max()) if len(self.errors) else 0.0
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The project's scripts are plain modules in the folder above
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,38 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from expense_agg import aggregate_expenses, top_n
+
+DATA = Path(__file__).resolve().parent.parent / "data" / "myExpenses1.csv"
+
+def synthetic(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Item": rng.choice([f"item{i}" for i in range(300)], rows),
+        "Category": rng.choice(["alone", "friend", "family", None], rows),
+        "day": rng.choice(["Monday", "Tuesday", "Sunday"], rows),
+        "Amount": rng.integers(1, 500, rows),
+    })
+    df.loc[rng.random(rows) < 0.01, "Item"] = np.nan
+    return df
+
+@pytest.mark.parametrize("df", [pd.read_csv(DATA), synthetic()], ids=["sample", "synthetic"])
+def test_bincount_sums_match_groupby(df):
+    aggs = aggregate_expenses(df)
+    assert aggs["total"] == df["Amount"].sum()
+    for key in ("Category", "day", "Item"):
+        want = df.groupby(key)["Amount"].sum()
+        pd.testing.assert_series_equal(aggs[key], want, check_names=False, check_index_type=False)
+
+def test_float_amounts_match_groupby():
+    df = synthetic(seed=1)
+    df["Amount"] = df["Amount"] / 7
+    pd.testing.assert_series_equal(aggregate_expenses(df)["Item"], df.groupby("Item")["Amount"].sum(),
+                                   check_names=False, check_index_type=False)
+
+@pytest.mark.parametrize("n", [1, 10, 50, 1000])
+def test_top_n_matches_nlargest(n):
+    sums = aggregate_expenses(synthetic(seed=2))["Item"]
+    sums.iloc[::17] = sums.iloc[0]  # plenty of ties
+    pd.testing.assert_series_equal(top_n(sums, n), sums.nlargest(n))
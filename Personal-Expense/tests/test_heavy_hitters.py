@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heavy_hitters import SpaceSaving
+
+def skewed_rows(rows=20_000, items=2000, seed=0):
+    # Zipf-like item popularity with positive amounts
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, items + 1) ** 1.1
+    names = np.array([f"item{i:04d}" for i in range(items)])
+    return pd.DataFrame({"Item": rng.choice(names, rows, p=popularity / popularity.sum()),
+                         "Amount": rng.integers(1, 100, rows)})
+
+def stream(df, capacity, chunksize):
+    hh = SpaceSaving(capacity)
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        hh.update(chunk["Item"], chunk["Amount"])
+    return hh
+
+@pytest.mark.parametrize("capacity,chunksize", [(50, 1000), (200, 777), (500, 20_000)])
+def test_error_bounds_hold(capacity, chunksize):
+    df = skewed_rows()
+    true = df.groupby("Item")["Amount"].sum()
+    hh = stream(df, capacity, chunksize)
+    assert len(hh.counts) <= capacity
+    assert hh.total == true.sum()
+    kept = true.reindex(hh.counts.index)
+    assert (hh.counts - hh.errors <= kept + 1e-9).all()
+    assert (kept <= hh.counts + 1e-9).all()
+    assert (true.drop(hh.counts.index) <= hh.floor + 1e-9).all()
+    top = hh.top(10)
+    true_top = set(true.nlargest(10).index)
+    assert set(top.index[top["guaranteed"]]) <= true_top
+
+def test_exact_when_every_item_fits():
+    df = skewed_rows(rows=5000, items=300)
+    hh = stream(df, capacity=300, chunksize=512)
+    assert hh.floor == 0 and hh.max_error() == 0
+    # Unit amounts: the estimates are exactly value_counts
+    counts = stream(df.assign(Amount=1), capacity=300, chunksize=512).top(10)["estimate"]
+    want = df["Item"].value_counts().sort_index(kind="stable").sort_values(ascending=False, kind="stable").head(10)
+    pd.testing.assert_series_equal(counts, want.astype(np.float64), check_names=False)
+    assert hh.top(10)["guaranteed"].all()
+
+def test_merge_matches_a_single_stream():
+    df = skewed_rows(seed=3)
+    left, right = stream(df.iloc[:9000], 100, 1000), stream(df.iloc[9000:], 100, 1000)
+    merged = left.merge(right)
+    true = df.groupby("Item")["Amount"].sum()
+    kept = true.reindex(merged.counts.index)
+    assert (merged.counts - merged.errors <= kept + 1e-9).all() and (kept <= merged.counts + 1e-9).all()
+    assert (true.drop(merged.counts.index) <= merged.floor + 1e-9).all()
@@ -1,8 +1,9 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.metrics import confusion_matrix, roc_curve, precision_recall_curve
 import joblib
+from threshold_sweep import confusion_at, summarize, sweep
 
 # 1️⃣ Load dataset
 df = pd.read_csv("student_performance_dataset.csv")
@@ -33,9 +34,13 @@ plt.title("Target Distribution (0=Fail, 1=Pass)")
 plt.savefig("target_distribution.png")
 plt.show()
 
-# 2. Confusion Matrix
-y_pred = best_model.predict(X_test)
-cm = confusion_matrix(y_test, y_pred)
+# Scores are sorted once; confusion matrix, ROC and PR all come from the same cumulative counts
+probs = best_model.predict_proba(X_test)[:,1]
+curve = sweep(y_test, probs)
+print(summarize(curve))
+
+# 2. Confusion Matrix (predict() = P(pass) > 0.5, i.e. >= the next float above 0.5)
+cm = confusion_at(curve, np.nextafter(0.5, 1))
 plt.figure(figsize=(5,4))
 sns.heatmap(cm, annot=True, fmt="d", cmap="Blues")
 plt.title("Confusion Matrix - Random Forest")
@@ -45,8 +50,7 @@ plt.savefig("confusion_matrix.png")
 plt.show()
 
 # 3. ROC Curve
-probs = best_model.predict_proba(X_test)[:,1]
-fpr, tpr, _ = roc_curve(y_test, probs)
+fpr, tpr = np.r_[0, curve["fpr"]], np.r_[0, curve["tpr"]]
 plt.figure(figsize=(5,4))
 plt.plot(fpr, tpr, label="ROC Curve")
 plt.plot([0,1],[0,1],"--", color="grey")
@@ -57,8 +61,8 @@ plt.savefig("roc_curve.png")
 plt.show()
 
 # 4. Precision-Recall Curve
-from sklearn.metrics import precision_recall_curve
-precision, recall, _ = precision_recall_curve(y_test, probs)
+# Starts at (recall 0, precision 1), the end point precision_recall_curve adds
+precision, recall = np.r_[1, curve["precision"]], np.r_[0, curve["tpr"]]
 plt.figure(figsize=(5,4))
 plt.plot(recall, precision, label="PR Curve")
 plt.title("Precision-Recall Curve - Random Forest")
@@ -0,0 +1,284 @@
+"""
+Flat-array export of the pass/fail pipeline (ColumnTransformer + RandomForest) and a NumPy predictor
+- export: imputer fills, scaler mean/scale and one-hot categories go to meta.json / .npy, and every
+  tree's nodes are concatenated into contiguous arrays (feature, threshold, child, leaf value)
+- The arrays are .npy files opened memory-mapped, so loading takes milliseconds instead of an unpickle
+- predict_proba walks a group of trees over the whole row block, one level per step: one tree at a
+  time for big batches, the whole forest at once for a single row (~WALK_SIZE walks per step either way);
+  nodes are renumbered so a node's children are adjacent (next = left child + went right) and leaves
+  loop to themselves, so every walk simply takes the group's depth in steps with no bookkeeping
+- Batches of SKLEARN_ROWS or more go to the pickled pipeline (loaded on first use), which is faster there
+- `check` compares against the pickled pipeline's predict_proba and times both
+Usage:
+  python flat_forest.py export
+  python flat_forest.py check
+  forest = FlatForest.load("pass_fail_model_flat"); forest.predict_proba(df[FEATURES])
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import joblib
+
+MODEL_FILE = "pass_fail_model.pkl"
+DATA_FILE = "student_performance_dataset.csv"
+FLAT_DIR = "pass_fail_model_flat"
+FLAT_FORMAT = 2
+META_FILE = "meta.json"
+FEATURES = ["Gender", "Age", "Study_Hours", "Attendance",
+            "Parental_Education", "Internet_Access", "Extracurricular"]
+CHUNK_ROWS = 4096
+WALK_SIZE = 16384     # (row, tree) walks advanced together per step
+SKLEARN_ROWS = 2000   # from here on the pipeline's compiled trees beat the NumPy walk
+NODE_ARRAYS = ("feature", "threshold", "child", "value", "roots", "depths")
+
+def _numeric_spec(columns, steps):
+    spec = {"columns": list(columns), "fill": [np.nan] * len(columns),
+            "mean": [0.0] * len(columns), "scale": [1.0] * len(columns)}
+    for name, step in steps:
+        kind = type(step).__name__
+        if kind == "SimpleImputer":
+            spec["fill"] = [float(v) for v in step.statistics_]
+        elif kind == "StandardScaler":
+            if step.mean_ is not None:
+                spec["mean"] = [float(v) for v in step.mean_]
+            if step.scale_ is not None:
+                spec["scale"] = [float(v) for v in step.scale_]
+        else:
+            raise ValueError(f"cannot export numeric step {name!r} ({kind})")
+    return spec
+
+def _categorical_spec(columns, steps):
+    spec = {"columns": list(columns), "fill": [None] * len(columns), "categories": None}
+    for name, step in steps:
+        kind = type(step).__name__
+        if kind == "SimpleImputer":
+            spec["fill"] = [None if pd.isna(v) else str(v) for v in step.statistics_]
+        elif kind == "OneHotEncoder":
+            drop = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(columns)
+            # Output columns per input column: its categories minus the dropped one (drop='if_binary')
+            spec["categories"] = [[str(c) for i, c in enumerate(cats) if d is None or i != d]
+                                  for cats, d in zip(step.categories_, drop)]
+        else:
+            raise ValueError(f"cannot export categorical step {name!r} ({kind})")
+    if spec["categories"] is None:
+        raise ValueError("categorical columns need a OneHotEncoder")
+    return spec
+
+def _breadth_first(tree):
+    """Node order where every internal node's two children are adjacent (right = left + 1)."""
+    order, slot = [0], {0: 0}
+    for node in order:  # grows while iterating
+        if tree.children_left[node] >= 0:
+            for child in (tree.children_left[node], tree.children_right[node]):
+                slot[child] = len(order)
+                order.append(child)
+    return np.array(order), slot
+
+def _flatten_trees(forest):
+    """Every tree's nodes in one set of arrays; child is the global index of the left child.
+
+    A leaf is its own child with an infinite threshold, so a walk that reached it stays put.
+    """
+    features, thresholds, children, values, roots, depths = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        order, slot = _breadth_first(tree)
+        leaf = tree.children_left[order] < 0
+        features.append(np.where(leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+        children.append(np.array([i if l else slot[tree.children_left[n]] for i, (n, l) in enumerate(zip(order, leaf))])
+                        + offset)
+        # Leaf class fractions, as DecisionTreeClassifier.predict_proba normalises them
+        value = tree.value[order, 0, :]
+        total = value.sum(axis=1, keepdims=True)
+        values.append(value / np.where(total == 0, 1, total))
+        roots.append(offset)
+        depths.append(tree.max_depth)
+        offset += tree.node_count
+    return {"feature": np.concatenate(features).astype(np.int32),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "child": np.concatenate(children).astype(np.int32),
+            "value": np.concatenate(values).astype(np.float64), "roots": np.array(roots, dtype=np.int32),
+            "depths": np.array(depths, dtype=np.int32)}
+
+def export(model_path=MODEL_FILE, out_dir=FLAT_DIR) -> dict:
+    """Write the flat arrays for a pickled Pipeline(preprocessor=ColumnTransformer, clf=RandomForest)."""
+    model = joblib.load(model_path)
+    preprocessor, forest = model.named_steps["preprocessor"], model.named_steps["clf"]
+    numeric = categorical = None
+    for name, transformer, columns in preprocessor.transformers_:
+        if isinstance(transformer, str):
+            if transformer == "drop":
+                continue
+            raise ValueError(f"cannot export {transformer!r} columns {list(columns)}")
+        steps = transformer.steps if hasattr(transformer, "steps") else [(name, transformer)]
+        if any(type(step).__name__ == "OneHotEncoder" for _, step in steps):
+            categorical = _categorical_spec(columns, steps)
+        else:
+            numeric = _numeric_spec(columns, steps)
+    width = len(numeric["columns"] if numeric else []) + sum(len(c) for c in (categorical or {}).get("categories", []))
+    if width != forest.n_features_in_:
+        raise ValueError(f"preprocessing gives {width} columns but the forest expects {forest.n_features_in_}")
+    arrays = _flatten_trees(forest)
+    meta = {"format": FLAT_FORMAT, "numeric": numeric, "categorical": categorical,
+            "classes": [int(c) for c in forest.classes_], "trees": len(forest.estimators_),
+            "max_depth": int(max(e.tree_.max_depth for e in forest.estimators_)),
+            "nodes": int(len(arrays["feature"])), "n_features": int(forest.n_features_in_),
+            "model": str(Path(model_path).resolve())}
+
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(tmp / f"{name}.npy", array)
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    return meta
+
+class FlatForest:
+    def __init__(self, meta, arrays, model_path=None, sklearn_rows=SKLEARN_ROWS):
+        self.meta = meta
+        for name in NODE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes_ = np.array(meta["classes"])
+        self._feature = np.asarray(self.feature, dtype=np.int64)
+        self._threshold = np.asarray(self.threshold)
+        self._child = np.asarray(self.child, dtype=np.int64)
+        self._class_values = [np.ascontiguousarray(self.value[:, c]) for c in range(self.value.shape[1])]
+        # Trees of similar depth are walked together, so a group wastes few steps on finished walks
+        self._by_depth = np.argsort(np.asarray(self.depths), kind="stable")
+        # Large batches go to the pipeline; sklearn_rows=None (or no pickle) keeps everything flat
+        self.model_path, self.sklearn_rows = model_path, sklearn_rows
+        self._model = None
+
+    @classmethod
+    def load(cls, flat_dir=FLAT_DIR, model_path=None, sklearn_rows=SKLEARN_ROWS):
+        """model_path: pickle used for large batches, by default the one the arrays were exported from."""
+        flat_dir = Path(flat_dir)
+        meta = json.loads((flat_dir / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format") != FLAT_FORMAT:
+            raise ValueError(f"{flat_dir} is flat format {meta.get('format')}; export it again")
+        model_path = meta.get("model") if model_path is None else model_path
+        return cls(meta, {name: np.load(flat_dir / f"{name}.npy", mmap_mode="r") for name in NODE_ARRAYS},
+                   model_path, sklearn_rows)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """The ColumnTransformer's output: scaled numeric columns, then one-hot categorical columns."""
+        numeric, categorical = self.meta["numeric"], self.meta["categorical"]
+        parts = []
+        if numeric:
+            values = df[numeric["columns"]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+            values = np.where(np.isnan(values), np.array(numeric["fill"]), values)
+            parts.append((values - np.array(numeric["mean"])) / np.array(numeric["scale"]))
+        if categorical:
+            for column, fill, kept in zip(categorical["columns"], categorical["fill"], categorical["categories"]):
+                values = df[column].astype(object)
+                values = values.where(values.notna(), fill).to_numpy()
+                # Unknown categories match no column (handle_unknown='ignore')
+                parts.append((values[:, None] == np.array(kept, dtype=object)[None, :]).astype(np.float64))
+        return np.hstack(parts) if parts else np.zeros((len(df), 0))
+
+    def _leaves(self, X):
+        """Leaf reached in every tree by every row, shape (trees, rows), trees in depth order."""
+        n = len(X)
+        # Trees compare float32 features with float64 thresholds, as sklearn does; feature-major,
+        # so a node's feature for every row is one contiguous stretch
+        flat_x = np.ascontiguousarray(X.T, dtype=np.float32).astype(np.float64).ravel()
+        feature_start = self._feature * n
+        group = max(1, WALK_SIZE // max(n, 1))
+        rows = np.tile(np.arange(n, dtype=np.int64), min(group, len(self.roots)))
+        leaves = np.empty((len(self.roots), n), dtype=np.int64)
+        # Buffers reused at every level: the walk allocates nothing per step
+        at, x, threshold, right = (np.empty(len(rows), dtype) for dtype in (np.int64, np.float64, np.float64, bool))
+        for start in range(0, len(self.roots), group):
+            trees = self._by_depth[start:start + group]
+            size = len(trees) * n
+            node = leaves[start:start + len(trees)].reshape(-1)
+            node[:] = np.repeat(np.asarray(self.roots)[trees], n)
+            at_, x_, threshold_, right_ = at[:size], x[:size], threshold[:size], right[:size]
+            for _ in range(int(np.asarray(self.depths)[trees].max())):
+                np.take(feature_start, node, out=at_)
+                at_ += rows[:size]
+                np.take(flat_x, at_, out=x_)
+                np.take(self._threshold, node, out=threshold_)
+                np.greater(x_, threshold_, out=right_)
+                np.take(self._child, node, out=node)
+                node += right_
+        return leaves
+
+    def _pipeline(self):
+        if self._model is None:
+            self._model = joblib.load(self.model_path)
+        return self._model
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        if self.sklearn_rows is not None and len(df) >= self.sklearn_rows and self.model_path \
+                and Path(self.model_path).exists():
+            return self._pipeline().predict_proba(df)
+        return self.flat_proba(df)
+
+    def flat_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """predict_proba with the NumPy walk only, whatever the batch size."""
+        X = self.transform(df)
+        out = np.empty((len(X), len(self._class_values)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self._leaves(X[start:start + CHUNK_ROWS])
+            for c, value in enumerate(self._class_values):
+                out[start:start + CHUNK_ROWS, c] = value[leaves].sum(axis=0) / leaves.shape[0]
+        return out
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(df), axis=1)]
+
+def _best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def check(model_path=MODEL_FILE, flat_dir=FLAT_DIR, data_path=DATA_FILE, batch_sizes=(1, 32, 1000, 10000)):
+    """Max |flat - sklearn| over the dataset, plus load time and per-batch timings of both."""
+    load_pickle = _best_time(lambda: joblib.load(model_path), 3)
+    load_flat = _best_time(lambda: FlatForest.load(flat_dir), 3)
+    model, forest = joblib.load(model_path), FlatForest.load(flat_dir, model_path)
+    df = pd.read_csv(data_path)[FEATURES]
+    difference = np.abs(forest.flat_proba(df) - model.predict_proba(df)).max()
+    print(f"max |flat - predict_proba| over {len(df)} students: {difference:.3g}")
+    print(f"load: pickle {load_pickle * 1000:.1f} ms, flat {load_flat * 1000:.2f} ms")
+    rows = []
+    for size in batch_sizes:
+        batch = df.sample(size, replace=True, random_state=0)
+        sklearn_s = _best_time(lambda: model.predict_proba(batch), 5)
+        flat_s = _best_time(lambda: forest.flat_proba(batch), 5)
+        rows.append({"batch": size, "sklearn_ms": sklearn_s * 1000, "flat_ms": flat_s * 1000,
+                     "flat_rows_per_s": size / flat_s, "speedup": sklearn_s / flat_s,
+                     "predict_proba_uses": "sklearn" if size >= forest.sklearn_rows else "flat"})
+    print(pd.DataFrame(rows).to_string(index=False))
+    return difference
+
+def main():
+    parser = argparse.ArgumentParser(description="Flat-array export and NumPy predictor for the pass/fail model")
+    parser.add_argument("command", choices=("export", "check"))
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--out", default=FLAT_DIR, help="Directory of the flat arrays")
+    parser.add_argument("--data", default=DATA_FILE, help="check: students to compare on")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        meta = export(args.model, args.out)
+        print(f"Exported {meta['trees']} trees ({meta['nodes']} nodes, depth {meta['max_depth']}) to {args.out}")
+    else:
+        check(args.model, args.out, args.data)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Local HTTP inference server for the pass/fail model, with micro-batching
+- The pipeline is loaded once; requests are queued and one scoring thread takes them in batches
+  (up to --max-batch students, waiting at most --max-wait-ms after the first one) and makes a
+  single predict_proba call per batch, so the pandas / Pipeline overhead is paid once per batch
+- POST /predict with one student or a list of students:
+    {"Gender": "Male", "Age": 15, "Study_Hours": 3.8, "Attendance": 54,
+     "Parental_Education": "Bachelor", "Internet_Access": "Yes", "Extracurricular": "Yes"}
+  -> {"predictions": [{"passed": 1, "probability": 0.83}]}
+- Payloads are checked before they are queued (missing / unknown fields, non-numeric numbers,
+  categories the model was not trained on, null allowed = missing) and rejected with 400 + reason
+- GET /stats: p50 / p99 latency, throughput and mean batch size; GET /health
+Usage:
+  python inference_server.py serve --port 8000
+  python inference_server.py bench --clients 16 --requests 2000 --max-batch 1 64
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import joblib
+
+MODEL_FILE = "pass_fail_model.pkl"
+DATA_FILE = "student_performance_dataset.csv"
+NUMERIC = ["Age", "Study_Hours", "Attendance"]
+CATEGORICAL = ["Gender", "Parental_Education", "Internet_Access", "Extracurricular"]
+FEATURES = ["Gender", "Age", "Study_Hours", "Attendance",
+            "Parental_Education", "Internet_Access", "Extracurricular"]
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1 << 20
+MAX_STUDENTS = 1000       # per request
+LATENCY_WINDOW = 10000    # recent requests kept for percentiles
+REQUEST_TIMEOUT = 30.0
+
+class PayloadError(ValueError):
+    pass
+
+def known_categories(model) -> dict:
+    """Category values the one-hot encoder was fitted on, per categorical column."""
+    encoder = model.named_steps["preprocessor"].named_transformers_["cat"].named_steps["onehot"]
+    return {name: {str(v) for v in values} for name, values in zip(CATEGORICAL, encoder.categories_)}
+
+def parse_students(payload, categories) -> list[dict]:
+    """Validated feature rows from a decoded JSON payload; raises PayloadError with the reason."""
+    students = payload if isinstance(payload, list) else [payload]
+    if not students or len(students) > MAX_STUDENTS:
+        raise PayloadError(f"expected 1 to {MAX_STUDENTS} students, got {len(students)}")
+    rows = []
+    for n, student in enumerate(students):
+        where = f"student {n}" if isinstance(payload, list) else "payload"
+        if not isinstance(student, dict):
+            raise PayloadError(f"{where}: expected a JSON object of features")
+        missing = [f for f in FEATURES if f not in student]
+        unknown = [f for f in student if f not in FEATURES]
+        if missing or unknown:
+            problems = ([f"missing fields {missing}"] if missing else []) + ([f"unknown fields {unknown}"] if unknown else [])
+            raise PayloadError(f"{where}: " + ", ".join(problems))
+        row = {}
+        for name in NUMERIC:
+            value = student[name]
+            if value is None:
+                row[name] = np.nan  # the pipeline imputes missing values
+                continue
+            try:
+                # float() of a huge JSON integer raises OverflowError; inf / NaN are rejected below
+                number = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+            except OverflowError:
+                number = math.nan
+            if not math.isfinite(number):
+                raise PayloadError(f"{where}: {name} must be a finite number or null, got {value!r}"[:200])
+            row[name] = number
+        for name in CATEGORICAL:
+            value = student[name]
+            if value is not None and not (isinstance(value, str) and value in categories[name]):
+                raise PayloadError(f"{where}: {name} must be one of {sorted(categories[name])} or null, got {value!r}"[:200])
+            row[name] = value
+        rows.append(row)
+    return rows
+
+class MicroBatcher:
+    """Queue of pending rows and the thread that scores them in batches."""
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_batch, self.max_wait = max_batch, max_wait_ms / 1000
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # (finished at, seconds) per request
+        self.requests = self.rows = self.batches = 0
+        self.started = time.perf_counter()
+        threading.Thread(target=self._run, name="scorer", daemon=True).start()
+
+    def submit(self, rows) -> Future:
+        future = Future()
+        future.started = time.perf_counter()
+        self.pending.put((rows, future))
+        return future
+
+    def _collect(self):
+        # Block for the first request, then take whatever arrives within max_wait (up to max_batch rows)
+        batch = [self.pending.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self.pending.get(timeout=timeout) if timeout > 0 else self.pending.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for r, _ in batch for row in r]
+            try:
+                frame = pd.DataFrame.from_records(rows, columns=FEATURES)
+                proba = self.model.predict_proba(frame)
+                # Same rule as Pipeline.predict: argmax, so an exact 0.5 tie goes to class 0
+                passed = np.asarray(self.model.classes_)[np.argmax(proba, axis=1)]
+                probability = proba[:, 1]
+            except Exception as exc:  # the requests in this batch fail; the server keeps running
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            done = time.perf_counter()
+            start = 0
+            with self.lock:
+                self.batches += 1
+                self.rows += len(rows)
+                self.requests += len(batch)
+                for _, future in batch:
+                    self.latencies.append((done, done - future.started))
+            for r, future in batch:
+                future.set_result((passed[start:start + len(r)], probability[start:start + len(r)]))
+                start += len(r)
+
+    def stats(self) -> dict:
+        with self.lock:
+            recent = np.array(self.latencies) if self.latencies else np.zeros((0, 2))
+            requests, rows, batches = self.requests, self.rows, self.batches
+        window = recent[-1, 0] - recent[0, 0] if len(recent) > 1 else 0.0
+        return {
+            "requests": requests, "rows": rows, "batches": batches,
+            "mean_batch_rows": rows / batches if batches else 0.0,
+            "p50_ms": float(np.percentile(recent[:, 1], 50) * 1000) if len(recent) else None,
+            "p99_ms": float(np.percentile(recent[:, 1], 99) * 1000) if len(recent) else None,
+            "throughput_rps": (len(recent) - 1) / window if window > 0 else None,
+            "uptime_s": time.perf_counter() - self.started,
+        }
+
+def make_handler(batcher: MicroBatcher, categories: dict):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._reply(200, batcher.stats())
+            else:
+                self._reply(404, {"error": f"no route {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._reply(404, {"error": f"no route {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if not 0 <= length <= MAX_BODY_BYTES:
+                self.close_connection = True
+                self._reply(413 if length > 0 else 400, {"error": f"Content-Length must be 0 to {MAX_BODY_BYTES} bytes"})
+                return
+            try:
+                rows = parse_students(json.loads(self.rfile.read(length) or b"null"), categories)
+            except PayloadError as exc:
+                self._reply(400, {"error": str(exc)})
+                return
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                self._reply(400, {"error": f"body is not valid JSON: {exc}"})
+                return
+            try:
+                passed, probability = batcher.submit(rows).result(timeout=REQUEST_TIMEOUT)
+            except Exception as exc:
+                self._reply(500, {"error": f"scoring failed: {exc}"})
+                return
+            self._reply(200, {"predictions": [{"passed": int(c), "probability": float(p)}
+                                              for c, p in zip(passed, probability)]})
+
+        def log_message(self, format, *args):
+            pass  # per-request access logs would dominate the latency being measured
+
+    return Handler
+
+def start_server(model_path=MODEL_FILE, host="127.0.0.1", port=8000, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    model = joblib.load(model_path)
+    batcher = MicroBatcher(model, max_batch, max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, known_categories(model)))
+    server.daemon_threads = True
+    return server, batcher
+
+# ---------- load generator ----------
+def _client(host, port, bodies, latencies, errors):
+    connection = HTTPConnection(host, port, timeout=REQUEST_TIMEOUT)
+    for body in bodies:
+        start = time.perf_counter()
+        connection.request("POST", "/predict", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+def bench(model_path=MODEL_FILE, data_path=DATA_FILE, clients=16, requests=2000, max_batch=MAX_BATCH,
+          max_wait_ms=MAX_WAIT_MS) -> dict:
+    """Start a server on a free port, send single-student requests from `clients` threads, measure."""
+    server, batcher = start_server(model_path, port=0, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    records = pd.read_csv(data_path)[FEATURES].astype(object).where(lambda d: d.notna(), None).to_dict("records")
+    bodies = [json.dumps(records[n % len(records)]) for n in range(requests)]
+    latencies, errors = [], []
+    threads = [threading.Thread(target=_client, args=(host, port, bodies[c::clients], latencies, errors))
+               for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    latencies = np.array(latencies) * 1000
+    return {"max_batch": max_batch, "clients": clients, "requests": requests, "errors": len(errors),
+            "p50_ms": float(np.percentile(latencies, 50)), "p99_ms": float(np.percentile(latencies, 99)),
+            "throughput_rps": requests / elapsed, "mean_batch_rows": batcher.stats()["mean_batch_rows"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP server for the pass/fail model")
+    parser.add_argument("command", choices=("serve", "bench"))
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[MAX_BATCH],
+                        help="Most students scored per call (bench: several values are compared)")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="Longest wait to fill a batch")
+    parser.add_argument("--data", default=DATA_FILE, help="bench: students to send")
+    parser.add_argument("--clients", type=int, default=16, help="bench: concurrent connections")
+    parser.add_argument("--requests", type=int, default=2000, help="bench: total requests")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        results = [bench(args.model, args.data, args.clients, args.requests, size, args.max_wait_ms)
+                   for size in args.max_batch]
+        print(pd.DataFrame(results).to_string(index=False))
+        return
+    server, _ = start_server(args.model, args.host, args.port, args.max_batch[0], args.max_wait_ms)
+    print(f"Serving {args.model} on http://{args.host}:{server.server_address[1]} "
+          f"(batches of up to {args.max_batch[0]}, {args.max_wait_ms} ms wait)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+import joblib
+import pandas as pd
+import pytest
+
+# The project's scripts are plain modules in the folder above
+PROJECT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT))
+from flat_forest import FEATURES
+
+DATA_PATH = PROJECT / "student_performance_dataset.csv"
+
+def train_pipeline(df):
+    """The notebook's random-forest pipeline, refitted (the committed pickle is tied to one sklearn version)."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    numeric = Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", StandardScaler())])
+    categorical = Pipeline([("imputer", SimpleImputer(strategy="most_frequent")),
+                            ("onehot", OneHotEncoder(handle_unknown="ignore", drop="if_binary"))])
+    preprocessor = ColumnTransformer([("num", numeric, ["Age", "Study_Hours", "Attendance"]),
+                                      ("cat", categorical, ["Gender", "Parental_Education", "Internet_Access",
+                                                            "Extracurricular"])])
+    model = Pipeline([("preprocessor", preprocessor), ("clf", RandomForestClassifier(n_estimators=150, random_state=42))])
+    return model.fit(df[FEATURES], (df["Test_Score"] >= 50).astype(int))
+
+@pytest.fixture(scope="session")
+def students():
+    return pd.read_csv(DATA_PATH)
+
+@pytest.fixture(scope="session")
+def model_path(students, tmp_path_factory):
+    path = tmp_path_factory.mktemp("model") / "pass_fail_model.pkl"
+    joblib.dump(train_pipeline(students), path)
+    return path
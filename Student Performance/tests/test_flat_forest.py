@@ -0,0 +1,53 @@
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from flat_forest import CHUNK_ROWS, FEATURES, META_FILE, FlatForest, export
+
+# The batches carry an unseen category on purpose; sklearn warns about it
+pytestmark = pytest.mark.filterwarnings("ignore:Found unknown categories")
+
+@pytest.fixture(scope="module")
+def flat_dir(model_path, tmp_path_factory):
+    out = tmp_path_factory.mktemp("flat") / "flat"
+    export(model_path, out)
+    return out
+
+def messy_batch(students, size, seed=0):
+    # Resampled students with missing values and a category the encoder never saw
+    rng = np.random.default_rng(seed)
+    batch = students[FEATURES].sample(size, replace=True, random_state=seed).reset_index(drop=True)
+    batch.loc[rng.random(size) < 0.05, "Study_Hours"] = np.nan
+    batch.loc[rng.random(size) < 0.05, "Gender"] = np.nan
+    batch.loc[rng.random(size) < 0.05, "Parental_Education"] = "Unknown"
+    batch["Attendance"] += rng.normal(0, 5, size)
+    return batch
+
+@pytest.mark.parametrize("size", [1, 31, 300, CHUNK_ROWS + 17])
+def test_flat_proba_equals_pipeline(flat_dir, model_path, students, size):
+    model = joblib.load(model_path)
+    forest = FlatForest.load(flat_dir, sklearn_rows=None)
+    batch = messy_batch(students, size)
+    np.testing.assert_allclose(forest.flat_proba(batch), model.predict_proba(batch), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(batch), model.predict(batch))
+
+def test_large_batches_use_the_pipeline(flat_dir, model_path, students):
+    model = joblib.load(model_path)
+    forest = FlatForest.load(flat_dir, sklearn_rows=100)
+    small, large = messy_batch(students, 99, seed=1), messy_batch(students, 100, seed=2)
+    np.testing.assert_allclose(forest.predict_proba(small), model.predict_proba(small), atol=1e-12)
+    assert forest._model is None
+    np.testing.assert_allclose(forest.predict_proba(large), model.predict_proba(large), atol=1e-12)
+    assert forest._model is not None
+
+def test_missing_pickle_keeps_the_flat_path(flat_dir, model_path, students, tmp_path):
+    batch = messy_batch(students, 50)
+    forest = FlatForest.load(flat_dir, model_path=tmp_path / "gone.pkl", sklearn_rows=10)
+    np.testing.assert_allclose(forest.predict_proba(batch), joblib.load(model_path).predict_proba(batch), atol=1e-12)
+
+def test_old_format_is_rejected(flat_dir, tmp_path):
+    meta = json.loads((flat_dir / META_FILE).read_text(encoding="utf-8"))
+    (tmp_path / META_FILE).write_text(json.dumps({**meta, "format": 1}), encoding="utf-8")
+    with pytest.raises(ValueError, match="export it again"):
+        FlatForest.load(tmp_path)
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.client import HTTPConnection
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from inference_server import (FEATURES, MAX_BODY_BYTES, MAX_STUDENTS, PayloadError, known_categories,
+                              parse_students, start_server)
+
+STUDENT = {"Gender": "Male", "Age": 15, "Study_Hours": 3.8, "Attendance": 54,
+           "Parental_Education": "Bachelor", "Internet_Access": "Yes", "Extracurricular": "Yes"}
+
+MALFORMED = {
+    "missing field": {k: v for k, v in STUDENT.items() if k != "Age"},
+    "unknown field": {**STUDENT, "Shoe_Size": 42},
+    "string number": {**STUDENT, "Age": "15"},
+    "bool number": {**STUDENT, "Study_Hours": True},
+    "huge number": {**STUDENT, "Attendance": 10 ** 400},
+    "unknown category": {**STUDENT, "Gender": "Robot"},
+    "non-string category": {**STUDENT, "Internet_Access": 1},
+    "not an object": [1, 2],
+    "empty list": [],
+    "too many": [STUDENT] * (MAX_STUDENTS + 1),
+    "bare null": None,
+}
+
+@pytest.fixture(scope="module")
+def server(model_path):
+    server, batcher = start_server(model_path, port=0, max_batch=8, max_wait_ms=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def post(server, body, headers=None):
+    connection = HTTPConnection(*server.server_address, timeout=10)
+    connection.request("POST", "/predict", body, headers or {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    reply = json.loads(response.read())
+    connection.close()
+    return response.status, reply
+
+@pytest.mark.parametrize("name", MALFORMED)
+def test_parse_rejects_malformed(model_path, name):
+    categories = known_categories(joblib.load(model_path))
+    with pytest.raises(PayloadError):
+        parse_students(MALFORMED[name], categories)
+
+def test_parse_keeps_nulls_as_missing(model_path):
+    categories = known_categories(joblib.load(model_path))
+    rows = parse_students([{**STUDENT, "Age": None, "Gender": None}, STUDENT], categories)
+    assert np.isnan(rows[0]["Age"]) and rows[0]["Gender"] is None
+    assert rows[1] == {**STUDENT, "Age": 15.0, "Attendance": 54.0}
+
+@pytest.mark.parametrize("name", MALFORMED)
+def test_server_rejects_malformed(server, name):
+    status, reply = post(server, json.dumps(MALFORMED[name]))
+    assert status == 400 and reply["error"]
+
+@pytest.mark.parametrize("body", [b"{not json", b"\xff\xfe", b'{"Age": NaN}', json.dumps({**STUDENT, "Age": float("inf")})])
+def test_server_rejects_bad_json(server, body):
+    status, reply = post(server, body)
+    assert status == 400 and reply["error"]
+
+def test_server_rejects_bad_lengths(server):
+    assert post(server, b"", {"Content-Length": "abc"})[0] == 400
+    assert post(server, b"", {"Content-Length": str(MAX_BODY_BYTES + 1)})[0] == 413
+
+def test_server_scores_like_the_pipeline(server, model_path, students):
+    model = joblib.load(model_path)
+    batch = students[FEATURES].head(20)
+    records = batch.astype(object).where(batch.notna(), None).to_dict("records")
+    status, reply = post(server, json.dumps(records))
+    assert status == 200
+    got = pd.DataFrame(reply["predictions"])
+    np.testing.assert_allclose(got["probability"], model.predict_proba(batch)[:, 1])
+    np.testing.assert_array_equal(got["passed"], model.predict(batch))
+    # The server keeps serving after the rejections above
+    assert post(server, json.dumps(STUDENT))[0] == 200
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn import metrics
+from threshold_sweep import bootstrap, confusion_at, summarize, sweep
+
+def scored(n=2000, seed=0, ties=True):
+    # Scores rounded to two decimals give many tied thresholds, like a forest's vote fractions
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.35
+    scores = np.clip(rng.normal(0.35 + 0.3 * y, 0.2), 0, 1)
+    return y.astype(int), np.round(scores, 2) if ties else scores
+
+@pytest.mark.parametrize("ties", [True, False])
+def test_curves_equal_sklearn(ties):
+    y, scores = scored(ties=ties)
+    curve = sweep(y, scores)
+    fpr, tpr, thresholds = metrics.roc_curve(y, scores, drop_intermediate=False)
+    np.testing.assert_allclose(curve["threshold"], thresholds[1:])
+    np.testing.assert_allclose(curve["fpr"], fpr[1:])
+    np.testing.assert_allclose(curve["tpr"], tpr[1:])
+    precision, recall, pr_thresholds = metrics.precision_recall_curve(y, scores)
+    # sklearn lists thresholds ascending and appends the (recall 0, precision 1) end point
+    np.testing.assert_allclose(curve["threshold"], pr_thresholds[::-1])
+    np.testing.assert_allclose(curve["precision"], precision[:-1][::-1])
+    np.testing.assert_allclose(curve["tpr"], recall[:-1][::-1])
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_summary_equals_sklearn(seed):
+    y, scores = scored(seed=seed)
+    summary = summarize(sweep(y, scores))
+    assert summary["roc_auc"] == pytest.approx(metrics.roc_auc_score(y, scores), abs=1e-12)
+    assert summary["average_precision"] == pytest.approx(metrics.average_precision_score(y, scores), abs=1e-12)
+    f1 = [metrics.f1_score(y, scores >= t) for t in np.unique(scores)]
+    assert summary["best_f1"] == pytest.approx(max(f1), abs=1e-12)
+    assert metrics.f1_score(y, scores >= summary["best_threshold"]) == pytest.approx(max(f1), abs=1e-12)
+
+@pytest.mark.parametrize("threshold", [-1.0, 0.0, 0.3, 0.35, 0.5, 0.999, 1.0, 2.0])
+def test_confusion_at_equals_sklearn(threshold):
+    y, scores = scored()
+    want = metrics.confusion_matrix(y, (scores >= threshold).astype(int), labels=[0, 1])
+    np.testing.assert_array_equal(confusion_at(sweep(y, scores), threshold), want)
+
+def test_one_class_metrics_are_nan():
+    summary = summarize(sweep(np.ones(10, int), np.linspace(0, 1, 10)))
+    assert np.isnan(summary["roc_auc"]) and summary["average_precision"] == 1.0
+
+def test_bootstrap_is_reproducible_across_workers():
+    y, scores = scored(n=500)
+    one = bootstrap(y, scores, n_boot=600, workers=1, seed=3)
+    two = bootstrap(y, scores, n_boot=600, workers=2, seed=3)
+    np.testing.assert_array_equal(one.to_numpy(), two.to_numpy())
+    assert (one["low"] <= one["estimate"]).all() and (one["estimate"] <= one["high"]).all()
+    assert one.loc["roc_auc", "estimate"] == pytest.approx(metrics.roc_auc_score(y, scores))
+
+def test_bootstrap_interval_matches_sklearn_on_resampled_rows():
+    # Weighted curves vs sklearn on explicitly resampled rows: different draws, so close, not equal
+    y, scores = scored(n=300)
+    rng = np.random.default_rng(0)
+    aucs = [metrics.roc_auc_score(y[d], scores[d]) for d in rng.integers(0, len(y), (400, len(y)))]
+    ci = bootstrap(y, scores, n_boot=400, workers=1).loc["roc_auc"]
+    assert abs(ci["low"] - np.percentile(aucs, 2.5)) < 0.02
+    assert abs(ci["high"] - np.percentile(aucs, 97.5)) < 0.02
@@ -0,0 +1,163 @@
+"""
+Threshold-sweep evaluation of a binary classifier from a single sort of the scores
+- Scores are sorted once (descending); cumulative positive / negative counts at every distinct score
+  give the confusion matrix at every threshold, and from those ROC, PR, ROC AUC, average precision
+  and the F1-optimal threshold
+- Bootstrap CIs: a resample is a vector of row weights over the already-sorted rows, so a batch of
+  resamples is a (batch x rows) weight matrix whose curves are row-wise cumulative sums; no re-sort.
+  Batches of resamples are spread over a process pool (same results for any worker count)
+Usage:
+  python threshold_sweep.py --boot 2000 --workers 4
+  python threshold_sweep.py --flat pass_fail_model_flat --boot 1000 --curves sweep.csv
+  curve = sweep(y_test, probs); summarize(curve); bootstrap(y_test, probs, n_boot=1000)
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+DATA_FILE = "student_performance_dataset.csv"
+MODEL_FILE = "pass_fail_model.pkl"
+FEATURES = ["Gender", "Age", "Study_Hours", "Attendance",
+            "Parental_Education", "Internet_Access", "Extracurricular"]
+METRICS = ("roc_auc", "average_precision", "best_f1", "best_threshold")
+BOOT_CELLS = 1 << 22     # resamples x rows held in memory at once
+JOB_RESAMPLES = 250      # resamples per pool job (fixed, so results don't depend on --workers)
+
+def _sorted_rows(y_true, scores):
+    """Labels sorted by descending score, and the last sorted row of every distinct score."""
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(scores, kind="mergesort")[::-1]
+    scores, y = scores[order], np.asarray(y_true)[order].astype(bool)
+    last = np.append(np.flatnonzero(np.diff(scores)), len(scores) - 1) if len(scores) else np.zeros(0, np.int64)
+    return y, scores[last], last
+
+def _divide(a, b):
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b > 0)
+
+def sweep(y_true, scores) -> pd.DataFrame:
+    """Confusion counts and rates for "positive if score >= threshold", one row per distinct score."""
+    y, thresholds, last = _sorted_rows(y_true, scores)
+    tp = np.cumsum(y)[last]
+    fp = last + 1 - tp
+    positives, negatives = int(y.sum()), int(len(y) - y.sum())
+    return pd.DataFrame({
+        "threshold": thresholds, "tp": tp, "fp": fp, "fn": positives - tp, "tn": negatives - fp,
+        "tpr": _divide(tp, positives), "fpr": _divide(fp, negatives),
+        "precision": _divide(tp, tp + fp), "f1": _divide(2 * tp, tp + fp + positives),
+    })
+
+def _metrics(tp, fp):
+    """ROC AUC, average precision, best F1 and its position from cumulative counts (last axis)."""
+    positives, negatives = tp[..., -1:], fp[..., -1:]
+    tpr, fpr = _divide(tp, positives), _divide(fp, negatives)
+    zero = np.zeros(tp.shape[:-1] + (1,))
+    tpr0, fpr0 = np.concatenate([zero, tpr], axis=-1), np.concatenate([zero, fpr], axis=-1)
+    auc = np.sum(np.diff(fpr0, axis=-1) * (tpr0[..., 1:] + tpr0[..., :-1]) / 2, axis=-1)
+    ap = np.sum(np.diff(tpr0, axis=-1) * _divide(tp, tp + fp), axis=-1)
+    f1 = _divide(2 * tp, tp + fp + positives)
+    best = np.argmax(f1, axis=-1)  # first = highest threshold among ties
+    undefined = (positives[..., 0] == 0) | (negatives[..., 0] == 0)
+    auc, ap = np.where(undefined, np.nan, auc), np.where(positives[..., 0] == 0, np.nan, ap)
+    return auc, ap, np.take_along_axis(f1, best[..., None], axis=-1)[..., 0], best
+
+def summarize(curve: pd.DataFrame) -> dict:
+    """ROC AUC, average precision and the F1-optimal threshold of a sweep() frame."""
+    auc, ap, f1, best = _metrics(curve["tp"].to_numpy(np.float64), curve["fp"].to_numpy(np.float64))
+    return {"roc_auc": float(auc), "average_precision": float(ap), "best_f1": float(f1),
+            "best_threshold": float(curve["threshold"].iloc[int(best)])}
+
+def confusion_at(curve: pd.DataFrame, threshold: float) -> np.ndarray:
+    """[[tn, fp], [fn, tp]] for "positive if score >= threshold", read off a sweep() frame."""
+    above = int(np.searchsorted(-curve["threshold"].to_numpy(), -threshold, side="right"))
+    positives, negatives = int(curve["tp"].iloc[-1] + curve["fn"].iloc[-1]), int(curve["fp"].iloc[-1] + curve["tn"].iloc[-1])
+    tp, fp = (int(curve["tp"].iloc[above - 1]), int(curve["fp"].iloc[above - 1])) if above else (0, 0)
+    return np.array([[negatives - fp, fp], [positives - tp, tp]])
+
+# ---------- bootstrap ----------
+_worker_rows = None
+
+def _set_rows(y, thresholds, last):
+    global _worker_rows
+    _worker_rows = (y, thresholds, last)
+
+def _resample_job(job):
+    """Metrics for `count` bootstrap resamples, computed in (batch x rows) weight matrices."""
+    count, seed = job
+    y, thresholds, last = _worker_rows
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    batch = max(1, BOOT_CELLS // max(n, 1))
+    out = []
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        # Row weights of each resample = how often each row was drawn (n draws with replacement)
+        draws = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+        weights = np.bincount(draws.ravel(), minlength=size * n).reshape(size, n).astype(np.int32)
+        tp = np.cumsum(weights * y, axis=1)[:, last].astype(np.float64)
+        fp = np.cumsum(weights, axis=1)[:, last] - tp
+        auc, ap, f1, best = _metrics(tp, fp)
+        out.append(np.column_stack([auc, ap, f1, thresholds[best]]))
+    return np.concatenate(out) if out else np.zeros((0, len(METRICS)))
+
+def bootstrap(y_true, scores, n_boot=1000, alpha=0.05, workers=None, seed=0) -> pd.DataFrame:
+    """Point estimate and percentile (1 - alpha) interval of every metric, one row per metric."""
+    y, thresholds, last = _sorted_rows(y_true, scores)
+    jobs = [(min(JOB_RESAMPLES, n_boot - start), s) for start, s in
+            zip(range(0, n_boot, JOB_RESAMPLES), np.random.SeedSequence(seed).spawn(-(-n_boot // JOB_RESAMPLES)))]
+    if workers == 1 or len(jobs) <= 1:
+        _set_rows(y, thresholds, last)
+        parts = [_resample_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_rows, initargs=(y, thresholds, last)) as pool:
+            parts = list(pool.map(_resample_job, jobs))
+    samples = np.concatenate(parts) if parts else np.zeros((0, len(METRICS)))
+    estimate = summarize(sweep(y_true, scores))
+    low, high = (np.nanpercentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+                 if len(samples) else np.full((2, len(METRICS)), np.nan))
+    return pd.DataFrame({"metric": METRICS, "estimate": [estimate[m] for m in METRICS],
+                         "low": low, "high": high}).set_index("metric")
+
+def holdout_scores(data_path=DATA_FILE, model_path=MODEL_FILE, flat_dir=None):
+    """(y_test, P(pass)) on the same stratified 80/20 split as the charts script."""
+    from sklearn.model_selection import train_test_split
+    df = pd.read_csv(data_path)
+    df["Passed"] = (df["Test_Score"] >= 50).astype(int)
+    _, X_test, _, y_test = train_test_split(df[FEATURES], df["Passed"], test_size=0.2, random_state=42,
+                                            stratify=df["Passed"])
+    if flat_dir:
+        from flat_forest import FlatForest
+        model = FlatForest.load(flat_dir)
+    else:
+        import joblib
+        model = joblib.load(model_path)
+    return y_test.to_numpy(), model.predict_proba(X_test)[:, 1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-sort threshold sweep with bootstrap confidence intervals")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--flat", default=None, help="Score with a flat_forest export instead of the pickle")
+    parser.add_argument("--boot", type=int, default=1000, help="Bootstrap resamples (0 = none)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="1 - confidence level")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--curves", default=None, help="Write the full threshold sweep to this CSV")
+    args = parser.parse_args()
+
+    y_test, probs = holdout_scores(args.data, args.model, args.flat)
+    curve = sweep(y_test, probs)
+    if args.curves:
+        curve.to_csv(args.curves, index=False)
+    best = summarize(curve)
+    print(f"{len(y_test)} holdout students, {len(curve)} distinct thresholds")
+    print("Confusion matrix at the F1-optimal threshold:")
+    print(confusion_at(curve, best["best_threshold"]))
+    if args.boot:
+        print(f"\n{100 * (1 - args.alpha):g}% bootstrap intervals ({args.boot} resamples):")
+        print(bootstrap(y_test, probs, args.boot, args.alpha, args.workers, args.seed).to_string())
+    else:
+        print(pd.Series(best).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmarks for the two expense pipelines
+- expense-analyzer-project: load_and_clean, summarize, save_tables, make_charts, save_summary_text
+- Personal-Expense: load_data, analyze_expenses, save_plots, save_summary
+Each (pipeline, size) runs in a fresh interpreter, so peak RSS is not polluted by earlier runs.
+Per stage we run it --repeat times and record the median and minimum wall time, the median CPU time,
+how far the stage raised the peak RSS, and the process's peak RSS so far (cumulative over the stages).
+Only slowdowns above REGRESSION_RATIO *and* NOISE_FLOOR_S are flagged as regressions.
+Usage:
+  python bench_expenses.py --sizes 1k,10k,100k,1m --out results/run.json --repeat 5
+  python bench_expenses.py --sizes 1k,10k,100k,1m --out results/new.json --compare results/run.json
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from generate_expenses import generate, parse_rows
+
+ROOT = Path(__file__).resolve().parent.parent
+# Shared helpers (frame cache, stage profiler, chart renderer) live in ../common
+sys.path.insert(0, str(ROOT / "common"))
+from stage_profiler import peak_rss_mb
+
+PROJECTS = {
+    "analyzer": (ROOT / "expense-analyzer-project", "expense_analyzer.py"),
+    "personal": (ROOT / "Personal-Expense", "expense-analyzer.py"),
+}
+REGRESSION_RATIO = 1.5   # slower than the baseline by more than this is flagged ...
+NOISE_FLOOR_S = 0.005    # ... if it also lost more than this many seconds
+CLIFF_RATIO = 2.0        # per-row cost growing by more than this between sizes is flagged
+REPEAT = 5               # runs per stage; the median is reported
+
+def _import_pipeline(name: str):
+    project_dir, script = PROJECTS[name]
+    sys.path.insert(0, str(project_dir))
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", project_dir / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _stage(results: list, repeat: int, name: str, fn, *args):
+    # Every run does the same work (outputs are overwritten); one slow run (GC, page cache) moves the median little
+    walls, cpus = [], []
+    peak_before = peak_rss_mb()
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        value = fn(*args)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    peak = peak_rss_mb()
+    results.append({
+        "stage": name,
+        "repeat": repeat,
+        "wall_s": round(statistics.median(walls), 6),
+        "wall_min_s": round(min(walls), 6),
+        "cpu_s": round(statistics.median(cpus), 6),
+        "peak_rise_mb": None if peak is None else round(peak - peak_before, 1),
+        "peak_rss_mb": None if peak is None else round(peak, 1),  # cumulative: includes earlier stages
+    })
+    return value
+
+def run_pipeline(name: str, csv_path: Path, outdir: Path, repeat: int = REPEAT) -> list[dict]:
+    m = _import_pipeline(name)
+    results = []
+    if name == "analyzer":
+        df = _stage(results, repeat, "load_and_clean", m.load_and_clean, csv_path)
+        summary, monthly, category, budget = _stage(results, repeat, "summarize", m.summarize, df, 25000.0)
+        _stage(results, repeat, "save_tables", m.save_tables, outdir, monthly, category, budget)
+        _stage(results, repeat, "make_charts", lambda: m.make_charts(outdir, monthly, category, force=True))
+        _stage(results, repeat, "save_summary_text", m.save_summary_text, outdir, summary)
+    else:
+        df = _stage(results, repeat, "load_data", m.load_data, str(csv_path))
+        summary = _stage(results, repeat, "analyze_expenses", m.analyze_expenses, df)
+        _stage(results, repeat, "save_plots", lambda: m.save_plots(df, str(outdir), force=True))
+        _stage(results, repeat, "save_summary", m.save_summary, summary, str(outdir))
+    for row in results:
+        row["rows"] = len(df)
+    return results
+
+def _data_file(data_dir: Path, schema: str, rows: int, items: int) -> Path:
+    path = data_dir / f"{schema}_{rows}{f'_items{items}' if items else ''}.csv"
+    if not path.exists():
+        print(f"Generating {path} ...", flush=True)
+        generate(path, schema, rows, items=items)
+    return path
+
+def run_suite(sizes: list[int], pipelines: list[str], data_dir: Path, items: int, repeat: int = REPEAT) -> list[dict]:
+    results = []
+    for rows in sizes:
+        for name in pipelines:
+            csv_path = _data_file(data_dir, name, rows, items if name == "personal" else 0)
+            with tempfile.TemporaryDirectory() as outdir:
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--worker", name, "--csv", str(csv_path), "--outdir", outdir,
+                     "--repeat", str(repeat)],
+                    capture_output=True, text=True, cwd=Path(__file__).parent,
+                )
+            if proc.returncode != 0:
+                print(f"{name} @ {rows} rows failed:\n{proc.stderr}", file=sys.stderr)
+                continue
+            for row in json.loads(proc.stdout.strip().splitlines()[-1]):
+                results.append({"pipeline": name, "size": rows, **row})
+                print(f"{name:9} {rows:>12,} {row['stage']:18} {row['wall_s']:10.4f}s (min {row['wall_min_s']:.4f}s) "
+                      f"cpu {row['cpu_s']:10.4f}s  peak +{row['peak_rise_mb'] or 0:7.1f} MB "
+                      f"(process so far {row['peak_rss_mb'] or 0:9.1f} MB)", flush=True)
+    return results
+
+def find_cliffs(results: list[dict]) -> list[str]:
+    by_stage = {}
+    for r in results:
+        by_stage.setdefault((r["pipeline"], r["stage"]), []).append(r)
+    notes = []
+    for (pipeline, stage), rows in by_stage.items():
+        rows.sort(key=lambda r: r["size"])
+        for a, b in zip(rows, rows[1:]):
+            # Ignore sub-millisecond stages, their per-row cost is mostly noise
+            if a["wall_s"] < 1e-3 or b["wall_s"] < 1e-3:
+                continue
+            growth = (b["wall_s"] / b["size"]) / (a["wall_s"] / a["size"])
+            if growth > CLIFF_RATIO:
+                notes.append(f"CLIFF {pipeline}.{stage}: per-row time x{growth:.1f} from {a['size']:,} to {b['size']:,} rows")
+    return notes
+
+def compare(results: list[dict], baseline: list[dict]) -> list[str]:
+    base = {(r["pipeline"], r["size"], r["stage"]): r for r in baseline}
+    notes = []
+    for r in results:
+        old = base.get((r["pipeline"], r["size"], r["stage"]))
+        if old is None or old["wall_s"] < 1e-3:
+            continue
+        ratio = r["wall_s"] / old["wall_s"]
+        # A change counts only past both the ratio and the absolute floor; small stages jitter by whole ratios
+        changed = abs(r["wall_s"] - old["wall_s"]) > NOISE_FLOOR_S
+        tag = "same"
+        if changed and ratio > REGRESSION_RATIO:
+            tag = "REGRESSION"
+        elif changed and ratio < 1 / REGRESSION_RATIO:
+            tag = "faster"
+        if tag != "same":
+            notes.append(f"{tag:10} {r['pipeline']}.{r['stage']} @ {r['size']:,}: "
+                         f"{old['wall_s']:.4f}s -> {r['wall_s']:.4f}s (x{ratio:.2f})")
+    return notes
+
+def main():
+    parser = argparse.ArgumentParser(description="Expense pipeline scaling benchmarks")
+    parser.add_argument("--sizes", default="1k,10k,100k,1m", help="Comma-separated row counts (1k .. 100m)")
+    parser.add_argument("--pipelines", default="analyzer,personal", help="Comma-separated: analyzer, personal")
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent / "data"), help="Generated CSVs are kept here")
+    parser.add_argument("--items", type=int, default=0, help="Distinct item names for the personal schema")
+    parser.add_argument("--out", default="bench_results.json", help="Machine-readable results (JSON)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Runs per stage (median and min are reported)")
+    parser.add_argument("--worker", choices=sorted(PROJECTS), help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--outdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_pipeline(args.worker, Path(args.csv), Path(args.outdir), args.repeat)))
+        return
+
+    sizes = [parse_rows(s) for s in args.sizes.split(",")]
+    pipelines = [p.strip() for p in args.pipelines.split(",")]
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    results = run_suite(sizes, pipelines, Path(args.data_dir), args.items, args.repeat)
+    import pandas, numpy, matplotlib
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pandas.__version__,
+            "numpy": numpy.__version__,
+            "matplotlib": matplotlib.__version__,
+        },
+        "results": results,
+    }
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results saved to: {out.resolve()}")
+
+    notes = find_cliffs(results)
+    if args.compare:
+        notes += compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"])
+    for note in notes:
+        print(note)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Synthetic expense CSV generator
+- "analyzer" schema: Date,Category,Description,Amount,Payment Method,Notes
+  (expense-analyzer-project/data/personal_expenses_sample.csv)
+- "personal" schema: Date,Item,Amount,Category,Time,day
+  (Personal-Expense/data/myExpenses1.csv)
+Rows are written in blocks, so 100M-row files don't need 100M rows in memory.
+A small share of rows is deliberately dirty (bad dates/amounts, messy casing) to exercise cleaning.
+Usage:
+  python generate_expenses.py --schema analyzer --rows 1m --out data/analyzer_1m.csv
+  python generate_expenses.py --schema personal --rows 100k --items 50000 --out data/personal_100k.csv
+"""
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 1_000_000
+SPAN_DAYS = 3650  # big files get more rows per day rather than running past pandas' date range
+SCHEMAS = ("analyzer", "personal")
+
+# (Category, Description, min amount, max amount, relative frequency), modelled on the sample data
+ANALYZER_ITEMS = [
+    ("Rent", "Monthly Rent", 12000, 22000, 1),
+    ("Groceries", "Local Market", 800, 3700, 3), ("Groceries", "Online Grocery", 300, 4000, 3),
+    ("Groceries", "Supermarket", 500, 3000, 3),
+    ("Food & Drinks", "Breakfast", 100, 810, 2), ("Food & Drinks", "Cafe", 120, 780, 3),
+    ("Food & Drinks", "Dinner", 80, 850, 4), ("Food & Drinks", "Lunch", 150, 900, 2),
+    ("Food & Drinks", "Snacks", 120, 900, 4),
+    ("Transport", "Auto", 120, 170, 1), ("Transport", "Bus", 150, 790, 2), ("Transport", "Cab", 360, 780, 2),
+    ("Transport", "Fuel", 600, 640, 1), ("Transport", "Metro", 130, 750, 2),
+    ("Shopping", "Clothes", 1800, 6800, 2), ("Shopping", "Electronics", 800, 4800, 2),
+    ("Shopping", "Household Items", 850, 5100, 2),
+    ("Utilities", "Electricity Bill", 600, 2850, 2), ("Utilities", "Water Bill", 650, 3000, 1),
+    ("Utilities", "Mobile Recharge", 1700, 2850, 1), ("Utilities", "Internet", 650, 700, 1),
+    ("Subscriptions", "Netflix", 250, 1170, 1), ("Subscriptions", "Spotify", 280, 1120, 2),
+    ("Subscriptions", "Prime", 700, 1160, 1), ("Subscriptions", "YouTube Premium", 110, 1190, 1),
+    ("Entertainment", "Concert", 280, 1310, 2), ("Entertainment", "Music", 340, 1500, 1),
+    ("Healthcare", "Doctor Visit", 270, 4650, 1), ("Healthcare", "Diagnostics", 3600, 5110, 1),
+    ("Education", "Books", 1500, 1550, 1), ("Education", "Exam Fee", 5000, 5150, 1),
+    ("Travel", "Flight Ticket", 13900, 23100, 1), ("Travel", "Hotel", 8600, 8700, 1),
+    ("Misc", "Donation", 800, 1900, 2), ("Misc", "Gift", 290, 1720, 2), ("Misc", "Others", 100, 1710, 2),
+]
+PAYMENT_METHODS = ["UPI", "Cash", "Credit Card", "Debit Card"]
+
+PERSONAL_ITEMS = [
+    ("chai with snaks", 15, 40, 12), ("chai", 7, 20, 6), ("coffee", 10, 30, 3), ("juice", 15, 30, 3),
+    ("coldrink", 10, 25, 3), ("others", 5, 60, 4), ("biryani", 100, 200, 1), ("rikshow", 10, 30, 1),
+    ("idli", 20, 40, 1), ("chicken", 50, 90, 1), ("samosa", 10, 20, 1), ("ice cream", 20, 50, 1),
+    ("wifi", 350, 350, 0.2), ("recharge", 200, 220, 0.2), ("shoe", 500, 500, 0.1), ("pizza", 100, 250, 0.3),
+]
+PERSONAL_CATEGORIES = ["alone", "friend"]
+
+def parse_rows(text: str) -> int:
+    # "1k", "2.5m", "100M", "12000"
+    text = text.strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale != 1 else text) * scale)
+
+def _pick(rng, weights, n) -> np.ndarray:
+    p = np.asarray(weights, dtype=float)
+    return rng.choice(len(p), size=n, p=p / p.sum())
+
+def _amounts(rng, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    return rng.integers(lo, hi + 1)
+
+def _dates(start: np.datetime64, first_row: int, n: int, rows_per_day: float) -> np.ndarray:
+    # Exports are in date order; several rows share a day
+    return start + (np.arange(first_row, first_row + n) / rows_per_day).astype("timedelta64[D]")
+
+def analyzer_block(rng, first_row: int, n: int, rows_per_day: float, dirty: float) -> pd.DataFrame:
+    idx = _pick(rng, [w for *_, w in ANALYZER_ITEMS], n)
+    cats = np.array([c for c, *_ in ANALYZER_ITEMS], dtype=object)[idx]
+    lo = np.array([lo for _, _, lo, _, _ in ANALYZER_ITEMS])[idx]
+    hi = np.array([hi for _, _, _, hi, _ in ANALYZER_ITEMS])[idx]
+    dates = _dates(np.datetime64("2020-01-01"), first_row, n, rows_per_day)
+    dates = np.datetime_as_string(dates, unit="D").astype(object)
+    amounts = _amounts(rng, lo, hi).astype(object)
+    if dirty:
+        messy = rng.random(n) < dirty
+        cats[messy] = [f"  {c.lower()} " for c in cats[messy]]
+        dates[rng.random(n) < dirty / 10] = "not a date"
+        amounts[rng.random(n) < dirty / 10] = "n/a"
+    return pd.DataFrame({
+        "Date": dates,
+        "Category": cats,
+        "Description": np.array([d for _, d, *_ in ANALYZER_ITEMS], dtype=object)[idx],
+        "Amount": amounts,
+        "Payment Method": np.array(PAYMENT_METHODS, dtype=object)[_pick(rng, [25, 25, 24, 22], n)],
+        "Notes": "",
+    })
+
+def personal_block(rng, first_row: int, n: int, rows_per_day: float, items: int) -> pd.DataFrame:
+    base = len(PERSONAL_ITEMS)
+    idx = _pick(rng, [w for *_, w in PERSONAL_ITEMS], n)
+    names = np.array([name for name, *_ in PERSONAL_ITEMS], dtype=object)[idx]
+    lo = np.array([lo for _, lo, _, _ in PERSONAL_ITEMS])[idx]
+    hi = np.array([hi for _, _, hi, _ in PERSONAL_ITEMS])[idx]
+    if items > base:
+        # Long tail of free-text merchant names, Zipf-distributed like real feeds
+        tail = rng.random(n) < 0.5
+        ids = np.minimum(rng.zipf(1.3, tail.sum()), items - base)
+        names[tail] = np.char.add("item ", ids.astype(str)).astype(object)
+        lo[tail], hi[tail] = 5, 500
+    dates = _dates(np.datetime64("2023-01-01"), first_row, n, rows_per_day)
+    ts = pd.DatetimeIndex(dates)
+    minutes = rng.integers(7 * 60, 23 * 60, n)
+    return pd.DataFrame({
+        "Date": [f"{m}/{d}/{y}" for m, d, y in zip(ts.month, ts.day, ts.year)],
+        "Item": names,
+        "Amount": _amounts(rng, lo, hi),
+        "Category": np.array(PERSONAL_CATEGORIES, dtype=object)[_pick(rng, [60, 40], n)],
+        "Time": [f"{h}:{m:02d}" for h, m in zip(minutes // 60, minutes % 60)],
+        "day": ts.day_name(),
+    })
+
+def generate(out: Path, schema: str, rows: int, seed: int = 0, rows_per_day: float | None = None,
+             items: int = 0, dirty: float = 0.01, block_rows: int = BLOCK_ROWS) -> Path:
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema {schema!r}; expected one of {SCHEMAS}")
+    rows_per_day = rows_per_day or max(3.0, rows / SPAN_DAYS)
+    rng = np.random.default_rng(seed)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        for first in range(0, rows, block_rows):
+            n = min(block_rows, rows - first)
+            if schema == "analyzer":
+                block = analyzer_block(rng, first, n, rows_per_day, dirty)
+            else:
+                block = personal_block(rng, first, n, rows_per_day, items)
+            block.to_csv(f, header=first == 0, index=False)
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic expense CSVs")
+    parser.add_argument("--schema", choices=SCHEMAS, required=True)
+    parser.add_argument("--rows", required=True, help="Row count, e.g. 1000, 1k, 10m")
+    parser.add_argument("--out", required=True, help="Output CSV path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows-per-day", type=float, default=None,
+                        help=f"Average rows per calendar day (default: 3, or enough to fit {SPAN_DAYS} days)")
+    parser.add_argument("--items", type=int, default=0,
+                        help="personal schema: distinct item names (adds a long tail of synthetic items)")
+    parser.add_argument("--dirty", type=float, default=0.01,
+                        help="analyzer schema: share of rows with messy category text (1/10 of that get bad dates/amounts)")
+    args = parser.parse_args()
+
+    out = generate(Path(args.out), args.schema, parse_rows(args.rows), seed=args.seed,
+                   rows_per_day=args.rows_per_day, items=args.items, dirty=args.dirty)
+    print(f"Wrote {out}")
+
+if __name__ == "__main__":
+    main()
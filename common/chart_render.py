@@ -0,0 +1,79 @@
+"""
+Chart rendering without pyplot
+- Every chart is drawn on its own matplotlib Figure with the Agg canvas (no global state),
+  so independent charts can be drawn in worker processes
+- A content hash of each chart's input series, settings and draw function source is stored next to
+  the images (.chart_hashes.json); charts whose inputs and code did not change are skipped
+- Shared by both expense analyzers (they put this folder on sys.path)
+Usage:
+  render_charts([("chart_monthly_trend", draw_fn, series, (6.4, 4.8))], outdir, fmt="svg", workers=3)
+"""
+import hashlib
+import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import matplotlib
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+MANIFEST_FILE = ".chart_hashes.json"
+FORMATS = ("png", "svg")
+
+def _draw_fingerprint(draw) -> str:
+    # Editing a draw function (code or styling) or upgrading matplotlib redraws its charts
+    try:
+        code = inspect.getsource(draw)
+    except (OSError, TypeError):
+        code = draw.__code__.co_code.hex()
+    return f"{draw.__module__}.{draw.__qualname__}|{matplotlib.__version__}|{code}"
+
+def chart_hash(draw, data: pd.Series, *settings) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{_draw_fingerprint(draw)}|{data.name}|{settings}".encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _render(job: tuple) -> str:
+    draw, data, figsize, path, dpi = job
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, data)
+    fig.savefig(path, dpi=dpi)
+    return path.name
+
+def _load_manifest(outdir: Path) -> dict:
+    try:
+        return json.loads((outdir / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def render_charts(charts: list[tuple], outdir: Path, fmt: str = "png", dpi: float = 150,
+                  workers: int = 1, force: bool = False) -> list[str]:
+    """charts: (name, draw(fig, data), data, figsize) tuples; draw must be a module-level function
+    of an importable module (worker processes unpickle it by name).
+    Returns the file names that were (re)rendered."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format {fmt!r}; expected one of {FORMATS}")
+    outdir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(outdir)
+    jobs, hashes = [], {}
+    for name, draw, data, figsize in charts:
+        path = outdir / f"{name}.{fmt}"
+        digest = chart_hash(draw, data, tuple(map(float, figsize)), float(dpi), fmt)
+        if not force and manifest.get(path.name) == digest and path.exists():
+            continue
+        jobs.append((draw, data, figsize, path, dpi))
+        hashes[path.name] = digest
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            rendered = list(pool.map(_render, jobs))
+    else:
+        rendered = [_render(job) for job in jobs]
+
+    if rendered:
+        manifest.update(hashes)
+        (outdir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return rendered
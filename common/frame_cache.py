@@ -0,0 +1,145 @@
+"""
+On-disk cache for parsed / cleaned CSV frames, shared by the expense analyzers and the Netflix catalog.
+- Keyed by the input file's path, size, mtime and content hash
+- Each column is stored as its own .npy file and loaded memory-mapped;
+  text columns are stored as integer codes + labels (categoricals stay categorical)
+- Size-bounded: least recently used entries are evicted first
+- Projects put this folder on sys.path (see the top of expense_analyzer.py / catalog.py)
+Usage:
+  df = cached_load(csv_path, load_and_clean, cache_dir=Path(".expense_cache"))
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT = 1  # bump when the stored layout or the cleaning logic changes
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+META_FILE = "meta.json"
+
+def content_hash(path: Path, block_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_key(csv_path: Path, namespace: str = "") -> tuple[str, str]:
+    # Returns (key, source); the key changes whenever the file or the loader does
+    path = Path(csv_path).resolve()
+    st = path.stat()
+    parts = [str(CACHE_FORMAT), namespace, str(path), str(st.st_size), str(st.st_mtime_ns), content_hash(path)]
+    key = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return key, str(path)
+
+def _is_array(col: pd.Series) -> bool:
+    # Plain NumPy dtypes round-trip through .npy without pickling
+    return isinstance(col.dtype, np.dtype) and col.dtype.kind in "biufcmM"
+
+def _is_text(col: pd.Series) -> bool:
+    return pd.api.types.infer_dtype(col, skipna=True) in ("string", "empty")
+
+def _encodable(df: pd.DataFrame) -> bool:
+    return all(
+        _is_array(df[name]) or isinstance(df[name].dtype, pd.CategoricalDtype) or _is_text(df[name])
+        for name in df.columns
+    )
+
+def _write_entry(entry: Path, df: pd.DataFrame, source: str):
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        spec = {"name": str(name), "dtype": str(col.dtype)}
+        if not _is_array(col):
+            cat = col if isinstance(col.dtype, pd.CategoricalDtype) else col.astype("category")
+            np.save(entry / f"col{i}.codes.npy", cat.cat.codes.to_numpy())
+            np.save(entry / f"col{i}.labels.npy", np.asarray(cat.cat.categories.astype(str), dtype=str))
+            spec["kind"] = "category" if isinstance(col.dtype, pd.CategoricalDtype) else "text"
+            spec["ordered"] = bool(cat.cat.ordered)
+        else:
+            np.save(entry / f"col{i}.npy", col.to_numpy())
+            spec["kind"] = "array"
+        columns.append(spec)
+    meta = {"source": source, "rows": int(len(df)), "columns": columns, "created": time.time()}
+    (entry / META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+
+def _read_entry(entry: Path) -> pd.DataFrame:
+    meta = json.loads((entry / META_FILE).read_text(encoding="utf-8"))
+    data = {}
+    for i, spec in enumerate(meta["columns"]):
+        if spec["kind"] == "array":
+            data[spec["name"]] = np.load(entry / f"col{i}.npy", mmap_mode="r")
+            continue
+        codes = np.load(entry / f"col{i}.codes.npy", mmap_mode="r")
+        labels = np.load(entry / f"col{i}.labels.npy")
+        cat = pd.Categorical.from_codes(codes, categories=labels, ordered=spec["ordered"])
+        data[spec["name"]] = cat if spec["kind"] == "category" else pd.Series(cat).astype(spec["dtype"])
+    # copy=False keeps the memory-mapped arrays as (read-only) views; pandas copies on first write
+    return pd.DataFrame(data, copy=False)
+
+def _entries(cache_dir: Path) -> list[Path]:
+    if not cache_dir.is_dir():
+        return []
+    return [p for p in cache_dir.iterdir() if (p / META_FILE).is_file()]
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+def _entry_source(entry: Path) -> str | None:
+    try:
+        return json.loads((entry / META_FILE).read_text(encoding="utf-8"))["source"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def invalidate(cache_dir: Path, csv_path: Path | None = None) -> int:
+    # Drop every entry for csv_path (or the whole cache); returns how many were removed
+    source = str(Path(csv_path).resolve()) if csv_path is not None else None
+    removed = 0
+    for entry in _entries(Path(cache_dir)):
+        if source is None or _entry_source(entry) == source:
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    return removed
+
+def evict(cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES, keep: Path | None = None):
+    # Least recently used first; the meta file's mtime is touched on every hit
+    entries = sorted(_entries(Path(cache_dir)), key=lambda e: (e / META_FILE).stat().st_mtime)
+    sizes = {e: _entry_size(e) for e in entries}
+    total = sum(sizes.values())
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if keep is not None and entry == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= sizes[entry]
+
+def cached_load(csv_path: Path, loader, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> pd.DataFrame:
+    cache_dir = Path(cache_dir)
+    key, source = cache_key(csv_path, namespace=getattr(loader, "__name__", ""))
+    entry = cache_dir / key
+    if (entry / META_FILE).is_file():
+        os.utime(entry / META_FILE)
+        return _read_entry(entry)
+
+    df = loader(csv_path)
+    if not _encodable(df):
+        return df  # mixed-type object columns can't be stored losslessly; skip caching
+
+    # Older entries for the same file are stale now
+    invalidate(cache_dir, csv_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir))
+    try:
+        _write_entry(tmp, df, source)
+        os.replace(tmp, entry)
+    except OSError:
+        # Another process may have published the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+    evict(cache_dir, max_bytes, keep=entry)
+    return df
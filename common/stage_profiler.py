@@ -0,0 +1,136 @@
+"""
+Per-stage timing and memory instrumentation
+- Wall time, CPU time, memory and row counts per pipeline stage. Memory is per stage, not per process:
+  rss_delta_mb = resident memory after minus before the stage (what it left allocated) and
+  peak_rise_mb = how far the stage raised the process peak RSS (0 when it stayed under an earlier peak)
+- Optional cProfile or tracemalloc dump for one chosen stage
+- Results as a JSON trace and a printed table
+- Shared by both expense analyzers (they put this folder on sys.path)
+Usage:
+  prof = StageProfiler(detail_stage="charts", detail_mode="cprofile", dump_dir=outdir)
+  with prof.stage("load") as st:
+      df = pd.read_csv(path)
+      st["rows"] = len(df)
+  prof.write_json(outdir / "profile.json"); prof.print_table()
+"""
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DETAIL_MODES = ("cprofile", "tracemalloc")
+
+def peak_rss_mb() -> float | None:
+    # Process high-water mark
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb() -> float | None:
+    # Resident memory right now (Linux only; None elsewhere)
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def _delta(after: float | None, before: float | None) -> float | None:
+    return None if after is None or before is None else after - before
+
+class StageProfiler:
+    """Collects one record per stage name; re-entering a stage adds to its totals."""
+
+    def __init__(self, detail_stage: str | None = None, detail_mode: str = "cprofile", dump_dir: Path | None = None):
+        if detail_mode not in DETAIL_MODES:
+            raise ValueError(f"Unknown detail mode {detail_mode!r}; expected one of {DETAIL_MODES}")
+        self.records = {}
+        self.detail_stage = detail_stage
+        self.detail_mode = detail_mode
+        self.dump_dir = Path(dump_dir) if dump_dir is not None else Path(".")
+        self.started = time.time()
+        self._profile = None
+
+    @contextmanager
+    def stage(self, name: str):
+        rec = self.records.setdefault(name, {"stage": name, "wall_s": 0.0, "cpu_s": 0.0,
+                                             "rss_delta_mb": None, "peak_rise_mb": None, "rows": None})
+        info = {}
+        detail = name == self.detail_stage
+        if detail:
+            self._start_detail()
+        rss, peak = current_rss_mb(), peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            rec["wall_s"] += time.perf_counter() - wall
+            rec["cpu_s"] += time.process_time() - cpu
+            for key, delta in (("rss_delta_mb", _delta(current_rss_mb(), rss)),
+                               ("peak_rise_mb", _delta(peak_rss_mb(), peak))):
+                if delta is not None:
+                    rec[key] = (rec[key] or 0.0) + delta
+            if "rows" in info:
+                rec["rows"] = info["rows"]
+            if detail:
+                self._stop_detail(name, rec)
+
+    def _start_detail(self):
+        if self.detail_mode == "cprofile":
+            self._profile = self._profile or cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(25)
+
+    def _stop_detail(self, name: str, rec: dict):
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        if self.detail_mode == "cprofile":
+            self._profile.disable()
+            path = self.dump_dir / f"profile_{name}.prof"
+            self._profile.dump_stats(path)  # open with: python -m pstats <file>
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            rec["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+            path = self.dump_dir / f"tracemalloc_{name}.txt"
+            top = snapshot.statistics("lineno")[:25]
+            path.write_text("\n".join(str(stat) for stat in top), encoding="utf-8")
+        rec["detail_file"] = str(path)
+
+    def trace(self) -> dict:
+        stages = [dict(r, wall_s=round(r["wall_s"], 6), cpu_s=round(r["cpu_s"], 6),
+                       **{k: None if r[k] is None else round(r[k], 1) for k in ("rss_delta_mb", "peak_rise_mb")})
+                  for r in self.records.values()]
+        peak = peak_rss_mb()
+        return {
+            "command": sys.argv,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "total_wall_s": round(sum(r["wall_s"] for r in stages), 6),
+            "process_peak_rss_mb": None if peak is None else round(peak, 1),
+            "stages": stages,
+        }
+
+    def write_json(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.trace(), indent=2), encoding="utf-8")
+
+    def print_table(self):
+        print(f"{'Stage':<14}{'Wall s':>10}{'CPU s':>10}{'RSS delta MB':>14}{'Peak rise MB':>14}{'Rows':>12}")
+        for r in self.records.values():
+            rss = "" if r["rss_delta_mb"] is None else f"{r['rss_delta_mb']:+.1f}"
+            peak = "" if r["peak_rise_mb"] is None else f"{r['peak_rise_mb']:.1f}"
+            rows = "" if r["rows"] is None else f"{r['rows']:,}"
+            print(f"{r['stage']:<14}{r['wall_s']:>10.4f}{r['cpu_s']:>10.4f}{rss:>14}{peak:>14}{rows:>12}")
+            if "detail_file" in r:
+                print(f"  detail: {r['detail_file']}")
@@ -6,15 +6,32 @@ Expense Analyzer
 - Summaries + simple charts (Matplotlib only)
 Usage:
   python expense_analyzer.py --csv personal_expenses_sample.csv --budget 25000 --outdir outputs
+  python expense_analyzer.py --csv big_export.csv --chunksize 500000 --outdir outputs
+  python expense_analyzer.py --csv personal_expenses_sample.csv --cache-dir .expense_cache
+  python expense_analyzer.py --csv growing_export.csv --incremental --outdir outputs
+  python expense_analyzer.py --input-dir accounts/ --budget 25000 --outdir outputs
+  python expense_analyzer.py --csv personal_expenses_sample.csv --profile --profile-stage charts
 """
 import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 
-def load_and_clean(csv_path: Path) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+# Shared helpers (frame cache, stage profiler, chart renderer) live in ../common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "common"))
+from chart_render import FORMATS as CHART_FORMATS, render_charts
+from frame_cache import DEFAULT_MAX_BYTES, cached_load, invalidate
+from stage_profiler import DETAIL_MODES, StageProfiler
+
+def clean_rows(df: pd.DataFrame) -> pd.DataFrame:
     # Basic cleaning
     if "Date" not in df.columns or "Amount" not in df.columns:
         raise ValueError("CSV must include at least 'Date' and 'Amount' columns.")
@@ -26,23 +43,173 @@ def load_and_clean(csv_path: Path) -> pd.DataFrame:
     df["Amount"] = df["Amount"].abs()  # ensure positive spends
     # Standardize text columns if present
     if "Category" in df.columns:
-        df["Category"] = df["Category"].astype(str).str.strip().str.title()
+        df["Category"] = _standardize_text(df["Category"])
     if "Payment Method" in df.columns:
-        df["Payment Method"] = df["Payment Method"].astype(str).str.strip().str.title()
-    # Enrich
+        df["Payment Method"] = _standardize_text(df["Payment Method"])
+    return df
+
+def _standardize_text(col: pd.Series) -> pd.Series:
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Clean each distinct label once and remap the codes; missing values become "Nan" as below
+        labels = pd.Index([str(c) for c in col.cat.categories] + ["nan"]).str.strip().str.title()
+        categories, remap = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+        codes = remap[col.cat.codes.to_numpy()]  # code -1 picks the trailing "nan" label
+        return pd.Series(pd.Categorical.from_codes(codes, categories), index=col.index,
+                         name=col.name).cat.remove_unused_categories()
+    return col.astype(str).str.strip().str.title()
+
+def enrich(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     df["Month"] = df["Date"].values.astype("datetime64[M]")
     df["Week"] = df["Date"] - pd.to_timedelta(df["Date"].dt.weekday, unit="D")
     df["Week"] = df["Week"].values.astype("datetime64[D]")
-    df["Weekday"] = df["Date"].dt.day_name()
-    return df.sort_values("Date").reset_index(drop=True)
+    if compact:
+        df["Weekday"] = pd.Categorical.from_codes(df["Date"].dt.weekday.to_numpy(), WEEKDAYS, ordered=True)
+    else:
+        df["Weekday"] = df["Date"].dt.day_name()
+    return df
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    return enrich(clean_rows(df))
+
+def _compact_read_dtypes(csv_path: Path) -> dict:
+    # Text columns are parsed straight into categoricals, so their object copies never exist
+    header = pd.read_csv(csv_path, nrows=0).columns
+    return {name: "category" for name in header if name not in ("Date", "Amount")}
+
+def load_and_clean(csv_path: Path, profiler: StageProfiler | None = None, compact: bool = False) -> pd.DataFrame:
+    """Parsed, cleaned and enriched frame; compact=True parses text columns as categoricals
+    (finish with compact_frame())."""
+    prof = profiler or StageProfiler()
+    with prof.stage("load") as st:
+        df = pd.read_csv(csv_path, dtype=_compact_read_dtypes(csv_path) if compact else None)
+        st["rows"] = len(df)
+    with prof.stage("clean") as st:
+        df = clean_rows(df)
+        st["rows"] = len(df)
+    with prof.stage("enrich") as st:
+        df = enrich(df, compact=compact).sort_values("Date").reset_index(drop=True)
+        st["rows"] = len(df)
+    return df
+
+# ---------- Compact dtypes ----------
+DAY_ORDINAL_COLUMNS = ("Month", "Week")
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+CATEGORY_MAX_RATIO = 0.5  # text columns with at most this share of distinct values become categoricals
+
+def to_day_ordinals(values) -> np.ndarray:
+    return np.asarray(values).astype("datetime64[D]").astype(np.int32)
+
+def from_day_ordinals(values) -> pd.Index:
+    return pd.Index(np.asarray(values).astype("datetime64[D]"), name=getattr(values, "name", None))
+
+def _compact_column(name: str, col: pd.Series) -> pd.Series:
+    if name in DAY_ORDINAL_COLUMNS and col.dtype.kind == "M":
+        return pd.Series(to_day_ordinals(col.to_numpy()), index=col.index, name=name)
+    if name == "Weekday":
+        return col.astype(pd.CategoricalDtype(WEEKDAYS, ordered=True))
+    if col.dtype.kind in "iu":
+        return pd.to_numeric(col, downcast="integer")
+    if col.dtype.kind == "f":
+        values = col.to_numpy()
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+            return pd.to_numeric(col, downcast="integer")  # whole rupee amounts
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return col.astype(np.float32)
+        return col
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        if col.cat.categories.size > CATEGORY_MAX_RATIO * len(col):
+            return _expand(col)  # mostly distinct values (parsed as categorical) are cheaper as plain text
+        return col
+    if col.dtype.kind == "O" or pd.api.types.is_string_dtype(col.dtype):
+        if col.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(col):
+            return col.astype("category")
+    return col
+
+def _expand(col: pd.Series) -> pd.Series:
+    # Categorical back to the dtype of its labels (what a plain read_csv would have produced)
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        return col
+    if col.cat.categories.empty:
+        return pd.Series(np.nan, index=col.index, name=col.name)  # an all-empty column parses as float64
+    return col.astype(col.cat.categories.dtype)
+
+def compact_frame(df: pd.DataFrame, report: list | None = None) -> pd.DataFrame:
+    """Categorical text, narrow numerics and int32 day ordinals for Month/Week.
+    Columns are converted in place one at a time, so memory peaks at the frame plus one column.
+    With a report list, (column, before dtype, after dtype, before bytes, after bytes) rows are appended;
+    columns parsed as categoricals are measured as their plain-text equivalent, one at a time.
+    The result still goes through aggregate_totals()/summarize() unchanged."""
+    for name in list(df.columns):
+        col = df[name]
+        if report is not None:
+            plain = _expand(col)
+            before_dtype, before_bytes = str(plain.dtype), int(plain.memory_usage(deep=True, index=False))
+            del plain
+        df[name] = _compact_column(name, col)
+        del col
+        if report is not None:
+            report.append((name, before_dtype, str(df[name].dtype), before_bytes,
+                           int(df[name].memory_usage(deep=True, index=False))))
+    return df
+
+def memory_report(rows: list) -> pd.DataFrame:
+    report = pd.DataFrame(rows, columns=["Column", "Before dtype", "After dtype", "Before bytes", "After bytes"])
+    report = report.set_index("Column").rename_axis(None)
+    report.loc["Total"] = ["", "", report["Before bytes"].sum(), report["After bytes"].sum()]
+    report["Saved %"] = (100 * (1 - report["After bytes"] / report["Before bytes"])).round(1)
+    return report
 
-def summarize(df: pd.DataFrame, monthly_budget: float | None = None) -> dict:
-    daily_totals = df.groupby(df["Date"].dt.date)["Amount"].sum()
-    monthly_totals = df.groupby("Month")["Amount"].sum().sort_index()
-    category_totals = df.groupby("Category")["Amount"].sum().sort_values(ascending=False) if "Category" in df.columns else None
+TOTAL_KEYS = ("daily", "monthly", "category")
+
+def aggregate_totals(df: pd.DataFrame) -> dict:
+    # Partial sums behind summarize(); merge_totals() folds two of these together
+    amount = df["Amount"]
+    if amount.dtype == np.float32:
+        amount = amount.astype(np.float64)  # float32 sums lose cents on large totals
+    monthly = amount.groupby(df["Month"]).sum()
+    if monthly.index.dtype.kind in "iu":
+        monthly.index = from_day_ordinals(monthly.index)  # compact frames store Month as day ordinals
+    return {
+        "daily": amount.groupby(df["Date"].dt.date).sum(),
+        "monthly": monthly,
+        "category": amount.groupby(df["Category"], observed=True).sum() if "Category" in df.columns else None,
+    }
+
+def merge_totals(left: dict, right: dict) -> dict:
+    merged = {}
+    for key in TOTAL_KEYS:
+        a, b = left.get(key), right.get(key)
+        if a is None or b is None:
+            merged[key] = b if a is None else a
+        else:
+            # concat + groupby keeps int dtypes intact, unlike Series.add(fill_value=0)
+            merged[key] = pd.concat([a, b]).groupby(level=0).sum()
+    return merged
+
+def fold_chunks(chunks, totals: dict | None = None) -> tuple[dict | None, int]:
+    # Clean and aggregate one chunk at a time; returns (totals, raw rows seen)
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        part = aggregate_totals(clean_frame(chunk))
+        totals = part if totals is None else merge_totals(totals, part)
+    return totals, rows
+
+def stream_totals(csv_path: Path, chunksize: int) -> dict:
+    # Memory is bounded by chunksize instead of the file size
+    totals, _ = fold_chunks(pd.read_csv(csv_path, chunksize=chunksize))
+    if totals is None:
+        raise ValueError(f"No rows found in {csv_path}")
+    return totals
+
+def summarize_totals(totals: dict, monthly_budget: float | None = None) -> tuple:
+    daily_totals = totals["daily"]
+    monthly_totals = totals["monthly"].sort_index()
+    category_totals = totals["category"].sort_values(ascending=False) if totals["category"] is not None else None
 
     summary = {
-        "total_spend": float(df["Amount"].sum()),
+        "total_spend": float(daily_totals.sum()),
         "avg_daily_spend": float(daily_totals.mean()),
         "num_days": int(daily_totals.shape[0]),
         "top_categories": category_totals.head(5).to_dict() if category_totals is not None else {},
@@ -57,6 +224,148 @@ def summarize(df: pd.DataFrame, monthly_budget: float | None = None) -> dict:
 
     return summary, monthly_totals, category_totals, budget_df
 
+def summarize(df: pd.DataFrame, monthly_budget: float | None = None) -> tuple:
+    return summarize_totals(aggregate_totals(df), monthly_budget)
+
+# ---------- Incremental (append-only) runs ----------
+STATE_FILE = ".expense_state.json"
+STATE_VERSION = 2
+INCREMENTAL_CHUNKSIZE = 1_000_000
+CHECK_WINDOW = 1 << 16  # bytes checksummed at each end of the already-processed prefix
+
+class _ByteRange:
+    # Read-only file view that stops at `end`, so read_csv never sees a half-written last line
+    def __init__(self, f, end: int):
+        self.f = f
+        self.end = end
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = max(self.end - self.f.tell(), 0)
+        return self.f.read(remaining if size is None or size < 0 else min(size, remaining))
+
+def _complete_end(csv_path: Path) -> int:
+    # Offset just past the last newline; anything after it may still be being written
+    size = csv_path.stat().st_size
+    with open(csv_path, "rb") as f:
+        pos = size
+        while pos > 0:
+            start = max(pos - 65536, 0)
+            f.seek(start)
+            block = f.read(pos - start)
+            nl = block.rfind(b"\n")
+            if nl != -1:
+                return start + nl + 1
+            pos = start
+    return 0
+
+def _hash_range(csv_path: Path, start: int, end: int, block_size: int = 1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h
+
+def _prefix_fingerprint(csv_path: Path, offset: int) -> dict:
+    # Same file (device + inode) and unchanged first / last CHECK_WINDOW bytes of the processed prefix;
+    # an append-only run rereads at most 2 * CHECK_WINDOW old bytes however large the file is
+    st = csv_path.stat()
+    return {"device": st.st_dev, "inode": st.st_ino, "offset": offset,
+            "head": _hash_range(csv_path, 0, min(offset, CHECK_WINDOW)).hexdigest(),
+            "tail": _hash_range(csv_path, max(offset - CHECK_WINDOW, 0), offset).hexdigest()}
+
+def _series_to_json(s: pd.Series | None) -> dict | None:
+    if s is None:
+        return None
+    if s.index.dtype.kind == "M":
+        kind, keys = str(s.index.dtype), [ts.isoformat() for ts in s.index]
+    elif len(s.index) and isinstance(s.index[0], datetime.date):
+        kind, keys = "date", [d.isoformat() for d in s.index]
+    else:
+        kind, keys = "str", [str(k) for k in s.index]
+    return {"name": s.name, "index_name": s.index.name, "index_kind": kind,
+            "dtype": str(s.dtype), "index": keys, "values": s.tolist()}
+
+def _series_from_json(data: dict | None) -> pd.Series | None:
+    if data is None:
+        return None
+    kind, keys = data["index_kind"], data["index"]
+    if kind == "date":
+        index = pd.Index([datetime.date.fromisoformat(k) for k in keys], dtype=object)
+    elif kind == "str":
+        index = pd.Index(keys)
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(keys)).astype(kind)
+    index.name = data["index_name"]
+    return pd.Series(data["values"], index=index, dtype=data["dtype"], name=data["name"])
+
+def load_state(state_path: Path) -> dict | None:
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != STATE_VERSION:
+        return None
+    state["totals"] = {key: _series_from_json(state["totals"].get(key)) for key in TOTAL_KEYS}
+    return state
+
+def save_state(state_path: Path, state: dict):
+    data = dict(state, version=STATE_VERSION)
+    data["totals"] = {key: _series_to_json(state["totals"].get(key)) for key in TOTAL_KEYS}
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    tmp.replace(state_path)
+
+def _fold_range(csv_path: Path, columns: list, start: int, end: int, totals: dict | None, chunksize: int):
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        chunks = pd.read_csv(_ByteRange(f, end), header=None, names=columns, chunksize=chunksize)
+        return fold_chunks(chunks, totals)
+
+def incremental_totals(csv_path: Path, state_path: Path, chunksize: int = INCREMENTAL_CHUNKSIZE) -> dict:
+    """Fold only the rows appended since the last run into the persisted totals.
+    Falls back to a full rebuild when the file was replaced or truncated, or when the start or end of the
+    already-processed prefix no longer matches its checksum (edits deep inside it are not detected)."""
+    source = str(csv_path.resolve())
+    end = _complete_end(csv_path)
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    state = load_state(state_path)
+
+    reason = None
+    if state is None:
+        reason = "no saved state"
+    elif state["source"] != source or state["columns"] != columns:
+        reason = "state belongs to a different file"
+    elif end < state["offset"]:
+        reason = "file was truncated"
+    elif _prefix_fingerprint(csv_path, state["offset"]) != state["prefix"]:
+        reason = "file was replaced or earlier rows changed"
+
+    if reason is None:
+        start, totals, rows = state["offset"], state["totals"], state["rows"]
+    else:
+        print(f"Full rebuild ({reason}).")
+        with open(csv_path, "rb") as f:
+            start = len(f.readline())
+        totals, rows = None, 0
+
+    if end > start:
+        totals, new_rows = _fold_range(csv_path, columns, start, end, totals, chunksize)
+        rows += new_rows
+        print(f"Processed {new_rows} new rows ({end - start} bytes).")
+    if totals is None:
+        raise ValueError(f"No rows found in {csv_path}")
+
+    save_state(state_path, {"source": source, "columns": columns, "offset": end, "rows": rows,
+                            "prefix": _prefix_fingerprint(csv_path, end), "totals": totals})
+    return totals
+
 def save_tables(outdir: Path, monthly_totals: pd.Series, category_totals: pd.Series | None, budget_df: pd.DataFrame):
     outdir.mkdir(parents=True, exist_ok=True)
     monthly_totals.to_csv(outdir / "monthly_summary.csv", header=["Amount"])
@@ -71,38 +380,41 @@ def _pie_aggregate(series: pd.Series, top_n: int = 7) -> pd.Series:
     other = pd.Series({"Other": series.iloc[top_n:].sum()})
     return pd.concat([head, other])
 
-def make_charts(outdir: Path, monthly_totals: pd.Series, category_totals: pd.Series | None):
-    outdir.mkdir(parents=True, exist_ok=True)
+def _draw_monthly_trend(fig, monthly_totals: pd.Series):
+    ax = fig.add_subplot()
+    ax.plot(monthly_totals.index, monthly_totals.to_numpy(), marker="o")
+    ax.set_title("Monthly Spend Trend")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Amount")
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(ax.xaxis.get_major_locator()))
+    fig.tight_layout()
+
+def _draw_top_categories(fig, top: pd.Series):
+    ax = fig.add_subplot()
+    ax.barh(top.index.astype(str), top.to_numpy())
+    ax.set_title("Top Categories by Spend")
+    ax.set_xlabel("Amount")
+    ax.set_ylabel("Category")
+    fig.tight_layout()
 
-    # Monthly trend (line)
-    plt.figure()
-    monthly_totals.index = pd.to_datetime(monthly_totals.index)
-    monthly_totals.sort_index().plot(kind="line", marker="o")
-    plt.title("Monthly Spend Trend")
-    plt.xlabel("Month")
-    plt.ylabel("Amount")
-    plt.tight_layout()
-    plt.savefig(outdir / "chart_monthly_trend.png", dpi=150)
-    plt.close()
+def _draw_category_share(fig, shares: pd.Series):
+    ax = fig.add_subplot()
+    ax.pie(shares.to_numpy(), labels=shares.index.astype(str), autopct="%1.1f%%")
+    ax.set_title("Category Share of Spend")
+    fig.tight_layout()
 
+def make_charts(outdir: Path, monthly_totals: pd.Series, category_totals: pd.Series | None,
+                fmt: str = "png", dpi: float = 150, workers: int = 1, force: bool = False) -> list[str]:
+    # Returns the chart files that were redrawn; charts whose data did not change are skipped
+    monthly = monthly_totals.copy()
+    monthly.index = pd.to_datetime(monthly.index)
+    charts = [("chart_monthly_trend", _draw_monthly_trend, monthly.sort_index(), (6.4, 4.8))]
     if category_totals is not None:
-        # Top categories (bar)
-        plt.figure()
-        category_totals.head(10).sort_values(ascending=True).plot(kind="barh")
-        plt.title("Top Categories by Spend")
-        plt.xlabel("Amount")
-        plt.ylabel("Category")
-        plt.tight_layout()
-        plt.savefig(outdir / "chart_top_categories.png", dpi=150)
-        plt.close()
-
-        # Category share (pie)
-        plt.figure()
-        _pie_aggregate(category_totals, top_n=7).plot(kind="pie", autopct="%1.1f%%", ylabel="")
-        plt.title("Category Share of Spend")
-        plt.tight_layout()
-        plt.savefig(outdir / "chart_category_share.png", dpi=150)
-        plt.close()
+        charts.append(("chart_top_categories", _draw_top_categories,
+                       category_totals.head(10).sort_values(ascending=True), (6.4, 4.8)))
+        charts.append(("chart_category_share", _draw_category_share,
+                       _pie_aggregate(category_totals, top_n=7), (6.4, 4.8)))
+    return render_charts(charts, outdir, fmt=fmt, dpi=dpi, workers=workers, force=force)
 
 def save_summary_text(outdir: Path, summary: dict):
     outdir.mkdir(parents=True, exist_ok=True)
@@ -116,21 +428,194 @@ def save_summary_text(outdir: Path, summary: dict):
         lines.append(f"  - {k}: {v:.2f}")
     (outdir / "summary.txt").write_text("\n".join(lines), encoding="utf-8")
 
+def load_totals(csv_path: Path, chunksize: int | None = None, state_path: Path | None = None,
+                cache_dir: Path | None = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                report_path: Path | None = None, profiler: StageProfiler | None = None) -> dict:
+    """Totals for one CSV via the streaming, incremental, cached or in-memory path.
+    With report_path, the in-memory frame is compacted and its memory report saved there."""
+    prof = profiler or StageProfiler()
+    if state_path is not None or chunksize:
+        # Parsing, cleaning and aggregation are interleaved per chunk here
+        with prof.stage("load"):
+            if state_path is not None:
+                return incremental_totals(csv_path, state_path, chunksize=chunksize or INCREMENTAL_CHUNKSIZE)
+            return stream_totals(csv_path, chunksize)
+    if cache_dir is not None:
+        with prof.stage("load") as st:
+            df = cached_load(csv_path, load_and_clean, cache_dir, max_bytes=cache_max_bytes)
+            st["rows"] = len(df)
+    else:
+        df = load_and_clean(csv_path, profiler=prof, compact=report_path is not None)
+    if report_path is not None:
+        with prof.stage("compact"):
+            rows = []
+            df = compact_frame(df, report=rows)
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            memory_report(rows).to_csv(report_path)
+    with prof.stage("summarize") as st:
+        st["rows"] = len(df)
+        return aggregate_totals(df)
+
+def write_reports(outdir: Path, totals: dict, monthly_budget: float | None = None,
+                  chart_options: dict | None = None, profiler: StageProfiler | None = None) -> dict:
+    prof = profiler or StageProfiler()
+    with prof.stage("summarize"):
+        summary, monthly_totals, category_totals, budget_df = summarize_totals(totals, monthly_budget=monthly_budget)
+    with prof.stage("tables"):
+        save_tables(outdir, monthly_totals, category_totals, budget_df)
+    with prof.stage("charts"):
+        make_charts(outdir, monthly_totals, category_totals, **(chart_options or {}))
+    with prof.stage("summary_text"):
+        save_summary_text(outdir, summary)
+    return summary
+
+MEMORY_REPORT_FILE = "memory_report.csv"
+PROFILE_STAGES = ("load", "clean", "enrich", "compact", "summarize", "tables", "charts", "summary_text")
+
+# ---------- Batch mode (many accounts in one process) ----------
+ROLLUP_DIR = "_rollup"
+
+def _batch_outdirs(paths: list[Path], outdir: Path) -> list[Path]:
+    # One folder per file, named after it; duplicate stems (and a file called _rollup.csv)
+    # get the first free numeric suffix, so no two outputs share a folder
+    taken = {ROLLUP_DIR}
+    dirs = []
+    for path in paths:
+        name, n = path.stem, 0
+        while name in taken:
+            n += 1
+            name = f"{path.stem}_{n}"
+        taken.add(name)
+        dirs.append(outdir / name)
+    return dirs
+
+def _batch_worker(job: tuple) -> tuple:
+    csv_path, file_outdir, monthly_budget, chart_options, options = job
+    try:
+        options = dict(options)
+        if options.pop("incremental", False):
+            options["state_path"] = file_outdir / STATE_FILE
+        if options.pop("compact", False):
+            options["report_path"] = file_outdir / MEMORY_REPORT_FILE
+        totals = load_totals(csv_path, **options)
+        # Files are already spread across processes; draw each file's charts in-process
+        summary = write_reports(file_outdir, totals, monthly_budget, dict(chart_options, workers=1))
+        return str(csv_path), totals, summary, None
+    except Exception as exc:  # one bad file must not abort the batch
+        return str(csv_path), None, None, f"{type(exc).__name__}: {exc}"
+
+def run_batch(paths: list[Path], outdir: Path, monthly_budget: float | None = None,
+              workers: int | None = None, chart_options: dict | None = None, **options) -> list[tuple]:
+    """Analyze many CSVs in a process pool, then write a merged cross-account rollup.
+    Returns (path, error) pairs for the files that failed."""
+    workers = workers or os.cpu_count() or 1
+    chart_options = chart_options or {}
+    jobs = [(path, d, monthly_budget, chart_options, options) for path, d in zip(paths, _batch_outdirs(paths, outdir))]
+    # Hand out jobs in batches so thousands of small files don't pay per-task IPC
+    chunk = max(1, len(jobs) // (workers * 4))
+
+    rows, failures, merged = [], [], None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, totals, summary, error in pool.map(_batch_worker, jobs, chunksize=chunk):
+            if error is not None:
+                print(f"FAILED {path}: {error}")
+                failures.append((path, error))
+                rows.append({"File": path, "Status": "error", "Error": error})
+                continue
+            merged = totals if merged is None else merge_totals(merged, totals)
+            rows.append({"File": path, "Status": "ok", "Total Spend": summary["total_spend"],
+                         "Days": summary["num_days"], "Error": ""})
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    report = pd.DataFrame(rows)
+    if "Days" in report:
+        report["Days"] = report["Days"].astype("Int64")  # failed files leave gaps; keep whole days, not 12.0
+    report.to_csv(outdir / "batch_report.csv", index=False)
+    if merged is not None:
+        # Budgets are per account, so the rollup has no budget comparison
+        write_reports(outdir / ROLLUP_DIR, merged, chart_options=chart_options)
+    return failures
+
 def main():
     parser = argparse.ArgumentParser(description="Expense Analyzer")
-    parser.add_argument("--csv", required=True, help="Path to expenses CSV")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Path to expenses CSV")
+    source.add_argument("--input-dir", help="Batch mode: analyze every *.csv in this directory")
+    source.add_argument("--glob", help="Batch mode: analyze every CSV matching this pattern")
     parser.add_argument("--budget", type=float, default=None, help="Monthly budget (optional)")
     parser.add_argument("--outdir", default="outputs", help="Directory to save results")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the CSV in chunks of this many rows (bounded memory)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process rows appended since the last run (state kept in --state)")
+    parser.add_argument("--state", default=None, help=f"Incremental state file (default: <outdir>/{STATE_FILE})")
+    parser.add_argument("--cache-dir", default=None, help="Cache cleaned data here and reuse it on repeat runs")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help="Evict least recently used cache entries above this size")
+    parser.add_argument("--clear-cache", action="store_true", help="Drop cached entries for --csv before running")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use compact dtypes for the in-memory frame and save a per-column memory report")
+    parser.add_argument("--chart-format", choices=CHART_FORMATS, default="png", help="Chart file format")
+    parser.add_argument("--chart-dpi", type=float, default=150, help="Chart resolution (lower is faster for bulk runs)")
+    parser.add_argument("--chart-workers", type=int, default=1, help="Draw charts in this many processes")
+    parser.add_argument("--force-charts", action="store_true", help="Redraw charts even if their data is unchanged")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each stage and save a JSON trace to <outdir>/profile.json")
+    parser.add_argument("--profile-stage", choices=PROFILE_STAGES, default=None,
+                        help="With --profile, also dump cProfile/tracemalloc detail for this stage")
+    parser.add_argument("--profile-mode", choices=DETAIL_MODES, default="cprofile", help="Detail dump type")
+    parser.add_argument("--workers", type=int, default=None, help="Batch mode worker processes (default: all cores)")
     args = parser.parse_args()
+    if args.profile_stage and not args.profile:
+        parser.error("--profile-stage requires --profile")
+    if args.compact and (args.chunksize or args.incremental):
+        parser.error("--compact applies to the in-memory frame; it cannot be combined with --chunksize or --incremental")
+    if args.clear_cache and not args.cache_dir:
+        parser.error("--clear-cache requires --cache-dir")
 
-    csv_path = Path(args.csv)
     outdir = Path(args.outdir)
-    df = load_and_clean(csv_path)
-    summary, monthly_totals, category_totals, budget_df = summarize(df, monthly_budget=args.budget)
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+    cache_max_bytes = int(args.cache_max_mb * 2**20)
+    chart_options = {"fmt": args.chart_format, "dpi": args.chart_dpi,
+                     "workers": args.chart_workers, "force": args.force_charts}
+
+    if args.input_dir or args.glob:
+        if args.input_dir:
+            paths = sorted(p for p in Path(args.input_dir).glob("*.csv") if p.is_file())
+        else:
+            # Same rule as --input-dir: CSV files only, whatever else the pattern matches
+            paths = sorted(Path(p) for p in glob.glob(args.glob, recursive=True)
+                           if p.lower().endswith(".csv") and os.path.isfile(p))
+        if not paths:
+            parser.error("no CSV files matched")
+        if cache_dir is not None and args.clear_cache:
+            for path in paths:
+                invalidate(cache_dir, path)
+        failures = run_batch(paths, outdir, monthly_budget=args.budget, workers=args.workers, chart_options=chart_options,
+                             chunksize=args.chunksize, incremental=args.incremental, compact=args.compact,
+                             cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+        print(f"Batch complete: {len(paths) - len(failures)} ok, {len(failures)} failed.")
+        print(f"Results saved to: {outdir.resolve()}")
+        if failures:
+            sys.exit(1)
+        return
 
-    save_tables(outdir, monthly_totals, category_totals, budget_df)
-    make_charts(outdir, monthly_totals, category_totals)
-    save_summary_text(outdir, summary)
+    csv_path = Path(args.csv)
+    if cache_dir is not None and args.clear_cache:
+        invalidate(cache_dir, csv_path)
+    state_path = (Path(args.state) if args.state else outdir / STATE_FILE) if args.incremental else None
+    report_path = outdir / MEMORY_REPORT_FILE if args.compact else None
+    prof = StageProfiler(detail_stage=args.profile_stage if args.profile else None,
+                         detail_mode=args.profile_mode, dump_dir=outdir)
+    totals = load_totals(csv_path, chunksize=args.chunksize, state_path=state_path, cache_dir=cache_dir,
+                         cache_max_bytes=cache_max_bytes, report_path=report_path, profiler=prof)
+    write_reports(outdir, totals, monthly_budget=args.budget, chart_options=chart_options, profiler=prof)
+    if report_path is not None and report_path.exists():
+        print("Memory by column (bytes):")
+        print(pd.read_csv(report_path, index_col=0, keep_default_na=False).to_string())
+    if args.profile:
+        prof.write_json(outdir / "profile.json")
+        prof.print_table()
 
     print("Analysis complete.")
     print(f"Results saved to: {outdir.resolve()}")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Expense query server
+- Loads and cleans each dataset once and keeps it in memory (compact dtypes)
+- Answers summary / monthly-vs-budget / category / daily queries as JSON, optionally for a date range
+- Aggregates sit in an LRU cache; a dataset is reloaded when its file's size or mtime changes
+Usage:
+  python expense_server.py --csv data/personal_expenses_sample.csv --port 8765
+  curl "http://127.0.0.1:8765/summary?dataset=personal_expenses_sample&budget=25000&start=2025-06-01"
+Endpoints: /datasets, /summary, /monthly, /categories, /daily
+Query params: dataset (file stem), budget, start, end (YYYY-MM-DD, inclusive)
+"""
+import argparse
+import json
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from expense_analyzer import aggregate_totals, compact_frame, load_and_clean, summarize_totals
+
+DEFAULT_CACHE_SIZE = 256
+
+class ExpenseStore:
+    """In-memory datasets plus an LRU of per-date-range totals."""
+
+    def __init__(self, paths: list[Path], cache_size: int = DEFAULT_CACHE_SIZE):
+        self.paths = {}
+        for p in paths:
+            # Datasets are addressed by file stem, so two different files with the same stem are ambiguous
+            other = self.paths.setdefault(p.stem, p.resolve())
+            if other != p.resolve():
+                raise ValueError(f"dataset name {p.stem!r} is used by both {other} and {p.resolve()}")
+        self.cache_size = cache_size
+        self._frames = {}  # name -> (signature, frame)
+        self._totals = OrderedDict()  # (name, signature, start, end) -> totals
+        self._lock = threading.Lock()
+
+    def _signature(self, name: str) -> tuple:
+        st = self.paths[name].stat()
+        return st.st_size, st.st_mtime_ns
+
+    def frame(self, name: str) -> tuple[tuple, pd.DataFrame]:
+        if name not in self.paths:
+            raise LookupError(f"unknown dataset {name!r}")
+        signature = self._signature(name)
+        with self._lock:
+            cached = self._frames.get(name)
+            if cached is not None and cached[0] == signature:
+                return cached
+            # New or changed file: reload and drop its stale aggregates
+            frame = compact_frame(load_and_clean(self.paths[name], compact=True))
+            self._frames[name] = (signature, frame)
+            for key in [k for k in self._totals if k[0] == name]:
+                del self._totals[key]
+            return self._frames[name]
+
+    def totals(self, name: str, start: np.datetime64 | None, end: np.datetime64 | None) -> dict:
+        signature, df = self.frame(name)
+        key = (name, signature, start, end)
+        with self._lock:
+            if key in self._totals:
+                self._totals.move_to_end(key)
+                return self._totals[key]
+        # load_and_clean sorts by Date, so a range is a slice found by binary search
+        dates = df["Date"].to_numpy()
+        lo = 0 if start is None else np.searchsorted(dates, start, side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, end + np.timedelta64(1, "D"), side="left")
+        totals = aggregate_totals(df.iloc[lo:hi])
+        with self._lock:
+            self._totals[key] = totals
+            while len(self._totals) > self.cache_size:
+                self._totals.popitem(last=False)
+        return totals
+
+def _parse_date(params: dict, key: str) -> np.datetime64 | None:
+    value = params.get(key, [None])[0]
+    if not value:
+        return None
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        raise ValueError(f"{key} must be YYYY-MM-DD, got {value!r}") from None
+
+def _parse_budget(params: dict) -> float | None:
+    value = params.get("budget", [None])[0]
+    if value in (None, ""):
+        return None
+    try:
+        budget = float(value)
+    except ValueError:
+        budget = math.nan
+    if not math.isfinite(budget):  # nan / inf would end up as invalid JSON in /summary
+        raise ValueError(f"budget must be a finite number, got {value!r}")
+    return budget
+
+def _records(series: pd.Series, key: str, value: str) -> list[dict]:
+    return [{key: str(k), value: float(v)} for k, v in series.items()]
+
+def answer(store: ExpenseStore, endpoint: str, params: dict) -> dict:
+    if endpoint == "datasets":
+        return {"datasets": sorted(store.paths)}
+    name = params.get("dataset", [None])[0]
+    if name is None and len(store.paths) == 1:
+        name = next(iter(store.paths))
+    if name is None:
+        raise ValueError("dataset is required")
+
+    start, end = _parse_date(params, "start"), _parse_date(params, "end")
+    budget = _parse_budget(params)
+    if endpoint not in ("summary", "monthly", "categories", "daily"):
+        raise LookupError(f"unknown endpoint /{endpoint}")
+    totals = store.totals(name, start, end)
+    if totals["daily"].empty:
+        if endpoint == "summary":
+            return {"dataset": name, "total_spend": 0.0, "avg_daily_spend": 0.0, "num_days": 0, "top_categories": {}}
+        return {"dataset": name, "rows": []}
+    summary, monthly_totals, category_totals, budget_df = summarize_totals(totals, monthly_budget=budget)
+
+    if endpoint == "summary":
+        return {
+            "dataset": name,
+            "total_spend": summary["total_spend"],
+            "avg_daily_spend": summary["avg_daily_spend"],
+            "num_days": summary["num_days"],
+            "top_categories": {str(k): float(v) for k, v in summary["top_categories"].items()},
+        }
+    if endpoint == "monthly":
+        rows = []
+        for month, row in budget_df.iterrows():
+            rows.append({"month": month.strftime("%Y-%m"), **{k: float(v) for k, v in row.items()}})
+        return {"dataset": name, "rows": rows}
+    if endpoint == "categories":
+        rows = _records(category_totals, "category", "amount") if category_totals is not None else []
+        return {"dataset": name, "rows": rows}
+    return {"dataset": name, "rows": _records(totals["daily"], "date", "amount")}
+
+def make_handler(store: ExpenseStore):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                body, status = answer(store, url.path.strip("/"), parse_qs(url.query)), 200
+            except ValueError as exc:
+                body, status = {"error": str(exc)}, 400
+            except LookupError as exc:
+                body, status = {"error": str(exc)}, 404
+            except Exception as exc:
+                body, status = {"error": f"{type(exc).__name__}: {exc}"}, 500
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # dashboards poll many times a minute; keep stdout quiet
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Expense query server")
+    parser.add_argument("--csv", action="append", default=[], help="Expenses CSV to serve (repeatable)")
+    parser.add_argument("--data-dir", default=None, help="Serve every *.csv in this directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Cached aggregate results")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.csv]
+    if args.data_dir:
+        paths += sorted(Path(args.data_dir).glob("*.csv"))
+    if not paths:
+        parser.error("give at least one --csv or --data-dir")
+
+    try:
+        store = ExpenseStore(paths, cache_size=args.cache_size)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for name in store.paths:
+        store.frame(name)  # warm up so the first query is fast too
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(store))
+    print(f"Serving {len(store.paths)} dataset(s) on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
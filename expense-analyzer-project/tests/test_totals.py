@@ -0,0 +1,111 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from expense_analyzer import (ROLLUP_DIR, aggregate_totals, incremental_totals, load_and_clean, load_totals,
+                              merge_totals, run_batch, stream_totals)
+
+CATEGORIES = ["Rent", " groceries", "Food & Drinks", "TRANSPORT ", "Utilities"]
+METHODS = ["UPI", "cash", "Credit Card "]
+
+def write_expenses(path, rows, seed=0, start="2024-01-01"):
+    # Sample-shaped CSV with a few dirty rows: bad dates, bad / negative amounts, messy casing
+    rng = np.random.default_rng(seed)
+    dates = (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, 400, rows), unit="D")).strftime("%Y-%m-%d")
+    df = pd.DataFrame({
+        "Date": dates.to_numpy(dtype=object),
+        "Category": rng.choice(CATEGORIES, rows),
+        "Description": rng.choice(["Cafe", "Bus", "Monthly Rent"], rows),
+        "Amount": rng.integers(-50, 5000, rows).astype(object),
+        "Payment Method": rng.choice(METHODS, rows),
+        "Notes": "",
+    })
+    df.loc[rng.random(rows) < 0.02, "Date"] = "not a date"
+    df.loc[rng.random(rows) < 0.02, "Amount"] = "n/a"
+    df.to_csv(path, index=False)
+    return path
+
+def _plain_index(s):
+    # Compact frames group by categoricals; compare the labels, not the index type
+    if isinstance(s.index, pd.CategoricalIndex):
+        s = s.set_axis(s.index.astype(s.index.categories.dtype))
+    return s.sort_index()
+
+def assert_totals_equal(got, want):
+    assert set(got) == set(want)
+    for key in want:
+        if want[key] is None:
+            assert got[key] is None
+            continue
+        pd.testing.assert_series_equal(_plain_index(got[key]), _plain_index(want[key]),
+                                       check_dtype=False, check_index_type=False, check_names=False)
+
+def in_memory_totals(path):
+    return aggregate_totals(load_and_clean(path))
+
+@pytest.fixture
+def expenses_csv(tmp_path):
+    return write_expenses(tmp_path / "expenses.csv", 2000)
+
+@pytest.mark.parametrize("chunksize", [50, 333, 10_000])
+def test_streamed_totals_match_in_memory(expenses_csv, chunksize):
+    assert_totals_equal(stream_totals(expenses_csv, chunksize), in_memory_totals(expenses_csv))
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_cached_totals_match_in_memory(expenses_csv, tmp_path, compact):
+    cache_dir = tmp_path / "cache"
+    report = tmp_path / "report.csv" if compact else None
+    miss = load_totals(expenses_csv, cache_dir=cache_dir, report_path=report)
+    assert any(cache_dir.iterdir())
+    hit = load_totals(expenses_csv, cache_dir=cache_dir, report_path=report)
+    want = in_memory_totals(expenses_csv)
+    assert_totals_equal(miss, want)
+    assert_totals_equal(hit, want)
+
+def test_incremental_totals_match_in_memory(tmp_path):
+    lines = write_expenses(tmp_path / "full.csv", 3000, seed=1).read_bytes().splitlines(keepends=True)
+    csv_path, state = tmp_path / "growing.csv", tmp_path / "state.json"
+    (tmp_path / "prefix.csv").write_bytes(b"".join(lines[:2500]))
+    # First run, then two appends; the first append ends in a half-written row that must wait
+    csv_path.write_bytes(b"".join(lines[:1200]))
+    incremental_totals(csv_path, state, chunksize=100)
+    with open(csv_path, "ab") as f:
+        f.write(b"".join(lines[1200:2500]) + lines[2500][:10])
+    assert_totals_equal(incremental_totals(csv_path, state, chunksize=100), in_memory_totals(tmp_path / "prefix.csv"))
+    with open(csv_path, "ab") as f:
+        f.write(lines[2500][10:] + b"".join(lines[2501:]))
+    assert_totals_equal(incremental_totals(csv_path, state, chunksize=100), in_memory_totals(tmp_path / "full.csv"))
+
+def test_incremental_rebuilds_after_an_edit(tmp_path):
+    csv_path, state = write_expenses(tmp_path / "edited.csv", 1000, seed=2), tmp_path / "state.json"
+    incremental_totals(csv_path, state)
+    lines = csv_path.read_bytes().splitlines(keepends=True)
+    with open(csv_path, "r+b") as f:  # rewrite the last row in place (same file, new amount)
+        f.write(b"".join(lines[:-1]) + b"2024-03-01,Rent,Monthly Rent,123456,UPI,\n")
+        f.truncate()
+    assert_totals_equal(incremental_totals(csv_path, state), in_memory_totals(csv_path))
+
+def test_batch_reports_and_rollup_match_in_memory(tmp_path):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    paths = [write_expenses(inputs / name, 500, seed=i) for i, name in enumerate(["a.csv", "b.csv", "_rollup.csv"])]
+    (inputs / "broken.csv").write_text("Date,Category\n2024-01-01,Rent\n", encoding="utf-8")  # no Amount column
+    outdir = tmp_path / "out"
+    failures = run_batch(paths + [inputs / "broken.csv"], outdir, workers=2,
+                         chart_options={"fmt": "svg", "dpi": 40}, chunksize=120)
+    assert [Path(p).name for p, _ in failures] == ["broken.csv"]
+
+    def monthly(folder):
+        return pd.read_csv(outdir / folder / "monthly_summary.csv", index_col=0)["Amount"]
+
+    merged = None
+    for path, folder in zip(paths, ["a", "b", "_rollup_1"]):
+        want = in_memory_totals(path)
+        np.testing.assert_allclose(monthly(folder).to_numpy(), want["monthly"].sort_index().to_numpy())
+        merged = want if merged is None else merge_totals(merged, want)
+    np.testing.assert_allclose(monthly(ROLLUP_DIR).to_numpy(), merged["monthly"].sort_index().to_numpy())
+    report = pd.read_csv(outdir / "batch_report.csv")
+    assert report["Status"].tolist() == ["ok", "ok", "ok", "error"]
+    # Day counts are written as whole numbers even though the failed row has none
+    days = pd.read_csv(outdir / "batch_report.csv", dtype=str)["Days"]
+    assert days.iloc[:3].str.fullmatch(r"\d+").all() and days.isna().iloc[3]